@@ -0,0 +1,146 @@
+#=========================================================================
+# assets.py
+#=========================================================================
+# Central image manager. Every file under the images directory is read
+# from disk at most once, and each display-ready variant (converted,
+# optionally colorkeyed and/or alpha blended) is built once and shared
+# by all sprites and windows that use it.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import properties
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Path prefixes of sprites that use the top-left pixel as a colorkey
+
+colorkey_table = [
+  properties.EXPD_PATH + 'hero',
+  properties.TILE_PATH + 'fire',
+  properties.ENEMY_PATH,
+]
+
+# Raw surfaces loaded from disk, indexed by path
+
+file_table  = {}
+
+# Display-ready surfaces, indexed by (path, colorkey, alpha)
+
+image_table = {}
+
+# Animation banks, lists of colorkeyed frames indexed by path prefix
+
+frame_table = {}
+
+asset_stats = {
+  'loads' : 0,
+  'hits'  : 0,
+}
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Read image from disk if it has not been read yet
+
+def load( path ):
+
+  if path not in file_table:
+    file_table[path]      = pygame.image.load( path )
+    asset_stats['loads'] += 1
+
+  return file_table[path]
+
+# Return shared display-ready surface for given image. The colorkey is
+# taken from the top-left pixel, and alpha sets a per-surface alpha
+# value. Shared surfaces must not be drawn onto or otherwise modified,
+# use copy_image() if a private surface is needed.
+
+def get_image( path, colorkey=False, alpha=None ):
+
+  key = ( path, colorkey, alpha )
+
+  if key in image_table:
+    asset_stats['hits'] += 1
+    return image_table[key]
+
+  surface = load( path )
+
+  if colorkey:
+    surface = surface.copy()
+    surface.set_colorkey( surface.get_at( ( 0, 0 ) ), RLEACCEL )
+
+  if surface.get_flags() & SRCALPHA:
+    surface = surface.convert_alpha()
+  else:
+    surface = surface.convert()
+
+  if alpha != None:
+    surface.set_alpha( alpha )
+
+  image_table[key] = surface
+
+  return surface
+
+# Return private copy of display-ready surface for given image
+
+def copy_image( path, colorkey=False, alpha=None ):
+
+  return get_image( path, colorkey, alpha ).copy()
+
+# Return animation bank for frames stored as <prefix>0.png, <prefix>1.png
+# and so on. The frames are built once and shared, so animating only
+# indexes into the bank.
+
+def get_frames( prefix, num_frames ):
+
+  if prefix not in frame_table:
+    frame_table[prefix] = [
+      get_image( prefix + str( frame ) + '.png', True ) for frame in range( num_frames )
+    ]
+
+  return frame_table[prefix]
+
+# Check if image at path uses a colorkey
+
+def is_colorkeyed( path ):
+
+  for prefix in colorkey_table:
+    if path.startswith( prefix ):
+      return True
+
+  return False
+
+# Eagerly load and convert every image under the images directory. The
+# display mode must already be set since surfaces are converted to the
+# display format.
+
+def preload( root=properties.IMAGE_PATH ):
+
+  for dir_path, dir_names, file_names in os.walk( root ):
+
+    dir_names.sort()
+
+    for file_name in sorted( file_names ):
+
+      if not file_name.endswith( '.png' ):
+        continue
+
+      path = os.path.join( dir_path, file_name ).replace( os.sep, '/' )
+
+      get_image( path, is_colorkeyed( path ) )
+
+# Return copy of asset counters
+
+def get_asset_stats():
+
+  stats = dict( asset_stats )
+
+  stats['files']  = len( file_table )
+  stats['images'] = len( image_table )
+  stats['banks']  = len( frame_table )
+
+  return stats
@@ -5,7 +5,7 @@
 # survivor. Each attribute can positively or negatively affect a stat or
 # action based on the table below.
 
-import random
+import rng
 
 #-------------------------------------------------------------------------
 # Utility Tables
@@ -46,6 +46,12 @@ attr_table = [
 
 ]
 
+# Attribute rows indexed by name, and running sums of attribute rates
+# for sampling
+
+attr_dict = dict( [ ( attr[1], attr ) for attr in attr_table ] )
+attr_cum  = rng.gen_cumulative( [ attr[0] for attr in attr_table ] )
+
 # Opposites table for preventing bonuses that cancel
 
 opp_table = {
@@ -67,68 +73,44 @@ class Attribute:
 
   # Constructor
 
-  def __init__( self, age, name='' ):
+  def __init__( self, age, name='', _rng=None ):
 
     # Request specific attribute
 
     if name != '':
 
-      for attr in attr_table:
-
-        if attr[1] == name:
-
-          self.name           = attr[1]
-          self.physical_bonus = attr[2]
-          self.mental_bonus   = attr[3]
-          self.heal_bonus     = attr[4]
-          self.cure_bonus     = attr[5]
-          self.explore_bonus  = attr[6]
-          self.scavenge_bonus = attr[7]
-          self.day_bonus      = attr[8]
-          self.night_bonus    = attr[9]
-          self.job            = attr[10]
-
-          if name == 'Experienced':
-            self.physical_bonus = max( age - 30, 0 ) * 0.02
-            self.mental_bonus   = max( age - 30, 0 ) * 0.02
+      if name not in attr_dict:
+        print 'Error: invalid attribute name, ', name
+        return
 
-          return
-
-      print 'Error: invalid attribute name, ', name
+      attr = attr_dict[name]
 
     # Randomly roll attribute
 
     else:
 
-      prob = 0.0
-      roll = random.random()
-
-      for attr in attr_table:
-
-        if roll < ( prob + attr[0] ):
-
-          self.name           = attr[1]
-          self.physical_bonus = attr[2]
-          self.mental_bonus   = attr[3]
-          self.heal_bonus     = attr[4]
-          self.cure_bonus     = attr[5]
-          self.explore_bonus  = attr[6]
-          self.scavenge_bonus = attr[7]
-          self.day_bonus      = attr[8]
-          self.night_bonus    = attr[9]
-          self.job            = attr[10]
-
-          if name == 'Experienced':
-            self.physical_bonus = max( age - 30, 0 ) * 0.02
-            self.mental_bonus   = max( age - 30, 0 ) * 0.02
+      idx = rng.pick( attr_cum, _rng.survivor.random() )
 
-          return
+      if idx == None:
+        print 'Error: incomplete attribute probability range'
+        return
 
-        else:
+      attr = attr_table[idx]
 
-          prob += attr[0]
+    self.name           = attr[1]
+    self.physical_bonus = attr[2]
+    self.mental_bonus   = attr[3]
+    self.heal_bonus     = attr[4]
+    self.cure_bonus     = attr[5]
+    self.explore_bonus  = attr[6]
+    self.scavenge_bonus = attr[7]
+    self.day_bonus      = attr[8]
+    self.night_bonus    = attr[9]
+    self.job            = attr[10]
 
-      print 'Error: incomplete attribute probability range'
+    if name == 'Experienced':
+      self.physical_bonus = max( age - 30, 0 ) * 0.02
+      self.mental_bonus   = max( age - 30, 0 ) * 0.02
 
   # Overload == operator to return true if two attributes have the same
   # name or both are special jobs or attributes are opposites
@@ -164,3 +146,29 @@ class Attribute:
     print self.name, ': ', self.physical_bonus, ', ', self.mental_bonus, ', ', \
           self.heal_bonus, ', ', self.cure_bonus, ', ', self.explore_bonus, ', ', \
           self.scavenge_bonus, ', ', self.day_bonus, ', ', self.night_bonus
+
+#-------------------------------------------------------------------------
+# Combined Bonuses
+#-------------------------------------------------------------------------
+# Sum of the bonuses of a list of attributes. Survivors keep one of
+# these instead of adding up their attributes on every query.
+
+class Bonuses( object ):
+
+  __slots__ = (
+    'physical_bonus', 'mental_bonus', 'heal_bonus', 'cure_bonus',
+    'explore_bonus', 'scavenge_bonus', 'day_bonus', 'night_bonus',
+  )
+
+  # Constructor
+
+  def __init__( self, attributes ):
+
+    self.physical_bonus = sum( [ attr.physical_bonus for attr in attributes ] )
+    self.mental_bonus   = sum( [ attr.mental_bonus   for attr in attributes ] )
+    self.heal_bonus     = sum( [ attr.heal_bonus     for attr in attributes ] )
+    self.cure_bonus     = sum( [ attr.cure_bonus     for attr in attributes ] )
+    self.explore_bonus  = sum( [ attr.explore_bonus  for attr in attributes ] )
+    self.scavenge_bonus = sum( [ attr.scavenge_bonus for attr in attributes ] )
+    self.day_bonus      = sum( [ attr.day_bonus      for attr in attributes ] )
+    self.night_bonus    = sum( [ attr.night_bonus    for attr in attributes ] )
@@ -0,0 +1,433 @@
+#=========================================================================
+# autoplay.py
+#=========================================================================
+# Bots that play the game without a player. A policy is a function
+# called with the engine once per day and night phase, which must use up
+# every free survivor through the engine actions (explore, scavenge,
+# craft, rest and defend). The same policies drive the headless engine
+# and the rendered autoplay engine below, which draws every turn and the
+# transitions between them, so long soak runs can watch both the game
+# state and the frame times.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import collections
+import properties
+import engine
+import headless
+import mapgen
+import tile
+import fog
+import expedition
+import survivor
+import item
+import pathfind
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+STAMINA_MARGIN  = 2   # stamina kept after day actions for the night
+EXPLORE_RATIO   = 0.5 # fraction of max stamina needed to move on
+MOVE_GAIN       = 1.5 # yield gain needed for the scavenger to move on
+HOLD_FRAMES     = 4   # frames the result of each turn is shown for
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Items the turtle keeps in stock, in order of preference per item type
+
+craft_table = collections.OrderedDict( [
+  ( 'Defense', [ 'Barbed Fence', 'Barricade', 'Explosive Trap', 'Spike Trap', 'Pit Trap', 'Camouflage' ] ),
+  ( 'Weapon',  [ 'Machine Gun', 'Rifle', 'Pistol', 'Machete', 'Axe', 'Spear', 'Knife' ] ),
+  ( 'Armor',   [ 'Body Armor', 'C. Fiber Vest', 'Tribal Garb', 'Wooden Shield' ] ),
+] )
+
+#-------------------------------------------------------------------------
+# Helper Functions
+#-------------------------------------------------------------------------
+
+# Return stamina cost of a day action for given survivor
+
+def get_day_cost( _survivor, cost ):
+
+  return max( cost - _survivor.get_attributes().day_bonus, 0 )
+
+# Return free survivors that can afford a day action of given cost and
+# still keep a margin of stamina for the night
+
+def get_able( _expedition, cost ):
+
+  return [
+    _survivor for _survivor in _expedition.get_free()
+    if _survivor.stamina > get_day_cost( _survivor, cost ) + STAMINA_MARGIN
+  ]
+
+# Scavenge with every free survivor that can afford it and rest the
+# others
+
+def scavenge_or_rest( eng, _expedition ):
+
+  scavengers = get_able( _expedition, properties.SCAVENGE_COST )
+
+  if len( scavengers ) > 0:
+    eng.scavenge( _expedition, scavengers )
+
+  resters = _expedition.get_free()
+
+  if len( resters ) > 0:
+    eng.rest( _expedition, resters )
+
+# Return combined probability of finding resources and items on tile
+
+def get_tile_yield( _tile ):
+
+  return sum( [ _tile.get_rsrc_prob( i ) for i in range( len( _tile.proto.rsrc_probs ) ) ] )
+
+# Return tile reachable by the whole expedition with the lowest given
+# key, or None if the expedition cannot move on. The whole expedition
+# moves so the inventory is taken along.
+
+def find_destination( eng, _expedition, key ):
+
+  survivors = _expedition.get_free()
+
+  if len( survivors ) < len( _expedition.survivors ):
+    return None
+
+  for _survivor in survivors:
+    if _survivor.stamina < max( _survivor.max_stamina * EXPLORE_RATIO, 2 ):
+      return None
+
+  path_dic = pathfind.calc_range(
+    eng.map, _expedition.pos_tile, _expedition.calc_min_stamina( survivors )
+  )
+
+  # Ties are broken by cost and then by position, so the choice does
+  # not depend on the order of the path dictionary
+
+  dest_tile = None
+  dest_key  = None
+
+  for _tile, info in path_dic.iteritems():
+
+    if _tile == _expedition.pos_tile:
+      continue
+
+    tile_key = ( key( _tile ), info[1], _tile.pos_x, _tile.pos_y )
+
+    if ( dest_key == None ) or ( tile_key < dest_key ):
+      dest_tile = _tile
+      dest_key  = tile_key
+
+  return dest_tile
+
+# Return the smallest group of free survivors with the most mental bonus
+# able to craft given item, or None if no group can craft it
+
+def find_crafters( _expedition, _item ):
+
+  able = sorted(
+    get_able( _expedition, properties.CRAFT_COST ),
+    key=lambda _survivor: _survivor.get_mental_bonus(), reverse=True
+  )
+
+  for i in range( len( able ) ):
+    if _expedition.can_craft( _item, able[:i + 1] ):
+      return able[:i + 1]
+
+  return None
+
+# Return names of items the expedition is short of, in order of
+# preference. Defenses are stocked up to the defense limit, weapons and
+# armor up to one per defender.
+
+def get_wanted( _expedition ):
+
+  limits = {
+    'Defense' : properties.DEFENSE_LIMIT,
+    'Weapon'  : min( len( _expedition.survivors ), properties.DEFENDER_LIMIT ),
+    'Armor'   : min( len( _expedition.survivors ), properties.DEFENDER_LIMIT ),
+  }
+
+  wanted = []
+
+  for type, names in craft_table.iteritems():
+
+    count = len( [ _item for _item in _expedition._inventory.items if _item.type == type ] )
+
+    if count < limits[type]:
+      wanted += names
+
+  return wanted
+
+# Run day policy on every expedition with free survivors. Expeditions
+# are looked up again after each one since exploring can merge them.
+
+def play_day( eng, policy ):
+
+  _expedition = expedition.get_free_expedition()
+
+  while _expedition != None:
+    policy( eng, _expedition )
+    _expedition = expedition.get_free_expedition()
+
+#-------------------------------------------------------------------------
+# Policies
+#-------------------------------------------------------------------------
+
+# Greedy scavenger: scavenge the current tile until a revealed tile in
+# range promises a much better yield, then move the whole expedition
+# there. At night, defend the same way as the default script.
+
+def scavenger( eng ):
+
+  if not eng.day_en:
+    headless.default_script( eng )
+    return
+
+  def play( eng, _expedition ):
+
+    dest_tile = find_destination(
+      eng, _expedition,
+      lambda _tile: 0.0 if _tile.fog else -get_tile_yield( _tile )
+    )
+
+    if ( dest_tile != None ) and not dest_tile.fog \
+      and ( get_tile_yield( dest_tile ) > get_tile_yield( _expedition.pos_tile ) * MOVE_GAIN ):
+      eng.explore( _expedition, _expedition.get_free(), dest_tile )
+
+    else:
+      scavenge_or_rest( eng, _expedition )
+
+  play_day( eng, play )
+
+# Explorer: whenever the whole expedition is rested enough, move to the
+# tile in range that reveals the most fog, scavenging and resting
+# otherwise (or once nothing in range is left to reveal).
+
+def explorer( eng ):
+
+  if not eng.day_en:
+    headless.default_script( eng )
+    return
+
+  def play( eng, _expedition ):
+
+    view_range = _expedition.get_view_range()
+
+    dest_tile = find_destination(
+      eng, _expedition,
+      lambda _tile: -fog.count_fog( eng.map, _tile, view_range )
+    )
+
+    if ( dest_tile != None ) and ( fog.count_fog( eng.map, dest_tile, view_range ) > 0 ):
+      eng.explore( _expedition, _expedition.get_free(), dest_tile )
+
+    else:
+      scavenge_or_rest( eng, _expedition )
+
+  play_day( eng, play )
+
+# Turtle: never move, craft the defenses, weapons and armor the
+# expedition is short of, then scavenge for materials and rest.
+
+def turtle( eng ):
+
+  if not eng.day_en:
+    headless.default_script( eng )
+    return
+
+  def play( eng, _expedition ):
+
+    crafted = True
+
+    while crafted:
+
+      crafted = False
+
+      for name in get_wanted( _expedition ):
+
+        crafters = find_crafters( _expedition, item.Item( name ) )
+
+        if crafters != None:
+          crafted = eng.craft( _expedition, name, crafters )
+          break
+
+    scavenge_or_rest( eng, _expedition )
+
+  play_day( eng, play )
+
+# Policies, indexed by name
+
+policy_table = collections.OrderedDict( [
+  ( 'default',   headless.default_script ),
+  ( 'scavenger', scavenger ),
+  ( 'explorer',  explorer ),
+  ( 'turtle',    turtle ),
+] )
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+# Rendered engine played by a policy. Turns are taken with the actions
+# of the headless engine, while the map, expeditions, sidebar and day
+# transitions are drawn as usual. Once every expedition is lost a new
+# game is started, until the given number of days has been played
+# across all games.
+
+class AutoplayEngine( headless.HeadlessEngine ):
+
+  #.......................................................................
+  # Constructor
+  #.......................................................................
+  # The rendered engine is initialized instead of the headless one, so
+  # the windows and sprite groups exist. A frame rate of zero runs the
+  # game as fast as it can be drawn.
+
+  def __init__( self, policy, num_days=100, seed=None, profile=False,
+                fps=properties.FPS, track=False ):
+
+    engine.Engine.__init__( self, seed, profile, track )
+
+    self.reset_stats()
+
+    self.policy      = policy
+    self.num_days    = num_days
+    self.fps         = fps
+    self.hold_count  = 0
+    self.days_played = 0
+    self.num_games   = 1
+
+  #.......................................................................
+  # Initialize map
+  #.......................................................................
+
+  def init_map( self, map ):
+
+    engine.Engine.init_map( self, map )
+
+  #.......................................................................
+  # Start new game
+  #.......................................................................
+  # Replace the lost game with a new one on a new map, counting the day
+  # it was lost on as played
+
+  def new_game( self ):
+
+    self.days_played += self.sidebar_window.time_count
+    self.num_games   += 1
+
+    self.expeditions_group.empty()
+
+    survivor.reset_names()
+    expedition.reset_index()
+
+    self.mg = mapgen.MapGen( properties.MAP_SIZE, self._rng )
+    self.init_map( self.mg.map )
+    self.init_expedition()
+
+    self.done                      = False
+    self.day_en                    = True
+    self.sidebar_window.day_en     = True
+    self.sidebar_window.time_count = 1
+    self.phase                     = engine.PHASE_LOOK
+    self.menu_en                   = False
+    self.cam_en                    = True
+    self.transition_alpha          = 255
+
+    tile.set_night_alpha( self.transition_alpha )
+
+  #.......................................................................
+  # Save and load game
+  #.......................................................................
+
+  def save_game( self, path ):
+
+    engine.Engine.save_game( self, path )
+
+  def load_game( self, path ):
+
+    engine.Engine.load_game( self, path )
+
+    self.done = len( self.expeditions ) == 0
+
+  #.......................................................................
+  # Turn handling
+  #.......................................................................
+
+  # The done button is pressed by the policy instead
+
+  def handle_done( self ):
+
+    return False
+
+  # The policy plays a turn every few frames without any input, so the
+  # idle loop never waits for longer than a frame
+
+  def get_idle_frames( self ):
+
+    return 1
+
+  # Return number of days played across all games
+
+  def get_days( self ):
+
+    return self.days_played + self.sidebar_window.time_count - 1
+
+  # Play a turn with the policy once the previous one has been shown
+
+  def handle_phase_look( self ):
+
+    if self.hold_count < HOLD_FRAMES:
+      self.hold_count += 1
+      return False
+
+    self.hold_count = 0
+
+    if self.get_days() >= self.num_days:
+      self.done = True
+      return False
+
+    self.policy( self )
+
+    if not self.done:
+      self.end_turn()
+
+    if self.done:
+      self.new_game()
+
+    return False
+
+  # Finish current day or night once every survivor has acted, then
+  # transition to the next phase and follow the first expedition
+
+  def end_turn( self ):
+
+    for _expedition in self.expeditions:
+      assert( len( _expedition.get_free() ) == 0 )
+
+    if self.day_en:
+      self.eat_food()
+
+    if self.done:
+      return
+
+    self.phase   = engine.PHASE_TRANSITION
+    self.menu_en = False
+    self.cam_en  = False
+
+    self.center_camera( self.expeditions[0].pos_tile )
+
+  #.......................................................................
+  # Start game engine
+  #.......................................................................
+  # Returns number of days played across all games
+
+  def start( self, load_path=None ):
+
+    engine.Engine.start( self, load_path )
+
+    return self.get_days()
@@ -0,0 +1,302 @@
+#=========================================================================
+# batch.py
+#=========================================================================
+# Batch runner for balance sweeps. Plays many headless games with a
+# scripted policy across a pool of worker processes and summarizes the
+# outcome of every parameter set. Parameters are overridden by path:
+# a bare name refers to properties.py, while a dotted path reaches into
+# the tables of other modules, with table keys and list indices as the
+# following parts:
+#
+#   python batch.py --games 1000 --set RSRC_REDUC_RATE=0.8 \
+#     --sweep STARVE_RATE=[0.1,0.2] --sweep "enemy.enemy_table.Panther.0=[10,20]"
+#
+# Every parameter set plays the same seeds, so differences between sets
+# come from the parameters rather than from luck.
+
+import argparse
+import ast
+import collections
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+import types
+import properties
+import rng
+import tile
+import attribute
+import headless
+import autoplay
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Summary columns, in display order
+
+STAT_NAMES = [ 'rescued', 'crafted', 'encounters', 'killed', 'starved' ]
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Split override path into the object holding the value and the final
+# key. Numeric parts index into lists.
+
+def resolve( path ):
+
+  parts = path.split( '.' )
+
+  if len( parts ) == 1:
+    parts = [ 'properties' ] + parts
+
+  obj = __import__( parts[0] )
+
+  keys = []
+
+  for part in parts[1:]:
+    keys.append( int( part ) if part.isdigit() else part )
+
+  for key in keys[:-1]:
+    obj = getattr( obj, key ) if isinstance( obj, types.ModuleType ) else obj[key]
+
+  return obj, keys[-1]
+
+# Read value at override path
+
+def get_value( path ):
+
+  obj, key = resolve( path )
+
+  if isinstance( obj, types.ModuleType ):
+    return getattr( obj, key )
+
+  return obj[key]
+
+# Write value at override path
+
+def set_value( path, value ):
+
+  obj, key = resolve( path )
+
+  if isinstance( obj, types.ModuleType ):
+    setattr( obj, key, value )
+  else:
+    obj[key] = value
+
+# Rebuild everything derived from the tables at import time, so table
+# overrides take effect
+
+def refresh_tables():
+
+  tile.terrain_protos.clear()
+
+  attribute.attr_dict = dict( [ ( attr[1], attr ) for attr in attribute.attr_table ] )
+  attribute.attr_cum  = rng.gen_cumulative( [ attr[0] for attr in attribute.attr_table ] )
+
+# Apply overrides, given as a list of ( path, value ). Returns the
+# overrides that undo them.
+
+def apply_overrides( overrides ):
+
+  undo = []
+
+  for path, value in overrides:
+    undo.append( ( path, get_value( path ) ) )
+    set_value( path, value )
+
+  refresh_tables()
+
+  undo.reverse()
+
+  return undo
+
+# Play one game in a worker process. The overrides are undone afterwards
+# since each worker plays many games with different parameters.
+
+def play_game( task ):
+
+  set_idx, seed, overrides, policy, num_days = task
+
+  undo = apply_overrides( overrides )
+
+  try:
+
+    eng  = headless.HeadlessEngine( seed )
+    days = eng.start( num_days, autoplay.policy_table[policy] )
+
+    result = dict( eng.stats )
+
+    result['set']       = set_idx
+    result['days']      = days
+    result['survived']  = not eng.done
+    result['survivors'] = sum( [ len( _expedition.survivors ) for _expedition in eng.expeditions ] )
+
+    return result
+
+  finally:
+    apply_overrides( undo )
+
+# Return list of parameter sets, the fixed overrides combined with every
+# combination of swept values
+
+def get_sets( fixed, sweeps ):
+
+  names  = [ path for path, values in sweeps ]
+  combos = itertools.product( *[ values for path, values in sweeps ] )
+
+  return [ fixed + zip( names, combo ) for combo in combos ]
+
+# Parse PATH=VALUE option. The value is a Python literal, or a string if
+# it does not parse as one.
+
+def parse_override( option ):
+
+  path, text = option.split( '=', 1 )
+
+  try:
+    value = ast.literal_eval( text )
+  except ( ValueError, SyntaxError ):
+    value = text
+
+  get_value( path )
+
+  return path, value
+
+# Return mean of given values
+
+def calc_mean( values ):
+
+  return float( sum( values ) ) / max( len( values ), 1 )
+
+# Summarize results of every parameter set as a list of rows
+
+def summarize( sets, results ):
+
+  rows = []
+
+  for set_idx, overrides in enumerate( sets ):
+
+    games = [ result for result in results if result['set'] == set_idx ]
+    days  = sorted( [ game['days'] for game in games ] )
+
+    row = collections.OrderedDict()
+
+    row['params']   = ' '.join( [ '%s=%r' % ( path, value ) for path, value in overrides ] ) or '-'
+    row['games']    = len( games )
+    row['days']     = calc_mean( days )
+    row['p10']      = days[len( days ) / 10] if len( days ) > 0 else 0
+    row['p50']      = days[len( days ) / 2]  if len( days ) > 0 else 0
+    row['p90']      = days[len( days ) * 9 / 10] if len( days ) > 0 else 0
+    row['survived'] = calc_mean( [ game['survived'] for game in games ] )
+
+    for name in STAT_NAMES:
+      row[name] = calc_mean( [ game[name] for game in games ] )
+
+    rows.append( row )
+
+  return rows
+
+# Print summary rows as a table
+
+def print_summary( rows ):
+
+  print '%-40s %6s %7s %5s %5s %5s %6s' % ( 'params', 'games', 'days', 'p10', 'p50', 'p90', 'alive' ), \
+        ' '.join( [ '%10s' % name for name in STAT_NAMES ] )
+
+  for row in rows:
+    print '%-40s %6d %7.2f %5d %5d %5d %6.2f' % (
+      row['params'][:40], row['games'], row['days'], row['p10'], row['p50'], row['p90'], row['survived']
+    ), ' '.join( [ '%10.2f' % row[name] for name in STAT_NAMES ] )
+
+# Write summary rows to given path, as JSON if the path ends in .json and
+# as CSV otherwise
+
+def dump( path, rows ):
+
+  if path.endswith( '.json' ):
+
+    with open( path, 'w' ) as out:
+      json.dump( rows, out, indent=2 )
+
+  else:
+
+    with open( path, 'wb' ) as out:
+
+      writer = csv.writer( out )
+      writer.writerow( rows[0].keys() )
+
+      for row in rows:
+        writer.writerow( row.values() )
+
+#-------------------------------------------------------------------------
+# Main Function
+#-------------------------------------------------------------------------
+
+def main():
+
+  # Parse command line options
+
+  parser = argparse.ArgumentParser( description='Obelisk batch runner' )
+
+  parser.add_argument( '--games', type=int, default=100,
+                       help='number of games per parameter set' )
+  parser.add_argument( '--days', type=int, default=100,
+                       help='maximum number of days per game' )
+  parser.add_argument( '--seed', type=int, default=0,
+                       help='seed of the first game, later games count up from it' )
+  parser.add_argument( '--policy', default='default', choices=autoplay.policy_table.keys(),
+                       help='scripted policy playing the games' )
+  parser.add_argument( '--set', action='append', default=[], metavar='PATH=VALUE',
+                       help='override parameter for every game' )
+  parser.add_argument( '--sweep', action='append', default=[], metavar='PATH=[VALUES]',
+                       help='play every game once per listed value' )
+  parser.add_argument( '--jobs', type=int, default=multiprocessing.cpu_count(),
+                       help='number of worker processes' )
+  parser.add_argument( '--out', default=None, metavar='PATH',
+                       help='write summary to PATH, as JSON if it ends in .json or CSV otherwise' )
+
+  args = parser.parse_args()
+
+  fixed  = [ parse_override( option ) for option in args.set ]
+  sweeps = [ parse_override( option ) for option in args.sweep ]
+
+  for path, values in sweeps:
+    assert( isinstance( values, list ) )
+
+  sets = get_sets( fixed, sweeps )
+
+  tasks = [
+    ( set_idx, args.seed + i, overrides, args.policy, args.days )
+    for set_idx, overrides in enumerate( sets )
+    for i in range( args.games )
+  ]
+
+  # Play games, each worker takes games in small chunks to keep every
+  # process busy until the end
+
+  start = time.time()
+
+  if args.jobs > 1:
+    pool    = multiprocessing.Pool( args.jobs )
+    results = list( pool.imap_unordered( play_game, tasks, chunksize=8 ) )
+    pool.close()
+    pool.join()
+  else:
+    results = [ play_game( task ) for task in tasks ]
+
+  rows = summarize( sets, results )
+
+  print_summary( rows )
+
+  print len( tasks ), 'games in %.1f s' % ( time.time() - start )
+
+  if args.out != None:
+    dump( args.out, rows )
+
+# Execute main function
+
+if __name__ == '__main__':
+   main()
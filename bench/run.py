@@ -0,0 +1,469 @@
+#=========================================================================
+# run.py
+#=========================================================================
+# Benchmark suite for the game. Covers map generation, path finding, fog
+# reveals, text box updates, full frame draws and a simulated day cycle.
+# Runs without a display using the dummy SDL video driver, and writes the
+# results as JSON so they can be compared across commits:
+#
+#   python bench/run.py --out before.json
+#   python bench/run.py --out after.json --compare before.json
+#
+# Every benchmark is seeded, so the same commit always does the same
+# work. Times are in milliseconds per call.
+
+import os, sys
+
+os.environ.setdefault( 'SDL_VIDEODRIVER', 'dummy' )
+os.environ.setdefault( 'SDL_AUDIODRIVER', 'dummy' )
+
+# Assets are loaded from paths relative to the repository root
+
+ROOT = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+sys.path.insert( 0, ROOT )
+os.chdir( ROOT )
+
+import pygame
+from pygame.locals import *
+
+import argparse
+import collections
+import json
+import platform
+import subprocess
+import time
+import properties
+import assets
+import utils
+import rng
+import mapgen
+import pathfind
+import fog
+import textbox
+import engine
+import headless
+import survivor
+import expedition
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+SEED = 1
+
+MAPGEN_SIZES    = [ 16, 32, 64, 128 ]
+PATH_MAP_SIZE   = 64
+PATH_STAMINAS   = [ 5, 10, 20, 40 ]
+VIEW_RANGES     = [ 1, 2, 4, 8, 16 ]
+TEXTBOX_ROWS    = [ 10, 100, 1000, 10000 ]
+FRAME_REPEAT    = 120
+DAY_COUNTS      = [ 1, 30 ]
+DAY_REPEAT      = 5
+
+#-------------------------------------------------------------------------
+# Harness
+#-------------------------------------------------------------------------
+
+# Benchmarks, indexed by group name
+
+bench_table = collections.OrderedDict()
+
+# Decorator to register a benchmark group. Each group is a generator
+# yielding one result per parameter value.
+
+def register( name ):
+
+  def wrap( func ):
+    bench_table[name] = func
+    return func
+
+  return wrap
+
+# Time given function over a number of calls. The setup function is
+# called untimed before each call, and its return value is passed on.
+# If a unit is given, the function returns the work it did in that unit,
+# which is reported along with the times. Returns a result row with the
+# statistics of the call times.
+
+def measure( name, params, func, setup=None, repeat=10, unit=None ):
+
+  times = []
+
+  for i in range( repeat ):
+
+    arg = setup() if setup != None else None
+
+    start = time.time()
+    work  = func( arg )
+    times.append( ( time.time() - start ) * 1000.0 )
+
+  times.sort()
+
+  row = collections.OrderedDict()
+
+  row['name']   = name
+  row['params'] = params
+  row['repeat'] = repeat
+  row['min']    = times[0]
+  row['median'] = times[len( times ) / 2]
+  row['mean']   = sum( times ) / len( times )
+  row['max']    = times[-1]
+
+  if unit != None:
+    row['work'] = work
+    row['unit'] = unit
+
+  return row
+
+# Return key identifying a result row across runs
+
+def get_key( row ):
+
+  return row['name'] + ''.join(
+    [ ' %s=%s' % ( key, row['params'][key] ) for key in sorted( row['params'] ) ]
+  )
+
+# Return headless engine with an expedition on a generated map of given
+# size
+
+def make_headless( size ):
+
+  eng    = headless.HeadlessEngine( SEED )
+  eng.mg = mapgen.MapGen( size, eng._rng )
+
+  eng.init_map( eng.mg.map )
+  eng.init_expedition()
+
+  return eng
+
+# Return headless engine with a generated map of given size for a game
+# played with the given seed. The expedition is only created once the
+# game is played, see play_game().
+
+def make_game( size, seed ):
+
+  eng    = headless.HeadlessEngine( seed )
+  eng.mg = mapgen.MapGen( size, eng._rng )
+
+  return eng
+
+# Play game made with make_game() with the default script for up to the
+# given number of days. Survivor names and the expedition index are
+# shared by all engines, so they are reset for each game. Returns the
+# days simulated, counting the day the game was lost on.
+
+def play_game( eng, num_days ):
+
+  survivor.reset_names()
+  expedition.reset_index()
+
+  eng.init_map( eng.mg.map )
+  eng.init_expedition()
+  eng.run( num_days )
+
+  if eng.done:
+    return eng.time_count
+
+  return eng.time_count - 1
+
+# Return engine with an expedition on a generated map
+
+def make_engine():
+
+  eng    = engine.Engine( SEED )
+  eng.mg = mapgen.MapGen( properties.MAP_SIZE, eng._rng )
+
+  eng.init_map( eng.mg.map )
+  eng.init_expedition()
+
+  return eng
+
+#-------------------------------------------------------------------------
+# Benchmarks
+#-------------------------------------------------------------------------
+
+# Map generation for several map sizes
+
+@register( 'mapgen' )
+def bench_mapgen():
+
+  for size in MAPGEN_SIZES:
+
+    yield measure(
+      'mapgen', { 'size' : size },
+      lambda _rng: mapgen.MapGen( size, _rng ),
+      lambda: rng.GameRNG( SEED ),
+      repeat=max( 1024 / size, 3 )
+    )
+
+# Reachable range and shortest path of an expedition at several stamina
+# values. Ranges are timed both without and with the range cache.
+
+@register( 'path' )
+def bench_path():
+
+  eng         = make_headless( PATH_MAP_SIZE )
+  _expedition = eng.expeditions[0]
+  survivors   = _expedition.survivors
+
+  for stamina in PATH_STAMINAS:
+
+    for _survivor in survivors:
+      _survivor.stamina = stamina
+
+    yield measure(
+      'calc_range', { 'stamina' : stamina, 'cache' : 'cold' },
+      lambda arg: _expedition.calc_range( survivors ),
+      lambda: pathfind.range_cache.clear()
+    )
+
+    yield measure(
+      'calc_range', { 'stamina' : stamina, 'cache' : 'warm' },
+      lambda arg: _expedition.calc_range( survivors ),
+      repeat=100
+    )
+
+    # Path to the farthest reachable tile
+
+    path_dic  = pathfind.calc_range( eng.map, _expedition.pos_tile, stamina )
+    dest_tile = max( path_dic, key=lambda _tile: path_dic[_tile][1] )
+
+    yield measure(
+      'calc_path', { 'stamina' : stamina },
+      lambda arg: _expedition.calc_path( dest_tile, survivors )
+    )
+
+# Fog reveal around an expedition on a fully fogged map at several view
+# ranges
+
+@register( 'unfog' )
+def bench_unfog():
+
+  eng         = make_headless( PATH_MAP_SIZE )
+  _expedition = eng.expeditions[0]
+
+  def setup():
+
+    for column in eng.map:
+      for _tile in column:
+        _tile.fog = True
+
+    fog.fog_state['map'] = None
+    fog.get_bits( eng.map )
+
+  for view_range in VIEW_RANGES:
+
+    _expedition.view_range = view_range
+
+    yield measure(
+      'unfog', { 'view_range' : view_range },
+      lambda arg: _expedition.unfog(),
+      setup, repeat=20
+    )
+
+# Text box updates with a given number of rows, when every row changes,
+# when nothing changes and when scrolling through the rows
+
+@register( 'textbox' )
+def bench_textbox():
+
+  counter = [ 0 ]
+
+  def get_matrix( num_rows ):
+    counter[0] += 1
+    return [ [ 'ROW %d UPDATE %d' % ( i, counter[0] ) for i in range( num_rows ) ] ]
+
+  for num_rows in TEXTBOX_ROWS:
+
+    tbox = textbox.TextBox(
+      properties.ACTION_SUB_WIDTH, properties.ACTION_SUB_HEIGHT,
+      0, 0, 0, 0, 14, utils.WHITE
+    )
+
+    yield measure(
+      'textbox_update', { 'rows' : num_rows, 'mode' : 'changed' },
+      lambda text_matrix: tbox.update( text_matrix ),
+      lambda: get_matrix( num_rows ), repeat=50
+    )
+
+    text_matrix = get_matrix( num_rows )
+    tbox.update( text_matrix )
+
+    yield measure(
+      'textbox_update', { 'rows' : num_rows, 'mode' : 'idle' },
+      lambda arg: tbox.update( text_matrix ), repeat=50
+    )
+
+    def scroll():
+      tbox.scroll_y = ( tbox.scroll_y + properties.SCROLL_SPEED ) \
+                      % max( tbox.max_scroll_y - tbox.rect.height, 1 )
+
+    yield measure(
+      'textbox_update', { 'rows' : num_rows, 'mode' : 'scroll' },
+      lambda arg: tbox.update( text_matrix ),
+      scroll, repeat=50
+    )
+
+# Full frame draws while the camera scrolls across the map and while the
+# day fades into night and back
+
+@register( 'frame' )
+def bench_frame():
+
+  eng   = make_engine()
+  max_x = properties.MAP_WIDTH - properties.CAMERA_WIDTH
+  step  = [ properties.SCROLL_SPEED ]
+
+  def scroll():
+
+    if ( eng.cam_x + step[0] < 0 ) or ( eng.cam_x + step[0] > max_x ):
+      step[0] = -step[0]
+
+    eng.cam_x += step[0]
+
+  def draw( arg ):
+    eng.update_all()
+    eng.draw_all()
+
+  yield measure(
+    'draw_all', { 'mode' : 'scroll' },
+    draw, scroll, repeat=FRAME_REPEAT
+  )
+
+  def transition():
+
+    if eng.phase != engine.PHASE_TRANSITION:
+      eng.phase = engine.PHASE_TRANSITION
+
+    eng.handle_phase_transition()
+
+  yield measure(
+    'draw_all', { 'mode' : 'transition' },
+    draw, transition, repeat=FRAME_REPEAT
+  )
+
+# Full days and nights of the default headless script. Games are often
+# lost within a week, so a new game is started with the next seed until
+# the requested number of days has been simulated. Maps are generated
+# untimed, the expeditions of each game are created in the timed call.
+
+@register( 'day' )
+def bench_day():
+
+  for num_days in DAY_COUNTS:
+
+    # Seeded games always last as long, so the seeds needed are found
+    # with an untimed run
+
+    seeds = []
+    days  = 0
+
+    while days < num_days:
+      seeds.append( SEED + len( seeds ) )
+      days += play_game( make_game( properties.MAP_SIZE, seeds[-1] ), num_days - days )
+
+    def setup():
+      return [ make_game( properties.MAP_SIZE, seed ) for seed in seeds ]
+
+    def play( games ):
+
+      days = 0
+
+      for eng in games:
+        days += play_game( eng, num_days - days )
+
+      return days
+
+    yield measure(
+      'day_cycle', { 'days' : num_days }, play, setup,
+      repeat=DAY_REPEAT, unit='days'
+    )
+
+#-------------------------------------------------------------------------
+# Main Function
+#-------------------------------------------------------------------------
+
+# Return commit hash of the working tree, or None outside of a git tree
+
+def get_commit():
+
+  try:
+    return subprocess.check_output(
+      [ 'git', 'rev-parse', '--short', 'HEAD' ], stderr=open( os.devnull, 'w' )
+    ).strip()
+  except ( OSError, subprocess.CalledProcessError ):
+    return None
+
+def main():
+
+  # Parse command line options
+
+  parser = argparse.ArgumentParser( description='Obelisk benchmarks' )
+
+  parser.add_argument( '--out', default=None, metavar='PATH',
+                       help='write results as JSON to PATH' )
+  parser.add_argument( '--only', default=None, nargs='+', choices=bench_table.keys(),
+                       help='run only the given benchmark groups' )
+  parser.add_argument( '--compare', default=None, metavar='PATH',
+                       help='compare median times against results in PATH' )
+
+  args = parser.parse_args()
+
+  baseline = {}
+
+  if args.compare != None:
+    with open( args.compare ) as old:
+      baseline = dict( [ ( get_key( row ), row ) for row in json.load( old )['results'] ] )
+
+  # Initialize pygame with a dummy display
+
+  pygame.init()
+  pygame.display.set_mode( ( properties.WINDOW_WIDTH, properties.WINDOW_HEIGHT ) )
+
+  assets.preload()
+
+  # Run benchmarks
+
+  results = []
+
+  for name, func in bench_table.iteritems():
+
+    if ( args.only != None ) and ( name not in args.only ):
+      continue
+
+    for row in func():
+
+      key  = get_key( row )
+      line = '%-44s median %9.3f ms  min %9.3f ms' % ( key, row['median'], row['min'] )
+
+      if 'unit' in row:
+        line += '  %d %s' % ( row['work'], row['unit'] )
+
+      if key in baseline:
+        line += '  x%.2f' % ( row['median'] / max( baseline[key]['median'], 1e-6 ) )
+
+      print line
+      sys.stdout.flush()
+
+      results.append( row )
+
+  # Write results
+
+  if args.out != None:
+
+    report = collections.OrderedDict()
+
+    report['commit']  = get_commit()
+    report['time']    = time.strftime( '%Y-%m-%dT%H:%M:%S' )
+    report['python']  = platform.python_version()
+    report['pygame']  = pygame.version.ver
+    report['results'] = results
+
+    with open( args.out, 'w' ) as out:
+      json.dump( report, out, indent=2 )
+
+# Execute main function
+
+if __name__ == '__main__':
+   main()
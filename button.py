@@ -9,6 +9,7 @@ from pygame.locals import *
 
 import properties
 import utils
+import assets
 
 #-------------------------------------------------------------------------
 # Main Class
@@ -25,7 +26,7 @@ class Button( pygame.sprite.Sprite ):
     # Set button background image
 
     self.img_path     = properties.BUTTON_PATH
-    self.image        = pygame.image.load( self.img_path )
+    self.image        = assets.copy_image( self.img_path )
     self.rect         = self.image.get_rect()
     self.pos_x        = pos_x
     self.pos_y        = pos_y
@@ -0,0 +1,298 @@
+#=========================================================================
+# combat.py
+#=========================================================================
+# Combat rules for night encounters, without any user interface. The
+# defend window plays these rules out with animations, the headless
+# engine resolves encounters directly, and the simulator estimates the
+# odds of an encounter by resolving many copies of it.
+
+import copy
+import properties
+import rng
+import enemy
+import attribute
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Fraction of the enemy stamina dealt by each trap
+
+trap_table = {
+  'Pit Trap'       : 0.25,
+  'Spike Trap'     : 0.50,
+  'Explosive Trap' : 0.75,
+}
+
+# Enemy spawn multiplier of each ward (only the strongest one counts)
+
+ward_table = {
+  'Camouflage' : 0.50,
+  'Bone Ward'  : 0.01,
+}
+
+# Hit bar positions, indexed by hit bar speed
+
+hit_bar_table = {}
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+HIT_SPEED = 0.05
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Return the trap damage ratio, enemy spawn multiplier, number of stuns
+# and extra armor granted by given defenses
+
+def get_defense_effects( defenses ):
+
+  dmg   = 0.0
+  spawn = 1.0
+  stun  = 0
+  armor = 0
+
+  for defense in defenses:
+
+    if defense.name in trap_table:
+      dmg += trap_table[defense.name]
+
+    elif defense.name in ward_table:
+      spawn = min( ward_table[defense.name], spawn )
+
+    elif defense.name == 'Flashbang':
+      stun += 1
+
+    elif ( defense.name == 'Barricade' ) or ( defense.name == 'Barbed Fence' ):
+      armor = defense.armor
+
+  return dmg, spawn, stun, armor
+
+# Return survivors and enemy in order of decreasing speed
+
+def get_turn_order( survivors, _enemy ):
+
+  return sorted(
+    survivors + [ _enemy ], key=lambda unit: unit.get_speed(), reverse=True
+  )
+
+# Return hit bar speed, faster enemies are harder to hit
+
+def get_hit_bar_speed( _enemy ):
+
+  return HIT_SPEED + ( _enemy.speed * 0.02 )
+
+# Return hit bar ratio needed for survivor to hit, mental bonus of
+# survivor wielding weapon lowers limit
+
+def get_hit_bar_limit( _survivor ):
+
+  return _survivor.weapon.difficulty - ( _survivor.get_mental_bonus() * 0.02 )
+
+# Stop the oscillating hit bar at a random position. The bar moves from
+# empty to full in steps of the given speed before wrapping around, so
+# every step is equally likely.
+
+def roll_hit_bar( speed, _rng ):
+
+  if speed not in hit_bar_table:
+
+    positions = [ 0.00 ]
+
+    while positions[-1] < 1.00:
+      positions.append( min( positions[-1] + speed, 1.00 ) )
+
+    hit_bar_table[speed] = positions
+
+  return _rng.player.choice( hit_bar_table[speed] )
+
+# Pay ammo and stamina costs of survivor attack. Ammo is taken from the
+# inventory right away, while the stamina is only spent if the attack
+# hits. Returns whether there was not enough ammo, whether there was not
+# enough stamina, and the survivor stamina after a hit.
+
+def pay_attack_cost( _survivor, _inventory ):
+
+  # If attacker is military, then halve the ammo cost
+
+  ammo_cost = _survivor.weapon.ammo_cost
+
+  if _survivor.job == attribute.SOLDIER:
+    ammo_cost = max( int( ammo_cost * 0.5 ), 1 )
+
+  # Consume ammo if using a gun
+
+  no_ammo = False
+
+  if _inventory.ammo < ammo_cost:
+    no_ammo = True
+
+  elif ammo_cost > 0:
+    _inventory.ammo -= ammo_cost
+
+  # If attacker is mystic, then halve the stamina cost
+
+  stamina_cost = _survivor.weapon.stam_cost
+
+  if _survivor.job == attribute.MYSTIC:
+    stamina_cost = max( int( stamina_cost * 0.5 ), 1 )
+
+  # Consume stamina if using cursed weapon
+
+  no_stamina    = False
+  curse_stamina = _survivor.stamina
+
+  if _survivor.stamina <= stamina_cost:
+    no_stamina = True
+
+  elif stamina_cost > 0:
+    curse_stamina -= stamina_cost
+
+  return no_ammo, no_stamina, curse_stamina
+
+# Resolve an encounter against an enemy that already appeared. The hit
+# bar is stopped at a random position on each player turn. Survivor
+# stamina, enemy stamina and inventory ammo are updated in place. Returns
+# true if the enemy was defeated. Encounters where neither side can deal
+# damage would never end, so they are lost once the enemy has taken the
+# maximum number of turns.
+
+def fight( survivors, _enemy, defenses, _inventory, _rng ):
+
+  defense_dmg, defense_spawn, defense_stun, defense_armor = get_defense_effects( defenses )
+
+  turn_order    = get_turn_order( survivors, _enemy )
+  turn_idx      = 0
+  num_rounds    = 0
+  hit_bar_speed = get_hit_bar_speed( _enemy )
+
+  # Trigger traps
+
+  if defense_dmg > 0.0:
+    _enemy.stamina = max( _enemy.stamina - int( defense_dmg * _enemy.max_stamina ), 0 )
+
+  # Alternate turns until either side is dead
+
+  while _enemy.stamina > 0:
+
+    unit = turn_order[turn_idx]
+
+    # Enemy turn
+
+    if unit == _enemy:
+
+      if num_rounds == properties.COMBAT_MAX_ROUNDS:
+        return False
+
+      num_rounds += 1
+
+      target_survivor, target_dmg = _enemy.attack( survivors )
+
+      target_dmg = max( target_dmg - defense_armor, 0 )
+
+      # Attacks that deal no damage do not use up a stun, in the same
+      # order as the defend window
+
+      if target_dmg == 0:
+        pass
+
+      elif defense_stun > 0:
+        defense_stun -= 1
+
+      else:
+        target_survivor.stamina = max( target_survivor.stamina - target_dmg, 0 )
+
+      alive = False
+
+      for _survivor in survivors:
+        if _survivor.stamina > 0:
+          alive = True
+
+      if not alive:
+        return False
+
+    # Player turn
+
+    else:
+
+      no_ammo, no_stamina, curse_stamina = pay_attack_cost( unit, _inventory )
+
+      hit_bar_ratio = roll_hit_bar( hit_bar_speed, _rng )
+
+      if hit_bar_ratio >= get_hit_bar_limit( unit ):
+
+        target_dmg = unit.attack( _enemy, hit_bar_ratio == 1.00, no_ammo or no_stamina )
+
+        if target_dmg > 0:
+          _enemy.stamina = max( _enemy.stamina - target_dmg, 0 )
+          unit.stamina   = curse_stamina
+
+    # Move onto the next living unit
+
+    turn_idx = ( turn_idx + 1 ) % len( turn_order )
+
+    while turn_order[turn_idx].stamina == 0:
+      turn_idx = ( turn_idx + 1 ) % len( turn_order )
+
+  return True
+
+# Resolve one encounter per given enemy name (None if no enemy appears)
+# on copies of the survivors and inventory, so the real ones are left
+# untouched. The copies share equipment and attributes with the
+# originals and only differ in stamina, ammo and random stream. Returns
+# the ratio of encounters won and the average number of survivors lost.
+
+def simulate( survivors, enemy_names, defenses, _inventory, _rng ):
+
+  wins       = 0
+  casualties = 0
+
+  for name in enemy_names:
+
+    if name == None:
+      wins += 1
+      continue
+
+    party = []
+
+    for _survivor in survivors:
+      clone      = copy.copy( _survivor )
+      clone._rng = _rng
+      party.append( clone )
+
+    if fight( party, enemy.Enemy( name, _rng ), defenses, copy.copy( _inventory ), _rng ):
+      wins += 1
+
+    for clone in party:
+      if clone.stamina == 0:
+        casualties += 1
+
+  num_trials = max( len( enemy_names ), 1 )
+
+  return float( wins ) / num_trials, float( casualties ) / num_trials
+
+# Estimate odds of defending given tile, with enemies drawn from the
+# spawn rates of the tile. The simulation uses its own random stream
+# seeded the same way every time, so the odds only change when the party,
+# equipment or defenses change.
+
+def simulate_tile( survivors, _tile, defenses, _inventory,
+                   num_trials=properties.COMBAT_SIM_TRIALS, seed=0 ):
+
+  _rng = rng.GameRNG( seed )
+
+  enemy_names = _tile.roll_enemy_n( num_trials, get_defense_effects( defenses )[1], _rng )
+
+  return simulate( survivors, enemy_names, defenses, _inventory, _rng )
+
+# Estimate odds of defeating a given enemy
+
+def simulate_enemy( survivors, name, defenses, _inventory,
+                    num_trials=properties.COMBAT_SIM_TRIALS, seed=0 ):
+
+  _rng = rng.GameRNG( seed )
+
+  return simulate( survivors, [ name ] * num_trials, defenses, _inventory, _rng )
@@ -155,37 +155,31 @@ class ComboWindow( window.Window ):
 
       # Free survivors
 
-      for _survivor, rect in zip( self._expedition.get_free(), self.old_tbox.rect_matrix[0] ):
+      _survivor = self.old_tbox.get_item( self._expedition.get_free(), mouse_x, mouse_y )
 
-        # Determine if mouse is hovering over survivor
+      if _survivor != None:
 
-        if rect.collidepoint( mouse_x, mouse_y ) \
-          and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+        self._survivor = _survivor
 
-          self._survivor = _survivor
+        # Move selected survivors to selected column
 
-          # Move selected survivors to selected column
-
-          if mouse_click:
-            _survivor.free = False
-            self.survivors.append( _survivor )
+        if mouse_click:
+          _survivor.free = False
+          self.survivors.append( _survivor )
 
       # Selected survivors
 
-      for _survivor, rect in zip( self.survivors, self.new_tbox.rect_matrix[0] ):
-
-        # Determine if mouse is hovering over survivor
+      _survivor = self.new_tbox.get_item( self.survivors, mouse_x, mouse_y )
 
-        if rect.collidepoint( mouse_x, mouse_y ) \
-          and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      if _survivor != None:
 
-          self._survivor = _survivor
+        self._survivor = _survivor
 
-          # Move deselected survivors to free column
+        # Move deselected survivors to free column
 
-          if mouse_click:
-            _survivor.free = True
-            self.survivors.remove( _survivor )
+        if mouse_click:
+          _survivor.free = True
+          self.survivors.remove( _survivor )
 
     # Determine item info to display
 
@@ -196,78 +190,72 @@ class ComboWindow( window.Window ):
       items = [ 'Food', 'Wood', 'Metal', 'Ammo', ] * 4 \
             + self._expedition._inventory.get_free()
 
-      for _item, rect in zip( items, self.old_tbox.rect_matrix[0] ):
+      _item = self.old_tbox.get_item( items, mouse_x, mouse_y )
 
-        # Determine if mouse is hovering over item
+      if _item != None:
 
-        if rect.collidepoint( mouse_x, mouse_y ) \
-          and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+        if type( _item ) == item.Item:
+          self._item = _item
 
-          if type( _item ) == item.Item:
-            self._item = _item
+        # Transfer items if mouse is clicked
 
-          # Transfer items if mouse is clicked
+        if mouse_click:
 
-          if mouse_click:
+          if ( _item == 'Food' ) and ( self._expedition._inventory.food > 0 ):
+            self._expedition._inventory.food -= 1
+            self._inventory.food             += 1
 
-            if ( _item == 'Food' ) and ( self._expedition._inventory.food > 0 ):
-              self._expedition._inventory.food -= 1
-              self._inventory.food             += 1
+          elif ( _item == 'Wood' ) and ( self._expedition._inventory.wood > 0 ):
+            self._expedition._inventory.wood -= 1
+            self._inventory.wood             += 1
 
-            elif ( _item == 'Wood' ) and ( self._expedition._inventory.wood > 0 ):
-              self._expedition._inventory.wood -= 1
-              self._inventory.wood             += 1
+          elif ( _item == 'Metal' ) and ( self._expedition._inventory.metal > 0 ):
+            self._expedition._inventory.metal -= 1
+            self._inventory.metal             += 1
 
-            elif ( _item == 'Metal' ) and ( self._expedition._inventory.metal > 0 ):
-              self._expedition._inventory.metal -= 1
-              self._inventory.metal             += 1
+          elif ( _item == 'Ammo' ) and ( self._expedition._inventory.ammo > 0 ):
+            self._expedition._inventory.ammo -= 1
+            self._inventory.ammo             += 1
 
-            elif ( _item == 'Ammo' ) and ( self._expedition._inventory.ammo > 0 ):
-              self._expedition._inventory.ammo -= 1
-              self._inventory.ammo             += 1
-
-            else:
-              _item.free = False
-              self._inventory.items.append( _item )
+          else:
+            _item.free = False
+            self._inventory.items.append( _item )
 
       # Selected items
 
       items = [ 'Food', 'Wood', 'Metal', 'Ammo', ] * 4 \
             + self._inventory.items
 
-      for _item, rect in zip( items, self.new_tbox.rect_matrix[0] ):
-
-        # Determine if mouse is hovering over item
+      _item = self.new_tbox.get_item( items, mouse_x, mouse_y )
 
-        if rect.collidepoint( mouse_x, mouse_y ) \
-          and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      if _item != None:
 
-          if type( _item ) == item.Item:
-            self._item = _item
+        if type( _item ) == item.Item:
+          self._item = _item
 
-          # Transfer items if mouse is clicked
+        # Transfer items if mouse is clicked
 
-          if mouse_click:
+        if mouse_click:
 
-            if ( _item == 'Food' ) and ( self._inventory.food > 0 ):
-              self._expedition._inventory.food += 1
-              self._inventory.food             -= 1
+          if ( _item == 'Food' ) and ( self._inventory.food > 0 ):
+            self._expedition._inventory.food += 1
+            self._inventory.food             -= 1
 
-            elif ( _item == 'Wood' ) and ( self._inventory.wood > 0 ):
-              self._expedition._inventory.wood += 1
-              self._inventory.wood             -= 1
+          elif ( _item == 'Wood' ) and ( self._inventory.wood > 0 ):
+            self._expedition._inventory.wood += 1
+            self._inventory.wood             -= 1
 
-            elif ( _item == 'Metal' ) and ( self._inventory.metal > 0 ):
-              self._expedition._inventory.metal += 1
-              self._inventory.metal             -= 1
+          elif ( _item == 'Metal' ) and ( self._inventory.metal > 0 ):
+            self._expedition._inventory.metal += 1
+            self._inventory.metal             -= 1
 
-            elif ( _item == 'Ammo' ) and ( self._inventory.ammo > 0 ):
-              self._expedition._inventory.ammo += 1
-              self._inventory.ammo             -= 1
+          elif ( _item == 'Ammo' ) and ( self._inventory.ammo > 0 ):
+            self._expedition._inventory.ammo += 1
+            self._inventory.ammo             -= 1
 
-            else:
-              _item.free = True
-              self._inventory.items.remove( _item )
+          else:
+            _item.free = True
+            self._inventory.items.remove( _item )
 
     # Scroll text boxes if necessary
 
@@ -8,6 +8,7 @@ from pygame.locals import *
 
 import properties
 import utils
+import assets
 
 #-------------------------------------------------------------------------
 # Main Class
@@ -27,8 +28,8 @@ class CostBox:
 
     # Initialize image surface
 
-    self.surface = pygame.image.load( properties.EXPD_PATH + 'cost.png' )
-    self.image   = self.surface.convert()
+    self.surface = assets.get_image( properties.EXPD_PATH + 'cost.png' )
+    self.image   = self.surface.copy()
     self.rect    = self.image.get_rect()
 
   # Update graphics
@@ -49,7 +50,7 @@ class CostBox:
 
       # Reset background
 
-      self.image = self.surface.convert()
+      self.image = self.surface.copy()
 
       # Draw cost onto background
 
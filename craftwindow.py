@@ -109,22 +109,7 @@ class CraftWindow( window.Window ):
 
     assert( self._expedition != None )
 
-    # Halve the cost of materials if engineer is helping
-
-    bonus = 1.0
-
-    for _survivor in self.survivors:
-      if _survivor.job == attribute.ENGINEER:
-        bonus = 0.5
-
-    self._expedition._inventory.items.append( item.Item( self._item.name ) )
-
-    self._expedition._inventory.wood  -= max( int( self._item.wood_cost * bonus ), 1 )
-    self._expedition._inventory.metal -= max( int( self._item.metal_cost * bonus ), 1 )
-
-    for _survivor in self.survivors:
-      _survivor.free     = False
-      _survivor.stamina -= max( properties.CRAFT_COST - _survivor.get_attributes().day_bonus, 0 )
+    self._expedition.craft( self._item, self.survivors )
 
     self.survivors = []
 
@@ -170,19 +155,7 @@ class CraftWindow( window.Window ):
 
   def check_cost( self ):
 
-    # Halve the cost of materials if engineer is helping
-
-    bonus = 1.0
-
-    for _survivor in self.survivors:
-      if _survivor.job == attribute.ENGINEER:
-        bonus = 0.5
-
-    wood_check   = self._expedition._inventory.wood >= max( int( self._item.wood_cost * bonus ), 1 )
-    metal_check  = self._expedition._inventory.metal >= max( int( self._item.metal_cost * bonus ), 1 )
-    mental_check = self.get_current_mental() >= self._item.mental_req
-
-    return wood_check and metal_check and mental_check
+    return self._expedition.can_craft( self._item, self.survivors )
 
   # Process inputs. Return true if next button is clicked and at least
   # one survivor was selected.
@@ -196,43 +169,41 @@ class CraftWindow( window.Window ):
 
     # Display list of craftable items
 
-    for _item, rect in zip( self.items, self.old_tbox.rect_matrix[0] ):
+    _item = self.old_tbox.get_item( self.items, mouse_x, mouse_y )
 
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+    if _item != None:
 
-        # Only do hover display if item is not selected already
+      # Only do hover display if item is not selected already
 
-        if not self.selected:
-          self._item = _item
+      if not self.selected:
+        self._item = _item
 
-        # Select survivors once an item to craft is selected
+      # Select survivors once an item to craft is selected
 
-        if mouse_click:
+      if mouse_click:
 
-          if self.selected and ( _item == self._item ):
-            self.half_reset()
+        if self.selected and ( _item == self._item ):
+          self.half_reset()
 
-          else:
-            self._item     = _item
-            self.survivors = []
-            self.selected  = True
+        else:
+          self._item     = _item
+          self.survivors = []
+          self.selected  = True
 
     # Display list of survivors available for crafting once item is chosen
 
     if self.selected:
 
-      for _survivor, rect in zip( self._expedition.get_free(), self.new_tbox.rect_matrix[0] ):
+      # Highlight selected survivors to update cost/req
 
-        # Highlight selected survivors to update cost/req
+      _survivor = self.new_tbox.get_item( self._expedition.get_free(), mouse_x, mouse_y )
 
-        if mouse_click and rect.collidepoint( mouse_x, mouse_y ) \
-          and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      if mouse_click and ( _survivor != None ):
 
-          if _survivor in self.survivors:
-            self.survivors.remove( _survivor )
-          elif _survivor.stamina > max( cost - _survivor.get_attributes().day_bonus, 0 ):
-            self.survivors.append( _survivor )
+        if _survivor in self.survivors:
+          self.survivors.remove( _survivor )
+        elif _survivor.stamina > max( cost - _survivor.get_attributes().day_bonus, 0 ):
+          self.survivors.append( _survivor )
 
     # Scroll text boxes if necessary
 
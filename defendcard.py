@@ -8,6 +8,7 @@ from pygame.locals import *
 
 import properties
 import utils
+import assets
 import attribute
 
 #-------------------------------------------------------------------------
@@ -153,12 +154,12 @@ class DefendCard:
 
   def draw_background( self ):
 
-    bg_image        = pygame.image.load( self.bg_path )
+    bg_image        = assets.get_image( self.bg_path )
     bg_rect         = bg_image.get_rect()
     bg_rect.topleft = 0, 0
 
     if self.damaged or ( self._survivor.stamina == 0 ):
-      bg_image.fill( utils.RED )
+      return [ self.image.fill( utils.RED, bg_rect ) ]
 
     return [ self.image.blit( bg_image, bg_rect ) ]
 
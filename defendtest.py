@@ -15,6 +15,7 @@ import attribute
 import inventory
 import item
 import expedition
+import rng
 
 #-------------------------------------------------------------------------
 # Utility functions
@@ -69,14 +70,16 @@ def main():
     for j in range( properties.MAP_SIZE ):
       map[i].append( tile.Tile( 'Field', i, j ) )
 
-  # Set up sample expedition
+  # Set up sample expedition with a fixed seed
+
+  _rng = rng.GameRNG( 0 )
 
   expeditions_group            = pygame.sprite.RenderUpdates()
   expedition.Expedition.groups = expeditions_group
 
   survivors = []
   for i in range( 4 ):
-    survivors.append( survivor.Survivor() )
+    survivors.append( survivor.Survivor( _rng ) )
 
   survivors[0].weapon = item.Item( 'Knife' )
   survivors[1].weapon = item.Item( 'Rifle' )
@@ -92,7 +95,7 @@ def main():
   _inventory  = inventory.Inventory( 10, 10, 10, 3, [
     item.Item( 'Flashbang' ), item.Item( 'Barricade' ), item.Item( 'Spike Trap' ),
   ] )
-  _expedition = expedition.Expedition( _tile, survivors, _inventory, map )
+  _expedition = expedition.Expedition( _tile, survivors, _inventory, map, _rng )
 
   defend_window._expedition = _expedition
   defend_window.survivors   = _expedition.survivors
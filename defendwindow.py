@@ -8,12 +8,13 @@ from pygame.locals import *
 
 import properties
 import utils
+import assets
 import window
 import textbox
 import healthtextbox
 import defendcard
 import button
-import attribute
+import combat
 
 #-------------------------------------------------------------------------
 # Window Offsets
@@ -48,7 +49,6 @@ PHASE_START, PHASE_DEFENSE, PHASE_ENEMY, PHASE_PLAYER, PHASE_WIN, PHASE_LOSE = r
 
 DAMAGED_TIME = 300
 DAMAGE_SPEED = 1
-HIT_SPEED    = 0.05
 WIN_SPEED    = 8
 
 #-------------------------------------------------------------------------
@@ -89,10 +89,11 @@ class DefendWindow( window.Window ):
 
     self.hit_active      = False
     self.hit_bar_ratio   = 0.00
-    self.hit_bar_speed   = HIT_SPEED
+    self.hit_bar_speed   = combat.HIT_SPEED
     self.hit_bar_limit   = 0.00
 
     self.enemy_damaged   = False
+    self.enemy_stunned   = False
     self.no_ammo         = False
     self.no_stamina      = False
     self.curse_stamina   = 0
@@ -169,13 +170,7 @@ class DefendWindow( window.Window ):
     assert( len( self.survivors ) > 0 )
     assert( self._enemy != None )
 
-    self.turn_order = self.survivors + [ self._enemy ]
-
-    # Sort both enemy and survivors in order of decreasing speed
-
-    self.turn_order = sorted(
-      self.turn_order, key=lambda unit: unit.get_speed(), reverse=True
-    )
+    self.turn_order = combat.get_turn_order( self.survivors, self._enemy )
 
   # Increment turn index to the next living unit
 
@@ -235,9 +230,7 @@ class DefendWindow( window.Window ):
 
   def set_hit_bar_limit( self, limit ):
 
-    # Mental bonus of survivor wielding weapon lowers limit
-
-    self.hit_bar_limit = limit - ( self.target_survivor.get_mental_bonus() * 0.02 )
+    self.hit_bar_limit = combat.get_hit_bar_limit( self.target_survivor )
 
     self.hit_limit_rect.centery = LIMIT_Y_OFFSET \
       - int( limit * ( properties.DEFEND_HIT_HEIGHT - 2 * properties.DEFEND_HIT_SPACE ) )
@@ -256,51 +249,26 @@ class DefendWindow( window.Window ):
 
     # Register defenses
 
-    self.defense_dmg   = 0.0
-    self.defense_spawn = 1.0
-    self.defense_stun  = 0
-    self.defense_armor = 0
-
-    for defense in self.defenses:
-
-      if defense.name == 'Pit Trap':
-        self.defense_dmg += 0.25
-
-      elif defense.name == 'Spike Trap':
-        self.defense_dmg += 0.50
-
-      elif defense.name == 'Explosive Trap':
-        self.defense_dmg += 0.75
-
-      elif defense.name == 'Camouflage':
-        self.defense_spawn = min( 0.5, self.defense_spawn )
-
-      elif defense.name == 'Bone Ward':
-        self.defense_spawn = min( 0.01, self.defense_spawn )
-
-      elif defense.name == 'Flashbang':
-        self.defense_stun += 1
-
-      elif ( defense.name == 'Barricade' ) or ( defense.name == 'Barbed Fence' ):
-        self.defense_armor = defense.armor
+    self.defense_dmg, self.defense_spawn, self.defense_stun, self.defense_armor = \
+      combat.get_defense_effects( self.defenses )
 
     # Roll for enemy and determine turn order if valid enemy
 
-    self._enemy = self._tile.roll_enemy( self.defense_spawn )
+    self._enemy = self._tile.roll_enemy( self.defense_spawn, self._expedition._rng )
 
     if self._enemy != None:
       self.calc_turn_order()
-      self.pic_enemy_surface = pygame.image.load( self._enemy.img_path )
-      self.hit_bar_speed     = HIT_SPEED + ( self._enemy.speed * 0.02 )
+      self.pic_enemy_surface = assets.get_image( self._enemy.img_path, True )
+      self.hit_bar_speed     = combat.get_hit_bar_speed( self._enemy )
     else:
       self.pic_enemy_surface = pygame.Surface( ( 1, 1 ) )
+      self.pic_enemy_surface.set_colorkey( self.pic_enemy_surface.get_at( ( 0, 0 ) ), RLEACCEL )
 
     # Initialize images for this encounter
 
-    self.pic_bg_surface    = pygame.image.load( self._tile.bg_path )
+    self.pic_bg_surface    = assets.get_image( self._tile.bg_path )
     self.pic_bg_rect       = self.pic_bg_surface.get_rect( topleft = ( 0, 0 ) )
 
-    self.pic_enemy_surface.set_colorkey( self.pic_enemy_surface.get_at( ( 0, 0 ) ), RLEACCEL )
     self.pic_enemy_rect    = self.pic_enemy_surface.get_rect( center = self.pic_bg_rect.center )
 
     self.hit_bar_ratio     = 0.00
@@ -402,6 +370,7 @@ class DefendWindow( window.Window ):
             self.target_survivor     = attack_info[0]
             self.target_dmg          = max( attack_info[1] - self.defense_armor, 0 )
             self.target_stamina      = max( self.target_survivor.stamina - self.target_dmg, 0 )
+            self.enemy_stunned       = False
             self.set_target_card()
 
             # No animation for 0 damage
@@ -419,6 +388,8 @@ class DefendWindow( window.Window ):
 
             elif self.defense_stun > 0:
 
+              self.defense_stun    -= 1
+              self.enemy_stunned    = True
               self.target_stamina   = self.target_survivor.stamina
               self.animation_active = False
               self.increment_turn()
@@ -473,6 +444,7 @@ class DefendWindow( window.Window ):
               self.target_survivor     = attack_info[0]
               self.target_dmg          = max( attack_info[1] - self.defense_armor, 0 )
               self.target_stamina      = max( self.target_survivor.stamina - self.target_dmg, 0 )
+              self.enemy_stunned       = False
               self.set_target_card()
 
               # No animation for 0 damage
@@ -490,6 +462,8 @@ class DefendWindow( window.Window ):
 
               elif self.defense_stun > 0:
 
+                self.defense_stun    -= 1
+                self.enemy_stunned    = True
                 self.target_stamina   = self.target_survivor.stamina
                 self.animation_active = False
                 self.increment_turn()
@@ -558,40 +532,10 @@ class DefendWindow( window.Window ):
             self.hit_active = False
             self.do_draw    = True
 
-            # If attacker is military, then halve the ammo cost
+            # Consume ammo, and stamina if using cursed weapon
 
-            ammo_cost = self.target_survivor.weapon.ammo_cost
-
-            if self.target_survivor.job == attribute.SOLDIER:
-              ammo_cost = max( int( ammo_cost * 0.5 ), 1 )
-
-            # Consume ammo if using a gun
-
-            self.no_ammo = False
-
-            if self._expedition._inventory.ammo < ammo_cost:
-              self.no_ammo = True
-
-            elif ammo_cost > 0:
-              self._expedition._inventory.ammo -= ammo_cost
-
-            # If attacker is mystic, then halve the stamina cost
-
-            stamina_cost = self.target_survivor.weapon.stam_cost
-
-            if self.target_survivor.job == attribute.MYSTIC:
-              stamina_cost = max( int( stamina_cost * 0.5 ), 1 )
-
-            # Consume stamina if using cursed weapon
-
-            self.no_stamina    = False
-            self.curse_stamina = self.target_survivor.stamina
-
-            if self.target_survivor.stamina <= stamina_cost:
-              self.no_stamina = True
-
-            elif stamina_cost > 0:
-              self.curse_stamina -= stamina_cost
+            self.no_ammo, self.no_stamina, self.curse_stamina = \
+              combat.pay_attack_cost( self.target_survivor, self._expedition._inventory )
 
             # Direct hit to enemy
 
@@ -667,6 +611,7 @@ class DefendWindow( window.Window ):
               self.target_survivor     = attack_info[0]
               self.target_dmg          = max( attack_info[1] - self.defense_armor, 0 )
               self.target_stamina      = max( self.target_survivor.stamina - self.target_dmg, 0 )
+              self.enemy_stunned       = False
               self.set_target_card()
 
               # No animation for 0 damage
@@ -684,6 +629,8 @@ class DefendWindow( window.Window ):
 
               elif self.defense_stun > 0:
 
+                self.defense_stun    -= 1
+                self.enemy_stunned    = True
                 self.target_stamina   = self.target_survivor.stamina
                 self.animation_active = False
                 self.increment_turn()
@@ -787,9 +734,7 @@ class DefendWindow( window.Window ):
 
     elif self.phase == PHASE_ENEMY:
 
-      if self.defense_stun > 0:
-
-        self.defense_stun -= 1
+      if self.enemy_stunned:
 
         self.msg_tbox.update( [[ self._enemy.name + ' is stunned!' ]] )
 
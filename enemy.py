@@ -3,7 +3,6 @@
 #=========================================================================
 # Class for spawnable enemies with damage, armor, stamina statistics.
 
-import random
 import properties
 
 #-------------------------------------------------------------------------
@@ -39,7 +38,7 @@ class Enemy:
 
   # Constructor
 
-  def __init__( self, name ):
+  def __init__( self, name, _rng ):
 
     assert( name in enemy_table )
 
@@ -51,6 +50,7 @@ class Enemy:
     self.max_dmg     = enemy_table[self.name][3]
     self.speed       = enemy_table[self.name][4]
     self.img_path    = properties.ENEMY_PATH + enemy_table[self.name][5]
+    self._rng        = _rng
 
   # Return speed to determine turn order. This function would not
   # normally be necessary but having the same function name for returning
@@ -69,14 +69,14 @@ class Enemy:
 
     # Determine survivor to attack
 
-    _survivor = random.choice( survivors )
+    _survivor = self._rng.combat.choice( survivors )
 
     while _survivor.stamina == 0:
-      _survivor = random.choice( survivors )
+      _survivor = self._rng.combat.choice( survivors )
 
     # Calculate damage
 
-    raw_dmg = random.randint( self.min_dmg, self.max_dmg )
+    raw_dmg = self._rng.combat.randint( self.min_dmg, self.max_dmg )
     dmg     = max( raw_dmg - _survivor.armor.armor, 0 )
 
     return _survivor, dmg
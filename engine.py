@@ -7,9 +7,13 @@
 import pygame, sys, os
 from pygame.locals import *
 
-import random
 import copy
 import properties
+import utils
+import rng
+import profiler
+import memtrack
+import snapshot
 import window
 import sidebarwindow
 import survivorwindow
@@ -21,6 +25,7 @@ import statuswindow
 import equipwindow
 import defendwindow
 import mapgen
+import maplayer
 import button
 import tile
 import enemy
@@ -40,6 +45,22 @@ PHASE_CRAFT, PHASE_REST, PHASE_STATUS, \
 PHASE_TRANSITION, PHASE_FOOD, \
 PHASE_DEFEND0, PHASE_DEFEND1, PHASE_DEFEND2, PHASE_DEFEND3, = range( 16 )
 
+PHASE_NAMES = [
+  'LOOK', 'SCAVENGE0', 'SCAVENGE1',
+  'EXPLORE0', 'EXPLORE1', 'EXPLORE2', 'EXPLORE3',
+  'CRAFT', 'REST', 'STATUS',
+  'TRANSITION', 'FOOD',
+  'DEFEND0', 'DEFEND1', 'DEFEND2', 'DEFEND3',
+]
+
+# Phases that animate every frame
+
+ANIMATED_PHASES = [ PHASE_TRANSITION, PHASE_DEFEND3 ]
+
+# Event posted to wake up the idle main loop
+
+WAKE_EVENT = USEREVENT
+
 #-------------------------------------------------------------------------
 # Main Class
 #-------------------------------------------------------------------------
@@ -50,13 +71,14 @@ class Engine:
   # Constructor
   #.......................................................................
 
-  def __init__( self ):
+  def __init__( self, seed=None, profile=False, track=False ):
 
     # Initialize engine utility variables
 
     self.done        = False
     self.phase       = PHASE_LOOK
     self.expeditions = []
+    self._rng        = rng.GameRNG( seed )
 
     self.cam_en      = True
     self.cam_x       = 0
@@ -67,6 +89,20 @@ class Engine:
     self.mouse_click = False
     self.key_esc     = False
     self.key_space   = False
+    self.got_event   = False
+
+    # Frame pacing variables, frames are only drawn if something changed
+    # since the last drawn frame. The frame rate is uncapped if zero.
+
+    self.drawn_state = None
+    self.idle_count  = 0
+    self.timed_wake  = False
+    self.fps         = properties.FPS
+    self.profiler    = profiler.Profiler( profile )
+
+    # Memory tracker, snapshots are taken at every day/night transition
+
+    self.tracker     = memtrack.MemTracker( track )
 
     # Phase-specific variables
 
@@ -78,17 +114,24 @@ class Engine:
     self.found_survivor    = False
     self.new_survivor      = None
     self.rest_animation    = False
+    self.selected_tile     = None
 
     # Initialize sprite groups
 
-    self.map_group         = pygame.sprite.RenderUpdates()
     self.expeditions_group = pygame.sprite.RenderUpdates()
     self.day_menu_group    = pygame.sprite.RenderUpdates()
     self.night_menu_group  = pygame.sprite.RenderUpdates()
 
     # Assign default groups to sprite classes
 
-    expedition.Expedition.groups = self.expeditions_group
+    expedition.Expedition.groups  = self.expeditions_group
+    expedition.Expedition.draw_en = True
+
+    # Every game starts with the full set of survivor names and no
+    # expeditions
+
+    survivor.reset_names()
+    expedition.reset_index()
 
     # Initialize day menu graphics
 
@@ -169,16 +212,13 @@ class Engine:
     self.cost_box = costbox.CostBox()
 
   #.......................................................................
-  # Initialize map and add tiles to group
+  # Initialize map
   #.......................................................................
 
   def init_map( self, map ):
 
-    self.map = map
-
-    for i in range( properties.MAP_SIZE ):
-      for j in range( properties.MAP_SIZE ):
-        self.map_group.add( self.map[i][j] )
+    self.map       = map
+    self.map_layer = maplayer.MapLayer( self.map )
 
   #.......................................................................
   # Randomly generate starting expedition
@@ -188,13 +228,13 @@ class Engine:
 
     # Randomly select starting tile (needs to be Field terrain)
 
-    pos_x = random.randint( 0, properties.MAP_SIZE - 1 )
-    pos_y = random.randint( 0, properties.MAP_SIZE - 1 )
+    pos_x = self._rng.engine.randint( 0, len( self.map ) - 1 )
+    pos_y = self._rng.engine.randint( 0, len( self.map ) - 1 )
 
     while ( self.map[pos_x][pos_y].terrain != 'Field' ) \
       or self.map[pos_x][pos_y].has_survivor:
-      pos_x = random.randint( 0, properties.MAP_SIZE - 1 )
-      pos_y = random.randint( 0, properties.MAP_SIZE - 1 )
+      pos_x = self._rng.engine.randint( 0, len( self.map ) - 1 )
+      pos_y = self._rng.engine.randint( 0, len( self.map ) - 1 )
 
     pos_tile = self.map[pos_x][pos_y]
 
@@ -203,7 +243,7 @@ class Engine:
     survivors = []
 
     for i in range( properties.NUM_START_SURVIVORS ):
-      survivors.append( survivor.Survivor() )
+      survivors.append( survivor.Survivor( self._rng ) )
 
     # Initialize starting inventory
 
@@ -221,7 +261,7 @@ class Engine:
     # Create expedition
 
     self.expeditions.append(
-      expedition.Expedition( pos_tile, survivors, _inventory, self.map )
+      expedition.Expedition( pos_tile, survivors, _inventory, self.map, self._rng )
     )
 
     # Center camera on starting expedition
@@ -234,11 +274,49 @@ class Engine:
 
   def get_next_expedition( self ):
 
-    for _expedition in self.expeditions:
-      if len( _expedition.get_free() ) > 0:
-        return _expedition
+    return expedition.get_free_expedition()
+
+  #.......................................................................
+  # Save and load game
+  #.......................................................................
+
+  # Write snapshot of the game to given path
+
+  def save_game( self, path ):
+
+    snapshot.save(
+      path, self.map, self.expeditions, self._rng,
+      self.day_en, self.sidebar_window.time_count
+    )
+
+  # Replace the game with the snapshot at given path. The game resumes
+  # looking around at the start of the saved phase.
+
+  def load_game( self, path ):
+
+    self.expeditions_group.empty()
+
+    expedition.reset_index()
+
+    map, expeditions, self._rng, self.day_en, time_count = snapshot.load( path )
+
+    self.init_map( map )
+
+    self.expeditions[:] = expeditions
 
-    return None
+    self.sidebar_window.day_en     = self.day_en
+    self.sidebar_window.time_count = time_count
+
+    self.phase             = PHASE_LOOK
+    self.menu_en           = False
+    self.cam_en            = True
+    self.active_expedition = None
+    self.transition_alpha  = 255 if self.day_en else properties.NIGHT_ALPHA
+
+    tile.set_night_alpha( self.transition_alpha )
+
+    if len( self.expeditions ) > 0:
+      self.center_camera( self.expeditions[0].pos_tile )
 
   #.......................................................................
   # Get inputs
@@ -249,9 +327,13 @@ class Engine:
     self.mouse_click = False
     self.key_esc     = False
     self.key_space   = False
+    self.got_event   = False
 
     for event in pygame.event.get():
 
+      if event.type != WAKE_EVENT:
+        self.got_event = True
+
       if event.type == MOUSEMOTION:
         self.mouse_x = event.pos[0]
         self.mouse_y = event.pos[1]
@@ -265,6 +347,9 @@ class Engine:
       elif ( event.type == KEYDOWN ) and ( event.key == K_SPACE ):
         self.key_space = True
 
+      elif ( event.type == KEYDOWN ) and ( event.key == K_F3 ):
+        self.profiler.toggle_hud()
+
   #.......................................................................
   # Center camera around given tile
   #.......................................................................
@@ -391,22 +476,22 @@ class Engine:
 
           # Phase transition based on button click
 
-          if button.text == 'EXPLORE' and ( len( self.active_expedition.get_free() ) > 0 ):
+          if button.text == 'EXPLORE' and ( self.active_expedition.num_free > 0 ):
             self.phase                       = PHASE_EXPLORE0
             self.survivor_window.reset( 'CHOOSE SURVIVORS TO EXPLORE' )
             self.survivor_window._expedition = self.active_expedition
 
-          elif button.text == 'SCAVENGE' and ( len( self.active_expedition.get_free() ) > 0 ):
+          elif button.text == 'SCAVENGE' and ( self.active_expedition.num_free > 0 ):
             self.phase                       = PHASE_SCAVENGE0
             self.survivor_window.reset( 'CHOOSE SURVIVORS TO SCAVENGE' )
             self.survivor_window._expedition = self.active_expedition
 
-          elif button.text == 'CRAFT' and ( len( self.active_expedition.get_free() ) > 0 ):
+          elif button.text == 'CRAFT' and ( self.active_expedition.num_free > 0 ):
             self.phase                    = PHASE_CRAFT
             self.craft_window.reset()
             self.craft_window._expedition = self.active_expedition
 
-          elif button.text == 'REST' and ( len( self.active_expedition.get_free() ) > 0 ):
+          elif button.text == 'REST' and ( self.active_expedition.num_free > 0 ):
             self.phase                       = PHASE_REST
             self.survivor_window.reset( 'CHOOSE SURVIVORS TO REST' )
             self.survivor_window._expedition = self.active_expedition
@@ -416,7 +501,7 @@ class Engine:
             self.status_window.reset()
             self.status_window._expedition = self.active_expedition
 
-          elif button.text == 'DEFEND' and ( len( self.active_expedition.get_free() ) > 0 ):
+          elif button.text == 'DEFEND' and ( self.active_expedition.num_free > 0 ):
             self.phase                        = PHASE_DEFEND0
             self.inventory_window.reset( 'CHOOSE ITEMS FOR DEFENSE', 'Defense', properties.DEFENSE_LIMIT )
             self.inventory_window._expedition = self.active_expedition
@@ -525,12 +610,7 @@ class Engine:
 
       # Sidebar expedition information (only when menu is disabled)
 
-      active_expedition = None
-
-      for _expedition in self.expeditions:
-        if context_tile == _expedition.pos_tile:
-          active_expedition = _expedition
-          break
+      active_expedition = expedition.get_expedition( context_tile )
 
       if not self.menu_en:
         self.sidebar_window._expedition = active_expedition
@@ -690,6 +770,8 @@ class Engine:
     context_x = ( self.cam_x + self.mouse_x ) / properties.TILE_WIDTH
     context_y = ( self.cam_y + self.mouse_y ) / properties.TILE_HEIGHT
 
+    context_tile = None
+
     self.sidebar_window._tile = None
 
     if ( context_x >= 0 ) and ( context_x < properties.MAP_SIZE ) \
@@ -707,106 +789,115 @@ class Engine:
 
     self.cost_box.cost = 0
 
-    # Check if cursor is over a moveable tile
+    # Check if cursor is over a moveable tile. Only the tile under the
+    # cursor is ever selected, so it is looked up directly and only the
+    # previously selected tile needs to be cleared.
 
-    for _tile, info in self.active_expedition.path_dic.iteritems():
+    path_dic = self.active_expedition.path_dic
 
-      _tile.selected = False
+    if ( self.selected_tile != None ) and ( self.selected_tile != context_tile ):
+      self.selected_tile.selected = False
 
-      if _tile.rect.collidepoint( self.mouse_x, self.mouse_y ):
+    self.selected_tile = None
 
-        # Highlight destination tile
+    if ( context_tile != None ) and ( context_tile in path_dic ):
 
-        _tile.selected = True
+      _tile = context_tile
+      info  = path_dic[_tile]
 
-        # Enable cost box with appropriate stamina cost
+      # Highlight destination tile
 
-        self.cost_box.cost  = info[1]
-        self.cost_box.pos_x = self.mouse_x
-        self.cost_box.pos_y = self.mouse_y
+      _tile.selected     = True
+      self.selected_tile = _tile
 
-        # Move to next phase if valid destination selected
+      # Enable cost box with appropriate stamina cost
 
-        if self.mouse_click:
+      self.cost_box.cost  = info[1]
+      self.cost_box.pos_x = self.mouse_x
+      self.cost_box.pos_y = self.mouse_y
 
-          self.phase  = PHASE_EXPLORE3
-          self.cam_en = False
+      # Move to next phase if valid destination selected
 
-          # Keep old expedition's image if all survivors exploring
+      if self.mouse_click:
 
-          all_explore = False
+        self.phase  = PHASE_EXPLORE3
+        self.cam_en = False
 
-          if len( self.active_expedition.survivors ) == len( self.survivor_window.survivors ):
-            all_explore = True
-            img_idx     = self.active_expedition.img_roll
-          else:
-            img_idx = -1
+        # Keep old expedition's image if all survivors exploring
 
-          # Create new expedition
+        all_explore = False
 
-          _expedition = expedition.Expedition(
-            self.active_expedition.pos_tile,
-            self.survivor_window.survivors,
-            self.inventory_window._inventory,
-            self.map,
-            img_idx
-          )
+        if len( self.active_expedition.survivors ) == len( self.survivor_window.survivors ):
+          all_explore = True
+          img_idx     = self.active_expedition.img_roll
+        else:
+          img_idx = -1
 
-          # Configure movement route
+        # Create new expedition
 
-          move_route, cost = self.active_expedition.calc_path( _tile )
+        _expedition = expedition.Expedition(
+          self.active_expedition.pos_tile,
+          self.survivor_window.survivors,
+          self.inventory_window._inventory,
+          self.map,
+          self._rng,
+          img_idx
+        )
 
-          _expedition.move_route = move_route
-          _expedition.set_direction()
-          _expedition.draw_animation()
+        # Configure movement route
 
-          # If leader is present, apply explore bonus to all survivors
+        move_route, cost = self.active_expedition.calc_path( _tile )
 
-          has_leader = False
+        _expedition.move_route = move_route
+        _expedition.set_direction()
+        _expedition.draw_animation()
 
-          for _survivor in _expedition.survivors:
-            if _survivor.job == attribute.LEADER:
-              has_leader   = True
-              leader_bonus = 1.0 - _survivor.get_attributes().explore_bonus
-              break
+        # If leader is present, apply explore bonus to all survivors
 
-          # Subtract cost of movement
+        has_leader = False
 
-          for _survivor in _expedition.survivors:
+        for _survivor in _expedition.survivors:
+          if _survivor.job == attribute.LEADER:
+            has_leader   = True
+            leader_bonus = 1.0 - _survivor.get_attributes().explore_bonus
+            break
 
-            bonus = 1.0 - _survivor.get_attributes().explore_bonus
+        # Subtract cost of movement
 
-            if has_leader:
-              bonus = leader_bonus
+        for _survivor in _expedition.survivors:
 
-            _survivor.stamina -= int( cost * bonus )
+          bonus = 1.0 - _survivor.get_attributes().explore_bonus
 
-            assert( _survivor.stamina > 0 )
+          if has_leader:
+            bonus = leader_bonus
 
-          # Finalize changes and delete old expedition if all transferred
+          _survivor.stamina -= int( cost * bonus )
 
-          self.active_expedition.unhighlight_range()
-          self.active_expedition.split(
-            self.survivor_window.survivors, self.inventory_window._inventory
-          )
+          assert( _survivor.stamina > 0 )
 
-          self.survivor_window.commit()
-          self.inventory_window.commit()
+        # Finalize changes and delete old expedition if all transferred
 
-          if all_explore:
-            self.active_expedition.kill()
-            self.expeditions.remove( self.active_expedition )
+        self.active_expedition.unhighlight_range()
+        self.active_expedition.split(
+          self.survivor_window.survivors, self.inventory_window._inventory
+        )
+
+        self.survivor_window.commit()
+        self.inventory_window.commit()
+
+        if all_explore:
+          self.active_expedition.kill()
+          self.expeditions.remove( self.active_expedition )
 
-          # Assign new expedition as active
+        # Assign new expedition as active
 
-          self.active_expedition = _expedition
-          self.expeditions.append( _expedition )
+        self.active_expedition = _expedition
+        self.expeditions.append( _expedition )
 
-          # Free up transferred items
+        # Free up transferred items
 
-          self.active_expedition._inventory.free()
+        self.active_expedition._inventory.free()
 
-          break
 
     # Go back to menu if ESC pressed
 
@@ -861,7 +952,7 @@ class Engine:
       if self.active_expedition.pos_tile.has_survivor:
 
         self.found_survivor                          = True
-        self.new_survivor                            = survivor.Survivor()
+        self.new_survivor                            = survivor.Survivor( self._rng )
         self.new_survivor.free                       = False
         self.active_expedition.pos_tile.has_survivor = False
 
@@ -889,9 +980,8 @@ class Engine:
 
         # Merge expeditions if on same tile
 
-        for _expedition in self.expeditions:
-          if ( self.active_expedition != _expedition ) \
-            and ( self.active_expedition.pos_tile == _expedition.pos_tile ):
+        for _expedition in expedition.get_expeditions( self.active_expedition.pos_tile ):
+          if self.active_expedition != _expedition:
             self.active_expedition.merge( _expedition )
             self.expeditions.remove( _expedition )
             self.event_window._expedition = self.active_expedition
@@ -904,7 +994,7 @@ class Engine:
         # Add rescued survivor
 
         if self.new_survivor != None:
-          self.active_expedition.survivors.append( self.new_survivor )
+          self.active_expedition.add_survivor( self.new_survivor )
           self.new_survivor = None
 
   #.......................................................................
@@ -1019,7 +1109,7 @@ class Engine:
 
       elif _survivor.sick:
 
-        roll = random.random()
+        roll = self._rng.event.random()
 
         if roll < _survivor.cure_rate:
           _survivor.sick = False
@@ -1274,6 +1364,7 @@ class Engine:
       self.equip_window.reset()
       self.equip_window._expedition = self.active_expedition
       self.equip_window.survivors   = self.survivor_window.survivors
+      self.equip_window.defenses    = self.inventory_window._inventory.items
 
   #.......................................................................
   # PHASE_DEFEND2 Handling
@@ -1447,10 +1538,7 @@ class Engine:
     if self.transition_alpha > 255:
       self.transition_alpha = 0
 
-    for _tile in self.map_group.sprites():
-      if _tile.rect.colliderect( self.camera_window.rect ):
-        if not _tile.fog:
-          _tile.fog_surface.set_alpha( self.transition_alpha )
+    tile.set_night_alpha( self.transition_alpha )
 
     # Switch to night if in day phase, or switch to day and increment
     # time counter if in night phase
@@ -1472,19 +1560,32 @@ class Engine:
         self.sidebar_window.time_count += 1
         self.transition_alpha           = 255
 
+        tile.set_night_alpha( self.transition_alpha )
+
       # Reset all survivors to be free
 
       for _expedition in self.expeditions:
         _expedition.free_survivors()
 
+      # Autosave now that the new phase has started
+
+      if properties.AUTOSAVE_PATH != None:
+        self.save_game( properties.AUTOSAVE_PATH )
+
+      self.tracker.snapshot(
+        '%s %d' % ( 'day' if self.day_en else 'night', self.sidebar_window.time_count )
+      )
+
   #.......................................................................
   # Update all sprites
   #.......................................................................
 
   def update_all( self ):
 
-    self.map_group.update( self.cam_x, self.cam_y )
-    self.expeditions_group.update( self.cam_x, self.cam_y, self.cam_en )
+    if tile.animate() and ( len( self.map_layer.fire_tiles ) > 0 ):
+      utils.invalidate()
+
+    self.expeditions_group.update( self.cam_x, self.cam_y )
     self.sidebar_window.update()
 
     if self.phase == PHASE_EXPLORE0:
@@ -1521,24 +1622,18 @@ class Engine:
   # Draw all sprites
   #.......................................................................
 
-  def draw_all( self, cam_moved ):
+  def draw_all( self ):
 
     rect_updates = []
 
-    # Draw map and associated markers
+    # Redraw changed tiles on the map layer and show the camera view
 
-    if cam_moved or not self.day_en \
-      or ( self.phase == PHASE_EXPLORE0 ) \
-      or ( self.phase == PHASE_EXPLORE1 ) \
-      or ( self.phase == PHASE_EXPLORE2 ) \
-      or ( self.phase == PHASE_EXPLORE3 ) \
-      or ( self.phase == PHASE_TRANSITION ):
+    self.map_layer.update()
 
-      for _tile in self.map_group.sprites():
-        if _tile.rect.colliderect( self.camera_window.rect ):
-          rect_updates += _tile.draw( self.camera_window.bg_image )
+    self.camera_window.bg_image = self.map_layer.get_view( self.cam_x, self.cam_y )
 
     rect_updates += self.camera_window.draw_background()
+    rect_updates += self.map_layer.draw_night( self.camera_window.image, self.cam_x, self.cam_y )
     rect_updates += self.expeditions_group.draw( self.camera_window.image )
 
     # Draw menu if enabled
@@ -1552,10 +1647,18 @@ class Engine:
     # Draw all windows onto main screen
 
     rect_updates += self.camera_window.draw( self.screen )
+
+    self.profiler.mark( 'draw_camera', len( rect_updates ) )
+
+    num_rects     = len( rect_updates )
     rect_updates += self.sidebar_window.draw( self.screen )
 
+    self.profiler.mark( 'draw_sidebar', len( rect_updates ) - num_rects )
+
     # Draw phase-specific graphics
 
+    num_rects = len( rect_updates )
+
     if self.phase == PHASE_EXPLORE0:
       rect_updates += self.survivor_window.draw( self.screen )
     elif self.phase == PHASE_EXPLORE1:
@@ -1586,49 +1689,146 @@ class Engine:
     elif self.phase == PHASE_FOOD:
       rect_updates += self.event_window.draw( self.screen )
 
+    self.profiler.mark( 'draw_window', len( rect_updates ) - num_rects )
+
+    # Draw profiler overlay if enabled
+
+    rect_updates += self.profiler.draw_hud( self.screen )
+
     # Update the display
 
     pygame.display.update( rect_updates )
 
+    self.profiler.mark( 'draw_display' )
+
+  #.......................................................................
+  # Frame pacing
+  #.......................................................................
+
+  # Return true if the current frame needs to be drawn. Frames are drawn
+  # while there is input, animation or any other change, and for a few
+  # frames afterwards to show changes that take a frame to appear. A
+  # frame that only shows the next animation frame after waiting is
+  # drawn on its own.
+
+  def check_redraw( self ):
+
+    state = ( self.phase, self.cam_x, self.cam_y, self.menu_en, self.day_en )
+
+    if self.got_event or utils.redraw_state['dirty'] \
+      or ( state != self.drawn_state ) \
+      or ( self.phase in ANIMATED_PHASES ) \
+      or self.profiler.hud_en \
+      or ( len( tile.dirty_tiles ) > 0 ):
+      if self.timed_wake and not self.got_event and ( state == self.drawn_state ):
+        self.idle_count = properties.IDLE_FRAMES - 1
+      else:
+        self.idle_count = 0
+    else:
+      self.idle_count += 1
+
+    utils.redraw_state['dirty'] = False
+    self.drawn_state            = state
+    self.timed_wake             = False
+
+    return self.idle_count < properties.IDLE_FRAMES
+
+  # Return number of frames until the next animation frame of an
+  # expedition or campfire is shown, or None if nothing is animating
+
+  def get_idle_frames( self ):
+
+    steps = [ _expedition.step_count for _expedition in self.expeditions_group ]
+
+    if len( self.map_layer.fire_tiles ) > 0:
+      steps.append( tile.overlay_state['fire_step'] )
+
+    if len( steps ) == 0:
+      return None
+
+    return properties.FRAME_SWITCH - max( steps ) + 1
+
+  # Advance the animations by frames that were skipped while waiting,
+  # stopping at the next animation frame so it is shown on the next
+  # update
+
+  def skip_frames( self, frames ):
+
+    for _expedition in self.expeditions_group:
+      _expedition.step_count = min( _expedition.step_count + frames, properties.FRAME_SWITCH )
+
+    tile.overlay_state['fire_step'] = min( tile.overlay_state['fire_step'] + frames, properties.FRAME_SWITCH )
+
+  # Block until an event arrives. Animations only advance once a frame,
+  # so the wait also ends when the next animation frame is due, and the
+  # frames spent waiting are skipped. With nothing animating, the wait
+  # lasts until the next input.
+
+  def wait_event( self ):
+
+    frames = self.get_idle_frames()
+
+    if frames == None:
+      event = pygame.event.wait()
+
+    else:
+
+      start = pygame.time.get_ticks()
+
+      pygame.time.set_timer( WAKE_EVENT, max( frames - 1, 1 ) * 1000 / properties.FPS )
+
+      event = pygame.event.wait()
+
+      pygame.time.set_timer( WAKE_EVENT, 0 )
+
+      self.skip_frames( ( pygame.time.get_ticks() - start ) * properties.FPS / 1000 )
+
+    self.timed_wake = event.type == WAKE_EVENT
+
+    if not self.timed_wake:
+      pygame.event.post( event )
+
   #.......................................................................
   # Start game engine
   #.......................................................................
 
-  def start( self ):
+  def start( self, load_path=None ):
 
     # Initialize clock
 
     clock = pygame.time.Clock()
 
-    # Generate random map
+    # Resume saved game if given, otherwise generate random map and add
+    # starting expedition
 
-    self.mg = mapgen.MapGen( properties.MAP_SIZE )
-    self.init_map( self.mg.map )
+    if load_path != None:
+      self.load_game( load_path )
 
-    # Add starting expedition
+    else:
+      self.mg = mapgen.MapGen( properties.MAP_SIZE, self._rng )
+      self.init_map( self.mg.map )
+      self.init_expedition()
 
-    self.init_expedition()
+    self.tracker.snapshot( 'start' )
 
     # Main game loop
 
-    init_bg = True
-
     while not self.done:
 
+      self.profiler.begin_frame( PHASE_NAMES[self.phase] )
+
       # Process inputs
 
       self.get_inputs()
 
-      # Handle camera scrolling
+      self.profiler.mark( 'inputs' )
 
-      cam_moved = False
+      # Handle camera scrolling
 
       if self.cam_en:
-        cam_moved = self.scroll_camera()
+        self.scroll_camera()
 
-      if init_bg:
-        cam_moved = True
-        init_bg   = False
+      self.profiler.mark( 'camera' )
 
       # Handle done selection
 
@@ -1646,7 +1846,7 @@ class Engine:
       if not done_used and not menu_used:
 
         if self.phase == PHASE_LOOK:
-          cam_moved |= self.handle_phase_look()
+          self.handle_phase_look()
 
         elif self.phase == PHASE_EXPLORE0:
           self.handle_phase_explore0()
@@ -1693,11 +1893,22 @@ class Engine:
         elif self.phase == PHASE_TRANSITION:
           self.handle_phase_transition()
 
-      # Update graphics
+      self.profiler.mark( 'phase' )
+
+      # Update graphics, skipping the drawing if nothing changed and
+      # sleeping until the next animation frame or input instead
 
       self.update_all()
-      self.draw_all( cam_moved )
+
+      self.profiler.mark( 'update' )
+
+      if self.check_redraw():
+        self.draw_all()
+        self.profiler.end_frame()
+      else:
+        self.profiler.end_frame()
+        self.wait_event()
 
       # Increment clock
 
-      clock.tick( properties.FPS )
+      clock.tick( self.fps )
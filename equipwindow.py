@@ -13,6 +13,7 @@ import textbox
 import infotextbox
 import healthtextbox
 import button
+import combat
 import tile
 import expedition
 import survivor
@@ -35,6 +36,8 @@ NEW_Y_OFFSET  = 32 + properties.ACTION_INFO_HEIGHT + 32
 BUTTON_X_OFFSET = properties.ACTION_WIDTH / 2 - properties.MENU_WIDTH / 2
 BUTTON_Y_OFFSET = properties.ACTION_HEIGHT - 16 - properties.MENU_HEIGHT
 
+ODDS_X_OFFSET = properties.ACTION_WIDTH - 16
+
 #-------------------------------------------------------------------------
 # Main Class
 #-------------------------------------------------------------------------
@@ -51,10 +54,17 @@ class EquipWindow( window.Window ):
 
     self._expedition = None
     self.survivors   = []
+    self.defenses    = []
     self._survivor   = None
     self._item       = None
     self.selected    = False
 
+    # Combat odds are only simulated again when the loadout changes
+
+    self.odds_loadout = None
+    self.odds_surface = None
+    self.odds_rect    = None
+
     # Initialize sub-windows
 
     self.info_tbox = infotextbox.InfoTextBox(
@@ -128,10 +138,14 @@ class EquipWindow( window.Window ):
 
     self._expedition = None
     self.survivors   = []
+    self.defenses    = []
     self._survivor   = None
     self._item       = None
     self.selected    = False
 
+    self.odds_loadout = None
+    self.odds_surface = None
+
     self.reset_scroll()
 
   # Process inputs. Return true if ready button is clicked.
@@ -147,26 +161,25 @@ class EquipWindow( window.Window ):
 
     # Display list of defenders
 
-    for _survivor, rect in zip( self.survivors, self.old_tbox.rect_matrix[0] ):
+    _survivor = self.old_tbox.get_item( self.survivors, mouse_x, mouse_y )
 
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+    if _survivor != None:
 
-        # Only do hover display if survivor is not selected yet
+      # Only do hover display if survivor is not selected yet
 
-        if not self.selected:
-          self._survivor = _survivor
+      if not self.selected:
+        self._survivor = _survivor
 
-        # Show equipment once a survivor is selected
+      # Show equipment once a survivor is selected
 
-        if mouse_click:
+      if mouse_click:
 
-          if self.selected and ( _survivor == self._survivor ):
-            self.half_reset()
+        if self.selected and ( _survivor == self._survivor ):
+          self.half_reset()
 
-          else:
-            self._survivor = _survivor
-            self.selected  = True
+        else:
+          self._survivor = _survivor
+          self.selected  = True
 
     # Display list of available equipment once survivor is chosen
 
@@ -178,40 +191,39 @@ class EquipWindow( window.Window ):
         if ( _item.type == 'Weapon' ) or ( _item.type == 'Armor' ):
           items.append( _item )
 
-      for _item, rect in zip( items, self.new_tbox.rect_matrix[0] ):
+      _item = self.new_tbox.get_item( items, mouse_x, mouse_y )
 
-        if rect.collidepoint( mouse_x, mouse_y ) \
-          and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      if _item != None:
 
-          # Show equipment stats difference on hover
+        # Show equipment stats difference on hover
 
-          if type( _item ) != str:
-            self._item = _item
+        if type( _item ) != str:
+          self._item = _item
 
-          # Assign new equipment to survivor
+        # Assign new equipment to survivor
 
-          if mouse_click:
+        if mouse_click:
 
-            if _item == 'Unequip Weapon':
-              self._survivor.weapon.free = True
-              self._survivor.weapon      = item.Item( 'Unarmed' )
+          if _item == 'Unequip Weapon':
+            self._survivor.weapon.free = True
+            self._survivor.weapon      = item.Item( 'Unarmed' )
 
-            elif _item == 'Unequip Armor':
-              self._survivor.armor.free = True
-              self._survivor.armor      = item.Item( 'Clothes' )
+          elif _item == 'Unequip Armor':
+            self._survivor.armor.free = True
+            self._survivor.armor      = item.Item( 'Clothes' )
 
-            elif ( _item != self._survivor.weapon ) \
-              and ( _item != self._survivor.armor ):
+          elif ( _item != self._survivor.weapon ) \
+            and ( _item != self._survivor.armor ):
 
-              _item.free = False
+            _item.free = False
 
-              if _item.type == 'Weapon':
-                self._survivor.weapon.free = True
-                self._survivor.weapon      = _item
+            if _item.type == 'Weapon':
+              self._survivor.weapon.free = True
+              self._survivor.weapon      = _item
 
-              elif _item.type == 'Armor':
-                self._survivor.armor.free = False
-                self._survivor.armor      = _item
+            elif _item.type == 'Armor':
+              self._survivor.armor.free = False
+              self._survivor.armor      = _item
 
     # Scroll text boxes if necessary
 
@@ -271,10 +283,39 @@ class EquipWindow( window.Window ):
 
     return [ health_col ]
 
+  # Estimate odds of surviving the night with the current loadout
+
+  def update_odds( self ):
+
+    loadout = [ ( _survivor, _survivor.weapon, _survivor.armor, _survivor.stamina )
+                for _survivor in self.survivors ]
+
+    if loadout == self.odds_loadout:
+      return
+
+    self.odds_loadout = loadout
+
+    win_prob, casualties = combat.simulate_tile(
+      self.survivors, self._expedition.pos_tile, self.defenses, self._expedition._inventory
+    )
+
+    text = 'WIN %d%%  LOSSES %.1f' % ( int( win_prob * 100 ), casualties )
+
+    self.odds_surface, self.odds_rect = utils.gen_text_pos(
+      text, 16, 0, properties.TEXT_Y_OFFSET, utils.BLACK, True
+    )
+
+    self.odds_rect.right = ODDS_X_OFFSET
+
   # Update graphics
 
   def update( self ):
 
+    # Simulate combat odds if valid expedition is assigned
+
+    if ( self._expedition != None ) and ( len( self.survivors ) > 0 ):
+      self.update_odds()
+
     # Populate information text box if necessary
 
     if self._survivor != None:
@@ -315,6 +356,9 @@ class EquipWindow( window.Window ):
     rect_updates += [ self.image.blit( self.old_label_surface, self.old_label_rect ) ]
     rect_updates += [ self.image.blit( self.new_label_surface, self.new_label_rect ) ]
 
+    if self.odds_surface != None:
+      rect_updates += [ self.image.blit( self.odds_surface, self.odds_rect ) ]
+
     # Draw craft button
 
     rect_updates += self.button_group.draw( self.image )
@@ -6,7 +6,6 @@
 import pygame, sys, os
 from pygame.locals import *
 
-import random
 import properties
 import utils
 import window
@@ -74,13 +73,7 @@ class EventWindow( window.Window ):
 
     assert( self._expedition != None )
 
-    self._expedition._inventory.food  += self.food
-    self._expedition._inventory.wood  += self.wood
-    self._expedition._inventory.metal += self.metal
-    self._expedition._inventory.ammo  += self.ammo
-
-    if self._item != None:
-      self._expedition._inventory.items.append( self._item )
+    self._expedition.store_loot( self.food, self.wood, self.metal, self.ammo, self._item )
 
     # Do not subtract stamina cost if scavenging at the end of explore
 
@@ -92,14 +85,7 @@ class EventWindow( window.Window ):
 
   def commit_food( self ):
 
-    self._expedition._inventory.food -= len( self._expedition.survivors )
-
-    if self._expedition._inventory.food < 0:
-      self._expedition._inventory.food = 0
-
-    for _survivor in self.starved:
-      if _survivor.stamina == 0:
-        self._expedition.survivors.remove( _survivor )
+    self._expedition.eat( self.starved )
 
   # Reset expedition to clean state
 
@@ -163,9 +149,9 @@ class EventWindow( window.Window ):
     assert( self._tile != None )
 
     self.food, self.wood, self.metal, self.ammo \
-      = self._tile.roll_resources( self.survivors )
+      = self._tile.roll_resources( self.survivors, self._expedition._rng )
 
-    self._item = self._tile.roll_items( self.survivors )
+    self._item = self._tile.roll_items( self.survivors, self._expedition._rng )
 
     self.set_scavenge_text()
 
@@ -192,31 +178,7 @@ class EventWindow( window.Window ):
 
   def check_food( self ):
 
-    assert( self._expedition._inventory.food < len( self._expedition.survivors ) )
-
-    self.starved = {}
-
-    num_starved = len( self._expedition.survivors ) - self._expedition._inventory.food
-
-    # Randomly roll which survivors starved this turn
-
-    for i in range( num_starved ):
-
-      _survivor = random.choice( self._expedition.survivors )
-
-      while _survivor in self.starved:
-        _survivor = random.choice( self._expedition.survivors )
-
-      # Calculate starvation damage as a percent of the max stamina
-
-      dmg = int( properties.STARVE_RATE * _survivor.max_stamina )
-
-      self.starved[_survivor] = dmg
-
-      _survivor.stamina -= dmg
-
-      if _survivor.stamina < 0:
-        _survivor.stamina = 0
+    self.starved = self._expedition.starve()
 
     self.set_food_text()
 
@@ -8,95 +8,126 @@
 import pygame, sys, os
 from pygame.locals import *
 
-import random
+import collections
 import properties
 import utils
+import assets
 import survivor
 import inventory
+import item
+import attribute
 import tile
+import pathfind
+import fog
 
 #-------------------------------------------------------------------------
-# Main Class
+# Utility Tables
 #-------------------------------------------------------------------------
 
-class Expedition( pygame.sprite.Sprite ):
+# Directions with their own walking animation
 
-  # Return modified view range
+direction_table = [ 'north', 'east', 'south', 'west' ]
 
-  def get_view_range( self ):
+#-------------------------------------------------------------------------
+# Expedition Index
+#-------------------------------------------------------------------------
+# Expeditions of the current game indexed by tile position, the number
+# of free survivors across all expeditions, and the expeditions with
+# free survivors in the order they got them. Expeditions keep the index
+# up to date as they move, gain or lose survivors and are killed, so
+# lookups never scan the whole list of expeditions.
 
-    bonus = 0
+index_state = {
+  'tiles'    : {},
+  'num_free' : 0,
+  'free'     : collections.OrderedDict(),
+}
 
-    for _item in self._inventory.items:
-      if _item.name == 'Binoculars':
-        bonus = 2
-        break
+# Clear index for a new game
 
-    return self.view_range + bonus
+def reset_index():
 
-  # Clear map fog around expedition tile
+  index_state['tiles']    = {}
+  index_state['num_free'] = 0
+  index_state['free']     = collections.OrderedDict()
 
-  def unfog( self ):
+# Return list of expeditions on given tile
+
+def get_expeditions( _tile ):
+
+  return index_state['tiles'].get( ( _tile.pos_x, _tile.pos_y ), [] )
+
+# Return expedition on given tile, or None if there is none
+
+def get_expedition( _tile ):
+
+  expeditions = get_expeditions( _tile )
+
+  if len( expeditions ) == 0:
+    return None
 
-    visited  = []
-    frontier = [ self.pos_tile ]
+  return expeditions[0]
 
-    self.pos_tile.fog = False
+# Return first expedition with free survivors, or None if there is none
 
-    # Iterate over frontiers until maximum cost is reached
+def get_free_expedition():
 
-    for i in range( self.get_view_range() ):
+  for _expedition in index_state['free']:
+    return _expedition
 
-      next_frontier = []
+  return None
 
-      # Search all tiles in the current frontier
+# Return number of free survivors across all expeditions
 
-      for ti in frontier:
+def get_num_free():
 
-        # Unfog neighboring tiles within map bounds
+  return index_state['num_free']
 
-        if ti.pos_y > 0:
-          if ( self.map[ti.pos_x][ti.pos_y-1] not in visited ) \
-            and ( self.map[ti.pos_x][ti.pos_y-1] not in next_frontier ):
-            self.map[ti.pos_x][ti.pos_y-1].fog = False
-            next_frontier.append( self.map[ti.pos_x][ti.pos_y-1] )
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class Expedition( pygame.sprite.Sprite ):
 
-        if ti.pos_x < ( properties.MAP_SIZE - 1 ):
-          if self.map[ti.pos_x+1][ti.pos_y] not in visited \
-            and ( self.map[ti.pos_x+1][ti.pos_y] not in next_frontier ):
-            self.map[ti.pos_x+1][ti.pos_y].fog = False
-            next_frontier.append( self.map[ti.pos_x+1][ti.pos_y] )
+  # Images are only loaded if drawing is enabled (disabled by the
+  # headless engine)
+
+  draw_en = True
+
+  # Return modified view range
+
+  def get_view_range( self ):
 
-        if ti.pos_y < ( properties.MAP_SIZE - 1 ):
-          if self.map[ti.pos_x][ti.pos_y+1] not in visited \
-            and ( self.map[ti.pos_x][ti.pos_y+1] not in next_frontier ):
-            self.map[ti.pos_x][ti.pos_y+1].fog = False
-            next_frontier.append( self.map[ti.pos_x][ti.pos_y+1] )
+    bonus = 0
 
-        if ti.pos_x > 0:
-          if self.map[ti.pos_x-1][ti.pos_y] not in visited \
-            and ( self.map[ti.pos_x-1][ti.pos_y] not in next_frontier ):
-            self.map[ti.pos_x-1][ti.pos_y].fog = False
-            next_frontier.append( self.map[ti.pos_x-1][ti.pos_y] )
+    for _item in self._inventory.items:
+      if _item.name == 'Binoculars':
+        bonus = 2
+        break
 
-        # Mark tile in frontier as visited
+    return self.view_range + bonus
 
-        visited.append( ti )
+  # Clear map fog around expedition tile
 
-      # Swap frontiers when all tiles in current frontier are processed
+  def unfog( self ):
 
-      frontier = next_frontier
+    fog.reveal( self.map, self.pos_tile, self.get_view_range() )
 
   # Constructor
 
-  def __init__( self, pos_tile, survivors, _inventory, map, img_idx=-1 ):
+  def __init__( self, pos_tile, survivors, _inventory, map, _rng, img_idx=-1 ):
 
     pygame.sprite.Sprite.__init__( self, self.groups )
 
+    self._pos_tile   = None
+    self._survivors  = []
+    self.num_free    = 0
+
     self.pos_tile    = pos_tile
     self.survivors   = survivors
     self._inventory  = _inventory
     self.map         = map
+    self._rng        = _rng
     self.path_dic    = {}
     self.move_route  = []
     self.view_range  = 4
@@ -111,18 +142,132 @@ class Expedition( pygame.sprite.Sprite ):
     # Set image and make background transparent
 
     if img_idx < 0:
-      self.img_roll = random.randint( 0, 3 )
+      self.img_roll = self._rng.expedition.randint( 0, 3 )
     else:
       self.img_roll = img_idx
 
-    self.img_path     = properties.EXPD_PATH + 'hero' + str( self.img_roll ) + '_'
-    self.surface      = pygame.image.load( self.img_path + self.direction + str( self.draw_count ) + '.png' )
-    self.surface.set_colorkey( self.surface.get_at( ( 0, 0 ) ), RLEACCEL )
-    self.image        = self.surface.convert()
-    self.rect         = self.image.get_rect()
-    self.abs_x        = self.pos_tile.pos_x * properties.TILE_WIDTH
-    self.abs_y        = self.pos_tile.pos_y * properties.TILE_HEIGHT
-    self.rect.topleft = self.pos_tile.rect.topleft
+    self.img_path = properties.EXPD_PATH + 'hero' + str( self.img_roll ) + '_'
+    self.abs_x    = self.pos_tile.abs_x
+    self.abs_y    = self.pos_tile.abs_y
+
+    # Animation frames of the hero variant, indexed by direction and
+    # frame number
+
+    if self.draw_en:
+
+      self.frames = dict( [
+        ( direction, assets.get_frames( self.img_path + direction, properties.EXPD_FRAMES ) )
+        for direction in direction_table
+      ] )
+
+      self.image        = self.frames[self.direction][self.draw_count]
+      self.rect         = self.image.get_rect()
+      self.rect.topleft = self.abs_x, self.abs_y
+
+  # Position and survivors are properties so that the expedition index is
+  # updated whenever either changes. Survivors added to the list in
+  # place must go through add_survivor() instead.
+
+  @property
+  def pos_tile( self ):
+    return self._pos_tile
+
+  @pos_tile.setter
+  def pos_tile( self, pos_tile ):
+
+    self.remove_tile()
+
+    self._pos_tile = pos_tile
+
+    index_state['tiles'].setdefault( ( pos_tile.pos_x, pos_tile.pos_y ), [] ).append( self )
+
+  # Remove expedition from the index of its tile
+
+  def remove_tile( self ):
+
+    if self._pos_tile != None:
+
+      expeditions = index_state['tiles'].get( ( self._pos_tile.pos_x, self._pos_tile.pos_y ), [] )
+
+      if self in expeditions:
+        expeditions.remove( self )
+
+  @property
+  def survivors( self ):
+    return self._survivors
+
+  @survivors.setter
+  def survivors( self, survivors ):
+
+    for _survivor in self._survivors:
+      if _survivor not in survivors:
+        self.detach( _survivor )
+
+    self._survivors = survivors
+
+    for _survivor in survivors:
+      self.attach( _survivor )
+
+  # Make given survivor count towards the free survivors of this
+  # expedition instead of its previous one
+
+  def attach( self, _survivor ):
+
+    if _survivor.party is self:
+      return
+
+    if _survivor.party != None:
+      _survivor.party.detach( _survivor )
+
+    _survivor.party = self
+
+    if _survivor.free:
+      self.add_free( 1 )
+
+  # Stop counting given survivor towards the free survivors of this
+  # expedition
+
+  def detach( self, _survivor ):
+
+    if _survivor.party is not self:
+      return
+
+    _survivor.party = None
+
+    if _survivor.free:
+      self.add_free( -1 )
+
+  # Change number of free survivors, called when a survivor in this
+  # expedition is freed or given an order
+
+  def add_free( self, delta ):
+
+    self.num_free           += delta
+    index_state['num_free'] += delta
+
+    if self.num_free > 0:
+      index_state['free'][self] = True
+    elif self in index_state['free']:
+      del index_state['free'][self]
+
+  # Add survivor to expedition
+
+  def add_survivor( self, _survivor ):
+
+    self._survivors.append( _survivor )
+    self.attach( _survivor )
+
+  # Remove expedition from the map and the index. Survivors still in the
+  # expedition no longer count as free.
+
+  def kill( self ):
+
+    pygame.sprite.Sprite.kill( self )
+
+    for _survivor in self._survivors:
+      self.detach( _survivor )
+
+    self.remove_tile()
 
   # Return list of free survivors which can take orders
 
@@ -166,20 +311,14 @@ class Expedition( pygame.sprite.Sprite ):
 
   def draw_animation( self ):
 
-    img_path   = self.img_path + self.direction + str( self.draw_count ) + '.png'
-    surface    = pygame.image.load( img_path )
-    surface.set_colorkey( surface.get_at( ( 0, 0 ) ), RLEACCEL )
-    self.image = surface.convert()
-
-  # Update graphics
+    if not self.draw_en:
+      return
 
-  def update( self, cam_x, cam_y, cam_en ):
+    self.image = self.frames[self.direction][self.draw_count]
 
-    # Adjust position relative to camera
+  # Update graphics
 
-    if cam_en:
-      self.rect.top  = self.abs_y - cam_y
-      self.rect.left = self.abs_x - cam_x
+  def update( self, cam_x, cam_y ):
 
     # Switch animation frame when necessary
 
@@ -188,7 +327,7 @@ class Expedition( pygame.sprite.Sprite ):
     if self.step_count == properties.FRAME_SWITCH:
 
       self.draw_count += 1
-      if self.draw_count > 1:
+      if self.draw_count >= properties.EXPD_FRAMES:
         self.draw_count = 0
 
       self.step_count = 0
@@ -198,38 +337,39 @@ class Expedition( pygame.sprite.Sprite ):
     else:
       self.step_count += 1
 
-    # Handle movement based on calculated shortest path to destination
+    # Handle movement based on calculated shortest path to destination.
+    # The position changes on every step, so every step is drawn.
 
     if len( self.move_route ) > 0:
 
+      utils.invalidate()
+
       # Move right
 
-      if ( self.move_route[0].rect.left ) > self.rect.left:
-        self.rect.move_ip( properties.EXPD_SPEED, 0 )
+      if self.move_route[0].abs_x > self.abs_x:
+        self.abs_x += properties.EXPD_SPEED
 
       # Move left
 
-      elif ( self.move_route[0].rect.left ) < self.rect.left:
-        self.rect.move_ip( -properties.EXPD_SPEED, 0 )
+      elif self.move_route[0].abs_x < self.abs_x:
+        self.abs_x -= properties.EXPD_SPEED
 
       # Move down
 
-      elif ( self.move_route[0].rect.top ) > self.rect.top:
-        self.rect.move_ip( 0, properties.EXPD_SPEED )
+      elif self.move_route[0].abs_y > self.abs_y:
+        self.abs_y += properties.EXPD_SPEED
 
       # Move up
 
-      elif ( self.move_route[0].rect.top ) < self.rect.top:
-        self.rect.move_ip( 0, -properties.EXPD_SPEED )
+      elif self.move_route[0].abs_y < self.abs_y:
+        self.abs_y -= properties.EXPD_SPEED
 
       # Update position tile and route if at destination
 
-      if ( self.move_route[0].rect.left == self.rect.left ) \
-        and ( self.move_route[0].rect.top == self.rect.top ):
+      if ( self.move_route[0].abs_x == self.abs_x ) \
+        and ( self.move_route[0].abs_y == self.abs_y ):
 
         self.pos_tile = self.move_route[0]
-        self.abs_x    = self.pos_tile.pos_x * properties.TILE_WIDTH
-        self.abs_y    = self.pos_tile.pos_y * properties.TILE_HEIGHT
 
         del self.move_route[0]
 
@@ -249,10 +389,28 @@ class Expedition( pygame.sprite.Sprite ):
 
         self.unfog()
 
+    # Adjust position relative to camera
+
+    self.rect.topleft = self.abs_x - cam_x, self.abs_y - cam_y
+
     # Draw animation
 
     if do_draw:
       self.draw_animation()
+      utils.invalidate()
+
+  # Move to the end of the route immediately, without animation
+
+  def finish_route( self ):
+
+    for _tile in self.move_route:
+      self.pos_tile = _tile
+      self.unfog()
+
+    self.move_route = []
+    self.direction  = 'south'
+    self.abs_x      = self.pos_tile.abs_x
+    self.abs_y      = self.pos_tile.abs_y
 
   # Calculate the minimum current stamina across all survivors usable by
   # expedition for exploration.
@@ -270,66 +428,33 @@ class Expedition( pygame.sprite.Sprite ):
     return min_stamina
 
   # Path finding, populates a dictionary of all possible tiles reachable
-  # by selected expedition with the specified maximum cost.
+  # by selected expedition with the specified maximum cost. Each tile
+  # remembers the tile leading to it in the shortest path as well as the
+  # cost to get there.
 
   def calc_range( self, survivors ):
 
-    # Use Dijkstra's algorithm to find the shortest path from source to
-    # destination. A dictionary is used for tracking the shortest path to
-    # a given location (each tile remembers the tile leading to it in the
-    # shortest path as well as the cost to get there). A list of
-    # locations at the current frontier is updated after every super-step
-    # of the algorithm.
-
-    self.path_dic = { self.pos_tile: [self.pos_tile,0] }
-    frontier      = [ self.pos_tile ]
-
-    min_stamina = self.calc_min_stamina( survivors )
-
-    # Iterate over frontiers until maximum cost is reached
-
-    while len( frontier ) > 0:
+    self.path_dic = pathfind.calc_range(
+      self.map, self.pos_tile, self.calc_min_stamina( survivors )
+    )
 
-      next_frontier = []
-
-      # Search all tiles in the current frontier
-
-      for _tile in frontier:
-
-        # Determine which neighbors are within map bounds
-
-        neighbors = []
-
-        if _tile.pos_y > 0:
-          neighbors.append( self.map[_tile.pos_x][_tile.pos_y-1] )
-
-        if _tile.pos_x < ( properties.MAP_SIZE - 1 ):
-          neighbors.append( self.map[_tile.pos_x+1][_tile.pos_y] )
-
-        if _tile.pos_y < ( properties.MAP_SIZE - 1 ):
-          neighbors.append( self.map[_tile.pos_x][_tile.pos_y+1] )
-
-        if _tile.pos_x > 0:
-          neighbors.append( self.map[_tile.pos_x-1][_tile.pos_y] )
-
-        for next_tile in neighbors:
-
-          next_cost = self.path_dic[_tile][1] + next_tile.move_cost
+  # Calculate shortest path to destination tile. Path dictionary must be
+  # populated before calling this method using the calc_range() method
+  # above, unless the survivors are given, in which case only the path
+  # to the destination is searched for. Returns the cost to reach the
+  # destination.
 
-          if ( ( next_cost < min_stamina ) and ( next_tile not in self.path_dic ) ) \
-            or ( ( next_tile in self.path_dic ) and ( next_cost < self.path_dic[next_tile][1] ) ):
-            self.path_dic[next_tile] = [ _tile, next_cost ]
-            next_frontier.append( next_tile )
+  def calc_path( self, dest_tile, survivors=None ):
 
-      # Swap frontiers when all tiles in current frontier are processed
+    if survivors != None:
 
-      frontier = next_frontier
+      route, cost = pathfind.calc_path(
+        self.map, self.pos_tile, dest_tile, self.calc_min_stamina( survivors )
+      )
 
-  # Calculate shortest path to destination tile. Path dictionary must be
-  # populated before calling this method using the calc_range() method
-  # above. Returns the cost to reach the destination.
+      assert( route != None )
 
-  def calc_path( self, dest_tile ):
+      return route, cost
 
     assert( dest_tile in self.path_dic )
 
@@ -384,6 +509,111 @@ class Expedition( pygame.sprite.Sprite ):
 
     self._inventory.items = tmp_items
 
+  # Add scavenged resources and item to inventory
+
+  def store_loot( self, food, wood, metal, ammo, _item ):
+
+    self._inventory.food  += food
+    self._inventory.wood  += wood
+    self._inventory.metal += metal
+    self._inventory.ammo  += ammo
+
+    if _item != None:
+      self._inventory.items.append( _item )
+
+  # Return wood and metal cost of crafting item with given survivors.
+  # Halve the cost of materials if engineer is helping.
+
+  def get_craft_cost( self, _item, survivors ):
+
+    bonus = 1.0
+
+    for _survivor in survivors:
+      if _survivor.job == attribute.ENGINEER:
+        bonus = 0.5
+
+    wood_cost  = max( int( _item.wood_cost * bonus ), 1 )
+    metal_cost = max( int( _item.metal_cost * bonus ), 1 )
+
+    return wood_cost, metal_cost
+
+  # Check if costs and requirements for crafting item have been met. Each
+  # survivor adds one to the total mental bonus by default.
+
+  def can_craft( self, _item, survivors ):
+
+    wood_cost, metal_cost = self.get_craft_cost( _item, survivors )
+
+    mental = len( survivors )
+
+    for _survivor in survivors:
+      mental += _survivor.get_mental_bonus()
+
+    wood_check   = self._inventory.wood >= wood_cost
+    metal_check  = self._inventory.metal >= metal_cost
+    mental_check = mental >= _item.mental_req
+
+    return wood_check and metal_check and mental_check
+
+  # Craft item with given survivors and subtract costs
+
+  def craft( self, _item, survivors ):
+
+    wood_cost, metal_cost = self.get_craft_cost( _item, survivors )
+
+    self._inventory.items.append( item.Item( _item.name ) )
+
+    self._inventory.wood  -= wood_cost
+    self._inventory.metal -= metal_cost
+
+    for _survivor in survivors:
+      _survivor.free     = False
+      _survivor.stamina -= max( properties.CRAFT_COST - _survivor.get_attributes().day_bonus, 0 )
+
+  # Randomly roll which survivors starve when there is not enough food.
+  # Returns dictionary of starved survivors and damage taken.
+
+  def starve( self ):
+
+    assert( self._inventory.food < len( self.survivors ) )
+
+    starved = {}
+
+    num_starved = len( self.survivors ) - self._inventory.food
+
+    for i in range( num_starved ):
+
+      _survivor = self._rng.event.choice( self.survivors )
+
+      while _survivor in starved:
+        _survivor = self._rng.event.choice( self.survivors )
+
+      # Calculate starvation damage as a percent of the max stamina
+
+      dmg = int( properties.STARVE_RATE * _survivor.max_stamina )
+
+      starved[_survivor] = dmg
+
+      _survivor.stamina -= dmg
+
+      if _survivor.stamina < 0:
+        _survivor.stamina = 0
+
+    return starved
+
+  # Eat food for the day and remove survivors who starved to death
+
+  def eat( self, starved ):
+
+    self._inventory.food -= len( self.survivors )
+
+    if self._inventory.food < 0:
+      self._inventory.food = 0
+
+    dead = [ _survivor for _survivor in starved if _survivor.stamina == 0 ]
+
+    self.survivors = [ _survivor for _survivor in self.survivors if _survivor not in dead ]
+
   # Merge expeditions
 
   def merge( self, _expedition ):
@@ -0,0 +1,120 @@
+#=========================================================================
+# fog.py
+#=========================================================================
+# Fog of war for the game map. Fog is tracked in a map-wide bytearray
+# indexed by ( pos_x * size + pos_y ), so already revealed tiles are
+# skipped without touching Tile objects. Expeditions reveal a diamond of
+# tiles around them, which is precomputed once per view range.
+
+#-------------------------------------------------------------------------
+# Fog State
+#-------------------------------------------------------------------------
+# Fog bits of the map the state was built for (1 means fogged). The bits
+# are rebuilt from the tiles whenever a different map is revealed.
+# Streamed worlds keep their own fog bits per chunk.
+
+fog_state = {
+  'map'  : None,
+  'bits' : None,
+}
+
+# Offsets of all tiles within Manhattan distance, indexed by view range
+
+mask_table = {}
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Return list of ( x, y ) offsets covered by given view range
+
+def get_mask( view_range ):
+
+  if view_range not in mask_table:
+
+    mask = []
+
+    for dx in range( -view_range, view_range + 1 ):
+
+      span = view_range - abs( dx )
+
+      for dy in range( -span, span + 1 ):
+        mask.append( ( dx, dy ) )
+
+    mask_table[view_range] = mask
+
+  return mask_table[view_range]
+
+# Return fog bits for given map, rebuilding them if the map changed
+
+def get_bits( map ):
+
+  if not isinstance( map, list ):
+    return map.fog_view
+
+  if fog_state['map'] is not map:
+
+    size = len( map )
+    bits = bytearray( size * size )
+
+    for column in map:
+      for _tile in column:
+        if _tile.fog:
+          bits[_tile.pos_x * size + _tile.pos_y] = 1
+
+    fog_state['map']  = map
+    fog_state['bits'] = bits
+
+  return fog_state['bits']
+
+# Return number of fogged tiles within view range of given tile, which
+# is the number of tiles an expedition would reveal there
+
+def count_fog( map, pos_tile, view_range ):
+
+  bits  = get_bits( map )
+  size  = len( map )
+  pos_x = pos_tile.pos_x
+  pos_y = pos_tile.pos_y
+
+  num_fog = 0
+
+  for dx, dy in get_mask( view_range ):
+
+    x = pos_x + dx
+    y = pos_y + dy
+
+    if ( x >= 0 ) and ( x < size ) and ( y >= 0 ) and ( y < size ):
+      num_fog += bits[x * size + y]
+
+  return num_fog
+
+# Clear fog within view range of given tile. Only tiles that were still
+# fogged are updated, which marks them dirty for the map layer. Returns
+# the number of newly revealed tiles.
+
+def reveal( map, pos_tile, view_range ):
+
+  bits  = get_bits( map )
+  size  = len( map )
+  pos_x = pos_tile.pos_x
+  pos_y = pos_tile.pos_y
+
+  num_revealed = 0
+
+  for dx, dy in get_mask( view_range ):
+
+    x = pos_x + dx
+    y = pos_y + dy
+
+    if ( x < 0 ) or ( x >= size ) or ( y < 0 ) or ( y >= size ):
+      continue
+
+    idx = x * size + y
+
+    if bits[idx]:
+      bits[idx]     = 0
+      map[x][y].fog = False
+      num_revealed += 1
+
+  return num_revealed
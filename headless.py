@@ -0,0 +1,634 @@
+#=========================================================================
+# headless.py
+#=========================================================================
+# Game engine without a display. Follows the same day/night rules as the
+# main engine, but each phase is driven by a direct method call instead
+# of mouse input, and no surfaces, text or animations are generated.
+# Used for simulating many games quickly to check balance and catch
+# regressions.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import copy
+import properties
+import rng
+import engine
+import mapgen
+import world
+import tile
+import expedition
+import survivor
+import inventory
+import item
+import attribute
+import combat
+import pathfind
+import snapshot
+import memtrack
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Defenses crafted by the default script, in order of preference
+
+craft_list = [ 'Barricade', 'Spike Trap', 'Pit Trap' ]
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Play the day of given expedition for the default script. If its
+# survivors are all free and fully rested, the whole expedition moves to
+# the farthest tile it can reach with half of their stamina. Otherwise,
+# an expedition without a free defense crafts the first one on the craft
+# list it can afford, then every survivor that can afford it scavenges
+# and the others rest.
+
+def default_day( eng, _expedition ):
+
+  survivors = _expedition.get_free()
+
+  # Explore
+
+  rested = len( survivors ) == len( _expedition.survivors )
+
+  for _survivor in survivors:
+    if _survivor.stamina < _survivor.max_stamina:
+      rested = False
+
+  if rested:
+
+    path_dic = pathfind.calc_range(
+      eng.map, _expedition.pos_tile, _expedition.calc_min_stamina( survivors ) / 2
+    )
+
+    dest_tile = None
+    dest_key  = None
+
+    for _tile, info in path_dic.iteritems():
+
+      if _tile == _expedition.pos_tile:
+        continue
+
+      tile_key = ( info[1], _tile.pos_x, _tile.pos_y )
+
+      if ( dest_key == None ) or ( tile_key > dest_key ):
+        dest_tile = _tile
+        dest_key  = tile_key
+
+    if dest_tile != None:
+      eng.explore( _expedition, survivors, dest_tile )
+      return
+
+  # Craft
+
+  defenses = [ _item for _item in _expedition._inventory.get_free() if _item.type == 'Defense' ]
+
+  if len( defenses ) == 0:
+
+    crafters = [
+      _survivor for _survivor in survivors
+      if _survivor.stamina > max( properties.CRAFT_COST - _survivor.get_attributes().day_bonus, 0 ) + 2
+    ]
+
+    for name in craft_list:
+      if ( len( crafters ) > 0 ) and eng.craft( _expedition, name, crafters ):
+        break
+
+  # Scavenge and rest
+
+  scavengers = []
+  resters    = []
+
+  for _survivor in _expedition.get_free():
+    if _survivor.stamina > max( properties.SCAVENGE_COST - _survivor.get_attributes().day_bonus, 0 ) + 2:
+      scavengers.append( _survivor )
+    else:
+      resters.append( _survivor )
+
+  if len( scavengers ) > 0:
+    eng.scavenge( _expedition, scavengers )
+
+  if len( resters ) > 0:
+    eng.rest( _expedition, resters )
+
+# Default script: at day, play every expedition with default_day. At
+# night, defend with the strongest survivors of each expedition using
+# every free weapon, armor and defense.
+
+def default_script( eng ):
+
+  if eng.day_en:
+
+    # Expeditions are looked up again after each one, since exploring
+    # can merge them
+
+    _expedition = expedition.get_free_expedition()
+
+    while _expedition != None:
+      default_day( eng, _expedition )
+      _expedition = expedition.get_free_expedition()
+
+  else:
+
+    for _expedition in list( eng.expeditions ):
+
+      defenders = sorted( _expedition.get_free(), key=lambda s: s.stamina, reverse=True )
+      defenders = defenders[:properties.DEFENDER_LIMIT]
+
+      defenses  = [ _item for _item in _expedition._inventory.get_free() if _item.type == 'Defense' ]
+      defenses  = defenses[:properties.DEFENSE_LIMIT]
+
+      weapons   = [ _item for _item in _expedition._inventory.get_free() if _item.type == 'Weapon' ]
+      armors    = [ _item for _item in _expedition._inventory.get_free() if _item.type == 'Armor' ]
+
+      loadout = {}
+
+      for _survivor in defenders:
+        loadout[_survivor] = [
+          weapons.pop( 0 ) if len( weapons ) > 0 else None,
+          armors.pop( 0 ) if len( armors ) > 0 else None,
+        ]
+
+      eng.defend( _expedition, defenders, defenses, loadout )
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class HeadlessEngine( engine.Engine ):
+
+  #.......................................................................
+  # Constructor
+  #.......................................................................
+
+  def __init__( self, seed=None, track=False ):
+
+    # Initialize engine utility variables
+
+    self.done        = False
+    self.phase       = engine.PHASE_LOOK
+    self.expeditions = []
+    self._rng        = rng.GameRNG( seed )
+
+    self.cam_x       = 0
+    self.cam_y       = 0
+
+    self.day_en      = True
+    self.time_count  = 1
+
+    self.reset_stats()
+
+    # Memory tracker, snapshots are taken at the end of every turn
+
+    self.tracker = memtrack.MemTracker( track )
+
+    # Expeditions are not drawn and do not belong to any sprite group
+
+    expedition.Expedition.groups  = ()
+    expedition.Expedition.draw_en = False
+
+    # Every game starts with the full set of survivor names and no
+    # expeditions
+
+    survivor.reset_names()
+    expedition.reset_index()
+
+  #.......................................................................
+  # Initialize map
+  #.......................................................................
+
+  def init_map( self, map ):
+
+    self.map = map
+
+  #.......................................................................
+  # Game statistics
+  #.......................................................................
+  # Used to compare balance changes across many games
+
+  def reset_stats( self ):
+
+    self.stats = {
+      'rescued'    : 0,
+      'crafted'    : 0,
+      'encounters' : 0,
+      'killed'     : 0,
+      'starved'    : 0,
+    }
+
+  #.......................................................................
+  # Save and load game
+  #.......................................................................
+
+  def save_game( self, path ):
+
+    snapshot.save( path, self.map, self.expeditions, self._rng, self.day_en, self.time_count )
+
+  def load_game( self, path ):
+
+    expedition.reset_index()
+
+    map, self.expeditions, self._rng, self.day_en, self.time_count = snapshot.load( path )
+
+    self.init_map( map )
+
+    self.done = len( self.expeditions ) == 0
+
+  #.......................................................................
+  # Helper functions
+  #.......................................................................
+
+  # Check that survivors are free members of expedition
+
+  def check_survivors( self, _expedition, survivors ):
+
+    assert( _expedition in self.expeditions )
+    assert( len( survivors ) > 0 )
+
+    free = _expedition.get_free()
+
+    for _survivor in survivors:
+      assert( _survivor in free )
+
+  # Remove expedition if all survivors are dead
+
+  def check_dead( self, _expedition ):
+
+    if len( _expedition.survivors ) == 0:
+      _expedition.kill()
+      self.expeditions.remove( _expedition )
+
+    if len( self.expeditions ) == 0:
+      self.done = True
+
+  #.......................................................................
+  # Day actions
+  #.......................................................................
+
+  # Explore destination tile with given survivors. Resources and items in
+  # the given inventory are taken along, unless all survivors explore in
+  # which case the whole inventory is taken. Returns new expedition.
+
+  def explore( self, _expedition, survivors, dest_tile, _inventory=None ):
+
+    assert( self.day_en )
+
+    self.check_survivors( _expedition, survivors )
+
+    for _survivor in survivors:
+      assert( _survivor.stamina > 1 )
+
+    # Determine inventory of explore party
+
+    all_explore = len( _expedition.survivors ) == len( survivors )
+
+    if all_explore:
+
+      img_idx    = _expedition.img_roll
+      _inventory = copy.deepcopy( _expedition._inventory )
+
+    else:
+
+      img_idx = -1
+
+      if _inventory == None:
+        _inventory = inventory.Inventory( 0, 0, 0, 0, [] )
+
+      _expedition._inventory = _expedition._inventory - inventory.Inventory(
+        _inventory.food, _inventory.wood, _inventory.metal, _inventory.ammo, []
+      )
+
+      for _item in _inventory.items:
+        assert( _item in _expedition._inventory.get_free() )
+
+    for _survivor in survivors:
+      _survivor.free = False
+
+    # Find route to destination, only searching for the single path
+
+    move_route, cost = _expedition.calc_path( dest_tile, survivors )
+
+    # Create new expedition
+
+    _explorers = expedition.Expedition(
+      _expedition.pos_tile, survivors, _inventory, self.map, self._rng, img_idx
+    )
+
+    # If leader is present, apply explore bonus to all survivors
+
+    has_leader = False
+
+    for _survivor in survivors:
+      if _survivor.job == attribute.LEADER:
+        has_leader   = True
+        leader_bonus = 1.0 - _survivor.get_attributes().explore_bonus
+        break
+
+    # Subtract cost of movement
+
+    for _survivor in survivors:
+
+      bonus = 1.0 - _survivor.get_attributes().explore_bonus
+
+      if has_leader:
+        bonus = leader_bonus
+
+      _survivor.stamina -= int( cost * bonus )
+
+      assert( _survivor.stamina > 0 )
+
+    # Finalize changes and delete old expedition if all transferred
+
+    _expedition.split( survivors, _inventory )
+
+    if all_explore:
+      _expedition.kill()
+      self.expeditions.remove( _expedition )
+
+    self.expeditions.append( _explorers )
+
+    _explorers._inventory.free()
+
+    # Move to destination
+
+    _explorers.move_route = move_route
+    _explorers.finish_route()
+
+    # Rescue survivor waiting on destination tile, who is not free for
+    # this turn and does not add to the scavenge rate
+
+    new_survivor = None
+
+    if _explorers.pos_tile.has_survivor:
+
+      new_survivor                    = survivor.Survivor( self._rng )
+      new_survivor.free               = False
+      _explorers.pos_tile.has_survivor = False
+
+    # Merge expeditions if on same tile
+
+    for _other in expedition.get_expeditions( _explorers.pos_tile ):
+      if _explorers != _other:
+        _explorers.merge( _other )
+        self.expeditions.remove( _other )
+        break
+
+    # Scavenge destination for free
+
+    food, wood, metal, ammo = _explorers.pos_tile.roll_resources( _explorers.survivors, self._rng )
+
+    _item = _explorers.pos_tile.roll_items( _explorers.survivors, self._rng )
+
+    _explorers.store_loot( food, wood, metal, ammo, _item )
+
+    if new_survivor != None:
+      _explorers.add_survivor( new_survivor )
+      self.stats['rescued'] += 1
+
+    return _explorers
+
+  # Scavenge current tile with given survivors. Returns loot found.
+
+  def scavenge( self, _expedition, survivors ):
+
+    assert( self.day_en )
+
+    self.check_survivors( _expedition, survivors )
+
+    for _survivor in survivors:
+      assert( _survivor.stamina > max( properties.SCAVENGE_COST - _survivor.get_attributes().day_bonus, 0 ) )
+      _survivor.free = False
+
+    food, wood, metal, ammo = _expedition.pos_tile.roll_resources( survivors, self._rng )
+
+    _item = _expedition.pos_tile.roll_items( survivors, self._rng )
+
+    _expedition.store_loot( food, wood, metal, ammo, _item )
+
+    for _survivor in survivors:
+      _survivor.stamina -= max( properties.SCAVENGE_COST - _survivor.get_attributes().day_bonus, 0 )
+
+    return food, wood, metal, ammo, _item
+
+  # Craft item with given survivors. Returns false if requirements are
+  # not met.
+
+  def craft( self, _expedition, name, survivors ):
+
+    assert( self.day_en )
+
+    self.check_survivors( _expedition, survivors )
+
+    _item = item.Item( name )
+
+    assert( _item.craftable )
+
+    for _survivor in survivors:
+      assert( _survivor.stamina > max( properties.CRAFT_COST - _survivor.get_attributes().day_bonus, 0 ) )
+
+    if not _expedition.can_craft( _item, survivors ):
+      return False
+
+    _expedition.craft( _item, survivors )
+
+    self.stats['crafted'] += 1
+
+    return True
+
+  # Rest given survivors
+
+  def rest( self, _expedition, survivors ):
+
+    assert( self.day_en )
+
+    self.check_survivors( _expedition, survivors )
+
+    self.heal_survivors( survivors )
+
+    for _survivor in survivors:
+      _survivor.free = False
+
+  #.......................................................................
+  # Night actions
+  #.......................................................................
+
+  # Defend against night encounter with given survivors and defenses.
+  # The loadout maps each defender to the weapon and armor to equip (or
+  # None to keep the current equipment). Free survivors who did not
+  # defend rest afterwards. Returns true if no defender died.
+
+  def defend( self, _expedition, survivors, defenses=[], loadout={} ):
+
+    assert( not self.day_en )
+
+    self.check_survivors( _expedition, survivors )
+
+    assert( len( survivors ) <= properties.DEFENDER_LIMIT )
+    assert( len( defenses ) <= properties.DEFENSE_LIMIT )
+
+    for _survivor in survivors:
+      _survivor.free = False
+
+    # Equip defenders
+
+    for _survivor, equipment in loadout.iteritems():
+
+      for _item in equipment:
+
+        if _item == None:
+          continue
+
+        assert( _item in _expedition._inventory.get_free() )
+
+        _item.free = False
+
+        if _item.type == 'Weapon':
+          _survivor.weapon = _item
+        elif _item.type == 'Armor':
+          _survivor.armor = _item
+
+    # Fight encounter, used up defenses are only removed if an enemy
+    # actually appeared
+
+    _enemy = _expedition.pos_tile.roll_enemy( combat.get_defense_effects( defenses )[1], self._rng )
+
+    if _enemy != None:
+
+      combat.fight( survivors, _enemy, defenses, _expedition._inventory, self._rng )
+
+      alive = [ _survivor for _survivor in _expedition.survivors if _survivor.stamina > 0 ]
+
+      self.stats['encounters'] += 1
+      self.stats['killed']     += len( _expedition.survivors ) - len( alive )
+
+      _expedition.survivors = alive
+
+      for defense in defenses:
+        _expedition._inventory.items.remove( defense )
+
+    # Free up equipment
+
+    _expedition.free_inventory()
+
+    for _survivor in survivors:
+      _survivor.weapon = item.Item( 'Unarmed' )
+      _survivor.armor  = item.Item( 'Clothes' )
+
+    # Remaining survivors that didn't defend rest
+
+    self.heal_survivors( _expedition.get_free() )
+
+    for _survivor in _expedition.get_free():
+      _survivor.free = False
+
+    alive = True
+
+    for _survivor in survivors:
+      if _survivor.stamina == 0:
+        alive = False
+
+    self.check_dead( _expedition )
+
+    return alive
+
+  #.......................................................................
+  # Turn handling
+  #.......................................................................
+
+  # Eat food at the end of the day. Starving expeditions are handled
+  # first, food is subtracted for the rest afterwards.
+
+  def eat_food( self ):
+
+    for _expedition in list( self.expeditions ):
+
+      if _expedition._inventory.food < len( _expedition.survivors ):
+
+        num_survivors = len( _expedition.survivors )
+
+        _expedition.eat( _expedition.starve() )
+
+        self.stats['starved'] += num_survivors - len( _expedition.survivors )
+
+        self.check_dead( _expedition )
+
+    for _expedition in self.expeditions:
+      if _expedition._inventory.food > 0:
+        _expedition._inventory.food -= len( _expedition.survivors )
+
+  # Finish current day or night once every survivor has acted. Food is
+  # eaten at the end of the day.
+
+  def end_turn( self ):
+
+    for _expedition in self.expeditions:
+      assert( len( _expedition.get_free() ) == 0 )
+
+    if self.day_en:
+
+      self.eat_food()
+
+      self.day_en = False
+
+    else:
+
+      self.day_en      = True
+      self.time_count += 1
+
+    for _expedition in self.expeditions:
+      _expedition.free_survivors()
+
+    # Nothing is drawn, so tiles queued for redrawing are dropped
+
+    del tile.dirty_tiles[:]
+
+    # Evict world chunks that are far from every expedition
+
+    if isinstance( self.map, world.World ):
+      self.map.evict( [ _expedition.pos_tile for _expedition in self.expeditions ] )
+
+    self.tracker.snapshot( '%s %d' % ( 'day' if self.day_en else 'night', self.time_count ) )
+
+  # Play given number of days with script, which is called once per day
+  # and night phase and must use up every free survivor. Returns number
+  # of days survived.
+
+  def run( self, num_days, script=default_script ):
+
+    while not self.done and ( self.time_count <= num_days ):
+
+      script( self )
+
+      if not self.done:
+        self.end_turn()
+
+    return self.time_count - 1
+
+  #.......................................................................
+  # Start game engine
+  #.......................................................................
+  # If a world size is given, the game is played on a streamed world of
+  # that many tiles per side instead of a generated map. If a snapshot
+  # path is given, the saved game is resumed instead.
+
+  def start( self, num_days=100, script=default_script, world_size=None, load_path=None ):
+
+    if load_path != None:
+      self.load_game( load_path )
+
+    else:
+
+      if world_size == None:
+        self.mg = mapgen.MapGen( properties.MAP_SIZE, self._rng )
+        self.init_map( self.mg.map )
+      else:
+        self.init_map( world.World( world_size, self._rng ) )
+
+      self.init_expedition()
+
+    self.tracker.snapshot( 'start' )
+
+    return self.run( num_days, script )
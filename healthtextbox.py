@@ -22,73 +22,53 @@ class HealthTextBox( textbox.TextBox ):
 
     textbox.TextBox.__init__( self, width, height, pos_x, pos_y, offset_x, offset_y, size, color )
 
-    self.max_matrix     = []
-    self.current_matrix = []
+    # Adjust survivor name position to give health bar some room
+
+    self.text_offset_y = properties.TEXT_Y_OFFSET - 2
+    self.health_matrix = [[0.0]]
 
   # Update graphics with health bars as well
 
   def update( self, text_matrix=[['']], health_matrix=[[0.0]] ):
 
-    textbox.TextBox.update( self, text_matrix )
-
-    # Pair health bars with respective survivor names
-
-    self.max_matrix     = []
-    self.current_matrix = []
-
-    for text_col, health_col in zip( self.surface_matrix, health_matrix ):
+    self.health_matrix = health_matrix
 
-      max_col     = []
-      current_col = []
-
-      for text, health in zip( text_col, health_col ):
-
-        # Adjust survivor name position to give health bar some room
-
-        text[1].move_ip( 0, -2 )
-
-        # Create max health bar overlay
+    textbox.TextBox.update( self, text_matrix )
 
-        max_surface      = pygame.Surface( ( self.rect.width - 8, properties.HEALTH_HEIGHT ) )
-        max_rect         = max_surface.get_rect()
-        max_rect.topleft = text[1].left, text[1].bottom + 2
-        max_surface.fill( utils.WHITE )
+  # Health ratios are displayed on the same row as the names
 
-        max_col.append( ( max_surface, max_rect ) )
+  def get_row_key( self, row_idx ):
 
-        # Create current health overlay
+    health = tuple( [ health_col[row_idx] if row_idx < len( health_col ) else None
+                      for health_col in self.health_matrix ] )
 
-        current_width        = int( health * ( self.rect.width - 8 ) )
-        current_surface      = pygame.Surface( ( current_width, properties.HEALTH_HEIGHT ) )
-        current_rect         = current_surface.get_rect()
-        current_rect.topleft = text[1].left, text[1].bottom + 2
+    return textbox.TextBox.get_row_key( self, row_idx ) + health
 
-        if health >= 0.67:
-          current_surface.fill( utils.GREEN )
-        elif health >= 0.33:
-          current_surface.fill( utils.YELLOW )
-        else:
-          current_surface.fill( utils.RED )
+  # Pair health bars with respective survivor names
 
-        current_col.append( ( current_surface, current_rect ) )
+  def draw_row( self, row_idx, row_rect ):
 
-      # Add health bar surfaces to matrix arrays
+    text_rects = textbox.TextBox.draw_row( self, row_idx, row_rect )
 
-      self.max_matrix.append( max_col )
-      self.current_matrix.append( current_col )
+    for text_rect, health_col in zip( text_rects, self.health_matrix ):
 
-  # Draw health bars with text
+      if ( text_rect == None ) or ( row_idx >= len( health_col ) ):
+        continue
 
-  def draw_text( self ):
+      health = health_col[row_idx]
 
-    rect_updates = textbox.TextBox.draw_text( self )
+      # Draw current health overlay
 
-#    for max_col in self.max_matrix:
-#      for surface, rect in max_col:
-#        rect_updates += [ self.image.blit( surface, rect ) ]
+      current_rect = pygame.rect.Rect(
+        text_rect.left, text_rect.bottom + 2,
+        int( health * ( self.rect.width - 8 ) ), properties.HEALTH_HEIGHT
+      )
 
-    for current_col in self.current_matrix:
-      for surface, rect in current_col:
-        rect_updates += [ self.image.blit( surface, rect ) ]
+      if health >= 0.67:
+        self.image.fill( utils.GREEN, current_rect )
+      elif health >= 0.33:
+        self.image.fill( utils.YELLOW, current_rect )
+      else:
+        self.image.fill( utils.RED, current_rect )
 
-    return rect_updates
+    return text_rects
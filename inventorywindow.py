@@ -153,43 +153,40 @@ class InventoryWindow( window.Window ):
         if _item.type == self.type:
           items.append( _item )
 
-    for _item, rect in zip( items, self.old_tbox.rect_matrix[0] ):
+    _item = self.old_tbox.get_item( items, mouse_x, mouse_y )
 
-      # Determine if mouse is hovering over item
+    if _item != None:
 
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      if type( _item ) != str:
+        self._item = _item
 
-        if type( _item ) != str:
-          self._item = _item
+      # Transfer items if mouse is clicked
 
-        # Transfer items if mouse is clicked
-
-        if mouse_click:
+      if mouse_click:
 
-          if _item == 'Food':
-            if self._expedition._inventory.food > 0:
-              self._expedition._inventory.food -= 1
-              self._inventory.food             += 1
+        if _item == 'Food':
+          if self._expedition._inventory.food > 0:
+            self._expedition._inventory.food -= 1
+            self._inventory.food             += 1
 
-          elif _item == 'Wood':
-            if self._expedition._inventory.wood > 0:
-              self._expedition._inventory.wood -= 1
-              self._inventory.wood             += 1
+        elif _item == 'Wood':
+          if self._expedition._inventory.wood > 0:
+            self._expedition._inventory.wood -= 1
+            self._inventory.wood             += 1
 
-          elif _item == 'Metal':
-            if self._expedition._inventory.metal > 0:
-              self._expedition._inventory.metal -= 1
-              self._inventory.metal             += 1
+        elif _item == 'Metal':
+          if self._expedition._inventory.metal > 0:
+            self._expedition._inventory.metal -= 1
+            self._inventory.metal             += 1
 
-          elif _item == 'Ammo':
-            if self._expedition._inventory.ammo > 0:
-              self._expedition._inventory.ammo -= 1
-              self._inventory.ammo             += 1
+        elif _item == 'Ammo':
+          if self._expedition._inventory.ammo > 0:
+            self._expedition._inventory.ammo -= 1
+            self._inventory.ammo             += 1
 
-          elif len( self._inventory.items ) < self.limit:
-            _item.free = False
-            self._inventory.items.append( _item )
+        elif len( self._inventory.items ) < self.limit:
+          _item.free = False
+          self._inventory.items.append( _item )
 
     # Determine selected item info to display
 
@@ -198,43 +195,40 @@ class InventoryWindow( window.Window ):
     if self.type == 'All':
       items = [ 'Food', 'Wood', 'Metal', 'Ammo', ] + items
 
-    for _item, rect in zip( items, self.new_tbox.rect_matrix[0] ):
-
-      # Determine if mouse is hovering over item
-
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+    _item = self.new_tbox.get_item( items, mouse_x, mouse_y )
 
-        if type( _item ) != str:
-          self._item = _item
+    if _item != None:
 
-        # Transfer items if mouse is clicked
+      if type( _item ) != str:
+        self._item = _item
 
-        if mouse_click:
+      # Transfer items if mouse is clicked
 
-          if _item == 'Food':
-            if self._inventory.food > 0:
-              self._expedition._inventory.food += 1
-              self._inventory.food             -= 1
-
-          elif _item == 'Wood':
-            if self._inventory.wood > 0:
-              self._expedition._inventory.wood += 1
-              self._inventory.wood             -= 1
-
-          elif _item == 'Metal':
-            if self._inventory.metal > 0:
-              self._expedition._inventory.metal += 1
-              self._inventory.metal             -= 1
-
-          elif _item == 'Ammo':
-            if self._inventory.ammo > 0:
-              self._expedition._inventory.ammo += 1
-              self._inventory.ammo             -= 1
+      if mouse_click:
 
-          else:
-            _item.free = True
-            self._inventory.items.remove( _item )
+        if _item == 'Food':
+          if self._inventory.food > 0:
+            self._expedition._inventory.food += 1
+            self._inventory.food             -= 1
+
+        elif _item == 'Wood':
+          if self._inventory.wood > 0:
+            self._expedition._inventory.wood += 1
+            self._inventory.wood             -= 1
+
+        elif _item == 'Metal':
+          if self._inventory.metal > 0:
+            self._expedition._inventory.metal += 1
+            self._inventory.metal             -= 1
+
+        elif _item == 'Ammo':
+          if self._inventory.ammo > 0:
+            self._expedition._inventory.ammo += 1
+            self._inventory.ammo             -= 1
+
+        else:
+          _item.free = True
+          self._inventory.items.remove( _item )
 
     # Scroll text boxes if necessary
 
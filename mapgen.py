@@ -6,43 +6,99 @@
 # facility. Default tile is the field. Each special terrain area has a
 # ritual ground. Chance to spawn caves in mountains. Wreckages spawn
 # randomly.
+#
+# The map is generated on a compact grid of terrain ids, indexed by
+# ( pos_x * size + pos_y ), and tiles are only created once generation
+# is finished. The raw grid is kept for tools that do not need tiles.
 
-import random
+import gc
 import properties
 import tile
 
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Terrain ids used in the raw grid
+
+terrain_list = [
+  'Field',
+  'Jungle',
+  'Deep Jungle',
+  'Mountain',
+  'Cave',
+  'Swamp',
+  'Wreckage',
+  'Facility',
+  'Ritual Site',
+  'Obelisk',
+]
+
+terrain_ids = dict( [ ( name, i ) for i, name in enumerate( terrain_list ) ] )
+
+FIELD = terrain_ids['Field']
+
 #-------------------------------------------------------------------------
 # Main Class
 #-------------------------------------------------------------------------
 
 class MapGen:
 
+  # Pick random tile index satisfying given condition. Rejection sampling
+  # is tried first, falling back to choosing among all matching tiles so
+  # that crowded maps cannot spin forever. Returns None if no tile
+  # matches.
+
+  def pick_tile( self, valid ):
+
+    for i in range( properties.MAX_PLACE_TRIES ):
+
+      seed_x = self._rng.map.randint( 0, self.size - 1 )
+      seed_y = self._rng.map.randint( 0, self.size - 1 )
+
+      if valid( seed_x * self.size + seed_y ):
+        return seed_x * self.size + seed_y
+
+    candidates = [ idx for idx in xrange( self.size * self.size ) if valid( idx ) ]
+
+    if len( candidates ) == 0:
+      return None
+
+    return self._rng.map.choice( candidates )
+
   # Generate random area of special terrain
 
   def gen_terrain( self, terrains, rates ):
 
-    # Designate seed coordinates
+    grid = self.grid
+    size = self.size
+    last = size - 1
+    rand = self._rng.map.random
 
-    seed_x = random.randint( 0, self.size - 1 )
-    seed_y = random.randint( 0, self.size - 1 )
+    ids = [ terrain_ids[terrain] for terrain in terrains ]
 
-    # Try to reduce overlapping between special terrain
+    # Designate seed coordinates, trying to reduce overlapping between
+    # special terrain
 
-    while self.map[seed_x][seed_y].terrain != 'Field':
-      seed_x = random.randint( 0, self.size - 1 )
-      seed_y = random.randint( 0, self.size - 1 )
+    seed = self.pick_tile( lambda idx: grid[idx] == FIELD )
+
+    if seed == None:
+      return
 
     # Convert seed tile into specified terrain
 
-    self.map[seed_x][seed_y] = tile.Tile( terrains[0], seed_x, seed_y )
+    grid[seed] = ids[0]
 
     # If multiple terrains are specified, iteratively generate tiers of
-    # terrains with each layer starting with 1.0 probability.
+    # terrains with each layer starting with 1.0 probability. Visited
+    # tiles are kept both in order (for finding edges) and as a bitmap
+    # (for membership checks).
 
-    visited  = []
-    frontier = [ self.map[seed_x][seed_y] ]
+    visited     = []
+    visited_map = bytearray( size * size )
+    frontier    = [ seed ]
 
-    for terrain, rate in zip( terrains, rates ):
+    for terrain_id, rate in zip( ids, rates ):
 
       prob = 1.0
 
@@ -53,54 +109,42 @@ class MapGen:
 
         next_frontier = []
 
-        for i, _tile in enumerate( frontier ):
-
-          # Chance to convert north neighbor to terrain
+        for idx in frontier:
 
-          if _tile.pos_y > 0:
+          pos_x, pos_y = divmod( idx, size )
 
-            next_tile = self.map[_tile.pos_x][_tile.pos_y-1]
+          # Chance to convert north neighbor to terrain
 
-            if ( random.random() < prob ) and ( next_tile not in visited ):
-              self.map[_tile.pos_x][_tile.pos_y-1] \
-                = tile.Tile( terrain, _tile.pos_x, _tile.pos_y - 1 )
-              next_frontier.append( next_tile )
+          if pos_y > 0:
+            if ( rand() < prob ) and not visited_map[idx-1]:
+              grid[idx-1] = terrain_id
+              next_frontier.append( idx - 1 )
 
           # Chance to convert east neighbor to terrain
 
-          if _tile.pos_x < ( self.size - 1 ):
-
-            next_tile = self.map[_tile.pos_x+1][_tile.pos_y]
-
-            if ( random.random() < prob ) and ( next_tile not in visited ):
-              self.map[_tile.pos_x+1][_tile.pos_y] \
-                = tile.Tile( terrain, _tile.pos_x + 1, _tile.pos_y )
-              next_frontier.append( next_tile )
+          if pos_x < last:
+            if ( rand() < prob ) and not visited_map[idx+size]:
+              grid[idx+size] = terrain_id
+              next_frontier.append( idx + size )
 
           # Chance to convert south neighbor to terrain
 
-          if _tile.pos_y < ( self.size - 1 ):
-
-            next_tile = self.map[_tile.pos_x][_tile.pos_y+1]
-
-            if ( random.random() < prob ) and ( next_tile not in visited ):
-              self.map[_tile.pos_x][_tile.pos_y+1] \
-                = tile.Tile( terrain, _tile.pos_x, _tile.pos_y + 1 )
-              next_frontier.append( next_tile )
+          if pos_y < last:
+            if ( rand() < prob ) and not visited_map[idx+1]:
+              grid[idx+1] = terrain_id
+              next_frontier.append( idx + 1 )
 
           # Chance to convert west neighbor to terrain
 
-          if _tile.pos_x > 0:
-
-            next_tile = self.map[_tile.pos_x-1][_tile.pos_y]
-
-            if ( random.random() < prob ) and ( next_tile not in visited ):
-              self.map[_tile.pos_x-1][_tile.pos_y] = tile.Tile( terrain, _tile.pos_x - 1, _tile.pos_y )
-              next_frontier.append( next_tile )
+          if pos_x > 0:
+            if ( rand() < prob ) and not visited_map[idx-size]:
+              grid[idx-size] = terrain_id
+              next_frontier.append( idx - size )
 
           # Mark tile in frontier as visited
 
-          visited.append( _tile )
+          visited.append( idx )
+          visited_map[idx] = 1
 
         # Swap frontiers when all tiles in current frontier are processed
 
@@ -112,45 +156,48 @@ class MapGen:
 
       # Determine the edge tiles for the generated terrain
 
-      for _tile in visited:
+      for idx in visited:
 
-        north_edge = ( _tile.pos_y > 0 ) and ( self.map[_tile.pos_x][_tile.pos_y-1].terrain not in terrains )
-        east_edge  = ( _tile.pos_x < ( self.size - 1 ) ) and ( self.map[_tile.pos_x+1][_tile.pos_y].terrain not in terrains )
-        south_edge = ( _tile.pos_y < ( self.size - 1 ) ) and ( self.map[_tile.pos_x][_tile.pos_y+1].terrain not in terrains )
-        west_edge  = ( _tile.pos_x > 0 ) and ( self.map[_tile.pos_x-1][_tile.pos_y].terrain not in terrains )
+        pos_x, pos_y = divmod( idx, size )
 
-        edges = [ north_edge, east_edge, south_edge, west_edge ]
-
-        if True in edges:
-          frontier.append( _tile )
+        if ( ( pos_y > 0    ) and ( grid[idx-1]    not in ids ) ) \
+          or ( ( pos_x < last ) and ( grid[idx+size] not in ids ) ) \
+          or ( ( pos_y < last ) and ( grid[idx+1]    not in ids ) ) \
+          or ( ( pos_x > 0    ) and ( grid[idx-size] not in ids ) ):
+          frontier.append( idx )
 
   # Spawn random terrain (no spread)
 
   def gen_random( self, terrains, nums ):
 
-    placed = []
+    placed = bytearray( self.size * self.size )
 
     for terrain, num in zip( terrains, nums ):
 
       for i in range( num ):
 
-        seed_x = random.randint( 0, self.size - 1 )
-        seed_y = random.randint( 0, self.size - 1 )
+        idx = self.pick_tile( lambda idx: not placed[idx] )
+
+        if idx == None:
+          return
+
+        self.grid[idx] = terrain_ids[terrain]
+        placed[idx]    = 1
 
-        while self.map[seed_x][seed_y] in placed:
-          seed_x = random.randint( 0, self.size - 1 )
-          seed_y = random.randint( 0, self.size - 1 )
+  # Return terrain name at given position of the raw grid
 
-        self.map[seed_x][seed_y] = tile.Tile( terrain, seed_x, seed_y )
+  def get_terrain( self, pos_x, pos_y ):
 
-        placed.append( self.map[seed_x][seed_y] )
+    return terrain_list[self.grid[pos_x * self.size + pos_y]]
 
-  # Constructor
+  # Constructor. The offset is added to the positions of the created
+  # tiles, for generating one chunk of a larger world.
 
-  def __init__( self, size ):
+  def __init__( self, size, _rng, offset_x=0, offset_y=0 ):
 
     self.size = size
     self.map  = []
+    self._rng = _rng
 
     self.num_mountain    = properties.NUM_MOUNTAIN
     self.num_swamp       = properties.NUM_SWAMP
@@ -166,14 +213,11 @@ class MapGen:
     self.deep_jungle_rate = properties.DEEP_JUNGLE_RATE
     self.facility_rate    = properties.FACILITY_RATE
 
-    # Populate map array with default terrain with given dimensions
-
-    for i in range( self.size ):
-
-      self.map.append( [] )
+    # Raw grids of terrain ids and survivor locations, with every tile
+    # starting as the default terrain
 
-      for j in range( self.size ):
-        self.map[i].append( tile.Tile( 'Field', i, j ) )
+    self.grid      = bytearray( self.size * self.size )
+    self.survivors = bytearray( self.size * self.size )
 
     # Add mountains
 
@@ -204,22 +248,49 @@ class MapGen:
     self.gen_random( [ 'Wreckage', 'Ritual Site' ], \
                      [ self.num_wreckage, self.num_ritual_site ] )
 
-    # Populate with rescuable survivors
+    # Populate with rescuable survivors, at most one per tile
 
     placed  = []
-    invalid = [ 'Ritual Site', 'Obelisk' ]
+    invalid = [ terrain_ids['Ritual Site'], terrain_ids['Obelisk'] ]
 
     for i in range( properties.NUM_MAP_SURVIVORS ):
 
-      seed_x = random.randint( 0, self.size - 1 )
-      seed_y = random.randint( 0, self.size - 1 )
+      idx = self.pick_tile(
+        lambda idx: not self.survivors[idx] and ( self.grid[idx] not in invalid )
+      )
+
+      if idx == None:
+        break
+
+      self.survivors[idx] = 1
+      placed.append( idx )
+
+    # Create tiles from the finished grid. Tiles never form reference
+    # cycles, so garbage collection is paused while creating them to
+    # avoid repeated collection passes that find nothing. It is resumed
+    # even if creating a tile fails.
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+
+      for i in range( self.size ):
+
+        row = self.grid[i*self.size:(i+1)*self.size]
+
+        self.map.append(
+          [ tile.Tile( terrain_list[terrain_id], offset_x + i, offset_y + j )
+            for j, terrain_id in enumerate( row ) ]
+        )
+
+    finally:
 
-      while ( self.map[seed_x][seed_y] in placed ) \
-        or ( self.map[seed_x][seed_y].terrain in invalid ):
-        seed_x = random.randint( 0, self.size - 1 )
-        seed_y = random.randint( 0, self.size - 1 )
+      if gc_enabled:
+        gc.enable()
 
-      self.map[seed_x][seed_y].has_survivor = True
+    for idx in placed:
+      self.map[idx / self.size][idx % self.size].has_survivor = True
 
   # Print debug information
 
@@ -228,6 +299,6 @@ class MapGen:
     for j in range( self.size ):
 
       for i in range( self.size ):
-        print self.map[i][j].terrain[:1],
+        print self.get_terrain( i, j )[:1],
 
       print ''
@@ -0,0 +1,111 @@
+#=========================================================================
+# maplayer.py
+#=========================================================================
+# Pre-rendered backing surface for the whole game map. Every tile is
+# composited onto the layer once, and afterwards only tiles that have
+# been marked dirty are redrawn. The camera view is a subsurface of the
+# layer, so scrolling costs a single blit. The day/night tint is kept
+# off the layer and drawn as a single camera-sized overlay.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import properties
+import tile
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class MapLayer:
+
+  # Constructor
+
+  def __init__( self, map ):
+
+    self.map   = map
+    self.image = pygame.Surface( ( properties.MAP_WIDTH, properties.MAP_HEIGHT ) ).convert()
+    self.rect  = self.image.get_rect()
+
+    # Tiles currently showing a campfire, indexed by position
+
+    self.fire_tiles = {}
+
+    # Night tint covering the camera view
+
+    self.night_image = pygame.Surface( ( properties.CAMERA_WIDTH, properties.CAMERA_HEIGHT ) ).convert()
+    self.night_image.fill( ( 0, 0, 0 ) )
+
+    # Cached camera view
+
+    self.view     = None
+    self.view_pos = None
+
+    # Composite every tile
+
+    del tile.dirty_tiles[:]
+
+    for column in self.map:
+      for _tile in column:
+        _tile.dirty = True
+        tile.dirty_tiles.append( _tile )
+
+    self.update()
+
+  # Redraw all dirty tiles. Returns the number of tiles redrawn.
+
+  def update( self ):
+
+    num_dirty = len( tile.dirty_tiles )
+
+    for _tile in tile.dirty_tiles:
+
+      _tile.draw( self.image, 0, 0 )
+      _tile.dirty = False
+
+      if _tile.has_survivor and not _tile.fog:
+        self.fire_tiles[( _tile.pos_x, _tile.pos_y )] = _tile
+      elif ( _tile.pos_x, _tile.pos_y ) in self.fire_tiles:
+        del self.fire_tiles[( _tile.pos_x, _tile.pos_y )]
+
+    del tile.dirty_tiles[:]
+
+    return num_dirty
+
+  # Return view of the layer at given camera position. The view shares
+  # pixels with the layer, so it always shows the latest composite.
+
+  def get_view( self, cam_x, cam_y ):
+
+    if self.view_pos != ( cam_x, cam_y ):
+
+      self.view     = self.image.subsurface(
+        pygame.rect.Rect( cam_x, cam_y, properties.CAMERA_WIDTH, properties.CAMERA_HEIGHT ).clip( self.rect )
+      )
+      self.view_pos = ( cam_x, cam_y )
+
+    return self.view
+
+  # Draw night tint and campfires over the camera view
+
+  def draw_night( self, surface, cam_x, cam_y ):
+
+    rect_updates = []
+
+    night_alpha = tile.overlay_state['night_alpha']
+
+    if night_alpha == 255:
+      return rect_updates
+
+    self.night_image.set_alpha( night_alpha )
+
+    rect_updates += [ surface.blit( self.night_image, ( 0, 0 ) ) ]
+
+    # Campfires are drawn on top of the tint
+
+    if tile.is_night():
+
+      for _tile in self.fire_tiles.values():
+        rect_updates += _tile.draw_fire( surface, ( _tile.abs_x - cam_x, _tile.abs_y - cam_y ) )
+
+    return rect_updates
@@ -0,0 +1,288 @@
+#=========================================================================
+# memtrack.py
+#=========================================================================
+# Optional memory tracker for long sessions. At every snapshot (taken by
+# the engines at each day/night transition) the garbage collector is run
+# and the live objects of the game classes are counted, along with the
+# resident memory of the process. Growth is reported against the
+# previous snapshot as it happens, and the types (or allocation sites,
+# when tracemalloc is available) that grew the most since the first
+# snapshot are included when dumping to CSV or JSON.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import gc
+import types
+import json
+import csv
+import collections
+import tile
+import survivor
+import item
+import inventory
+import expedition
+import enemy
+
+# Allocation sites are only traced where the interpreter supports it,
+# otherwise the types with the most growth stand in for them
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+NUM_TOP = 25 # growing types or allocation sites kept in the report
+
+# Columns of every snapshot row
+
+COLUMNS = [ 'label', 'rss', 'objects' ]
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Classes whose live objects are counted, indexed by name. Subclasses
+# count towards their base class.
+
+class_table = collections.OrderedDict( [
+  ( 'Tile',       tile.Tile             ),
+  ( 'Survivor',   survivor.Survivor     ),
+  ( 'Item',       item.Item             ),
+  ( 'Inventory',  inventory.Inventory   ),
+  ( 'Expedition', expedition.Expedition ),
+  ( 'Enemy',      enemy.Enemy           ),
+  ( 'Surface',    pygame.Surface        ),
+] )
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Return resident memory of the process in kilobytes, or 0 where it
+# cannot be read
+
+def get_rss():
+
+  try:
+    with open( '/proc/self/statm' ) as statm:
+      return int( statm.read().split()[1] ) * os.sysconf( 'SC_PAGE_SIZE' ) / 1024
+  except ( IOError, OSError, ValueError ):
+    return 0
+
+# Return class of given object, old-style instances included
+
+def get_class( obj ):
+
+  if type( obj ) is types.InstanceType:
+    return obj.__class__
+
+  return type( obj )
+
+# Return name of given class along with its module
+
+def get_class_name( kind ):
+
+  return '%s.%s' % ( kind.__module__, kind.__name__ )
+
+# Count live objects by class after a full collection. Surfaces are not
+# tracked by the garbage collector, so they are found through the
+# objects referring to them instead.
+
+def count_objects():
+
+  gc.collect()
+
+  objects = gc.get_objects()
+  counts  = collections.defaultdict( int )
+
+  for obj in objects:
+    counts[get_class( obj )] += 1
+
+  surfaces = set()
+
+  for obj in objects:
+    for ref in gc.get_referents( obj ):
+      if isinstance( ref, pygame.Surface ):
+        surfaces.add( id( ref ) )
+
+  counts[pygame.Surface] = len( surfaces )
+
+  del objects
+
+  return counts
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class MemTracker( object ):
+
+  # Constructor. A disabled tracker ignores every call, so the engines
+  # can always keep one.
+
+  def __init__( self, enabled=False ):
+
+    self.enabled = enabled
+
+    # Snapshot rows, along with the object counts by class of the first
+    # and the latest snapshot. Rows are kept as tuples, since ordered
+    # dictionaries allocate lists of their own that would show up as
+    # growth.
+
+    self.rows         = []
+    self.first_counts = None
+    self.last_counts  = None
+
+    # Allocation traces of the first and the latest snapshot
+
+    self.first_trace = None
+    self.last_trace  = None
+
+    if self.enabled and ( tracemalloc != None ):
+      tracemalloc.start()
+
+  # Take snapshot with given label and report growth since the previous
+  # one
+
+  def snapshot( self, label ):
+
+    if not self.enabled:
+      return
+
+    counts = count_objects()
+
+    row = [ label, get_rss(), sum( counts.values() ) - counts[pygame.Surface] ]
+
+    for cls in class_table.itervalues():
+      row.append( sum( [ count for kind, count in counts.iteritems() if issubclass( kind, cls ) ] ) )
+
+    row = tuple( row )
+
+    # Report growth against previous snapshot
+
+    if len( self.rows ) > 0:
+
+      prev = self.rows[-1]
+      line = 'MEM %-10s' % label
+
+      for i, name in enumerate( self.get_columns() ):
+        if i > 0:
+          line += ' %s %d (%+d)' % ( name, row[i], row[i] - prev[i] )
+
+      print line
+
+    self.rows.append( row )
+
+    # Keep the first and latest counts and traces for the report
+
+    if self.first_counts == None:
+      self.first_counts = counts
+
+    self.last_counts = counts
+
+    if tracemalloc != None:
+
+      self.last_trace = tracemalloc.take_snapshot()
+
+      if self.first_trace == None:
+        self.first_trace = self.last_trace
+
+  # Return names of the snapshot columns
+
+  def get_columns( self ):
+
+    return COLUMNS + class_table.keys()
+
+  # Return the snapshots as a list of rows
+
+  def get_snapshots( self ):
+
+    return [ collections.OrderedDict( zip( self.get_columns(), row ) ) for row in self.rows ]
+
+  # Return the types (or allocation sites, if traced) with the most
+  # growth since the first snapshot as a list of rows
+
+  def get_growth( self ):
+
+    rows = []
+
+    if self.first_trace != None:
+
+      for stat in self.last_trace.compare_to( self.first_trace, 'lineno' )[:NUM_TOP]:
+
+        row = collections.OrderedDict()
+
+        row['site']  = str( stat.traceback )
+        row['size']  = stat.size_diff / 1024.0
+        row['count'] = stat.count_diff
+
+        rows.append( row )
+
+      return rows
+
+    if self.first_counts == None:
+      return rows
+
+    growth = [
+      ( count - self.first_counts.get( kind, 0 ), kind )
+      for kind, count in self.last_counts.iteritems()
+    ]
+
+    growth.sort( key=lambda pair: pair[0], reverse=True )
+
+    for delta, kind in growth[:NUM_TOP]:
+
+      row = collections.OrderedDict()
+
+      row['type']  = get_class_name( kind )
+      row['first'] = self.first_counts.get( kind, 0 )
+      row['last']  = self.last_counts[kind]
+      row['delta'] = delta
+
+      rows.append( row )
+
+    return rows
+
+  # Write snapshots and growth to given path, as JSON if the path ends
+  # in .json and as CSV otherwise (snapshots first, then growth)
+
+  def dump( self, path ):
+
+    if not self.enabled:
+      return
+
+    snapshots = self.get_snapshots()
+    growth    = self.get_growth()
+
+    if path.endswith( '.json' ):
+
+      report = collections.OrderedDict()
+
+      report['snapshots'] = snapshots
+      report['growth']    = growth
+
+      with open( path, 'w' ) as out:
+        json.dump( report, out, indent=2 )
+
+    else:
+
+      with open( path, 'wb' ) as out:
+
+        writer = csv.writer( out )
+
+        for rows in [ snapshots, growth ]:
+
+          if len( rows ) == 0:
+            continue
+
+          writer.writerow( rows[0].keys() )
+
+          for row in rows:
+            writer.writerow( row.values() )
+
+          writer.writerow( [] )
@@ -7,8 +7,37 @@
 import pygame, sys, os
 from pygame.locals import *
 
+import argparse
+import time
 import properties
+import assets
 import engine
+import headless
+import autoplay
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Parse world size option, which must be a positive multiple of the chunk
+# size
+
+def parse_world_size( text ):
+
+  try:
+    size = int( text )
+  except ValueError:
+    raise argparse.ArgumentTypeError( 'invalid world size: %r' % text )
+
+  if ( size <= 0 ) or ( size % properties.CHUNK_SIZE != 0 ):
+    raise argparse.ArgumentTypeError(
+      'world size must be a positive multiple of %d, such as %d' % (
+        properties.CHUNK_SIZE,
+        max( ( size + properties.CHUNK_SIZE - 1 ) / properties.CHUNK_SIZE, 1 ) * properties.CHUNK_SIZE
+      )
+    )
+
+  return size
 
 #-------------------------------------------------------------------------
 # Main Function
@@ -16,6 +45,71 @@ import engine
 
 def main():
 
+  # Parse command line options
+
+  parser = argparse.ArgumentParser( description='Obelisk' )
+
+  parser.add_argument( '--headless', action='store_true',
+                       help='simulate a game without a display' )
+  parser.add_argument( '--days', type=int, default=100,
+                       help='number of days to simulate in headless or autoplay mode' )
+  parser.add_argument( '--autoplay', default=None, choices=autoplay.policy_table.keys(),
+                       help='let a bot play instead, starting new games until the '
+                            'number of days is played unless headless' )
+  parser.add_argument( '--fast', action='store_true',
+                       help='do not cap the frame rate in autoplay mode' )
+  parser.add_argument( '--seed', type=int, default=None,
+                       help='seed for reproducing a game' )
+  parser.add_argument( '--world', type=parse_world_size, default=None,
+                       help='play headless mode on a streamed world of given size '
+                            '(requires --headless)' )
+  parser.add_argument( '--load', default=None, metavar='PATH',
+                       help='resume game from snapshot at PATH, such as the autosave' )
+  parser.add_argument( '--autosave', default=None, metavar='PATH',
+                       help='save a snapshot of the game to PATH at every day/night transition '
+                            '(not in headless mode)' )
+  parser.add_argument( '--profile', default=None, metavar='PATH',
+                       help='profile frames (F3 toggles overlay) and dump stats to '
+                            'PATH at exit, as JSON if it ends in .json or CSV otherwise' )
+  parser.add_argument( '--memtrack', default=None, metavar='PATH',
+                       help='count live objects at every day/night transition and dump '
+                            'growth to PATH at exit, as JSON if it ends in .json or CSV otherwise' )
+
+  args = parser.parse_args()
+
+  # The rendered game only plays on a generated map
+
+  if ( args.world != None ) and not args.headless:
+    parser.error( '--world requires --headless' )
+
+  # Autosave is off unless a path is given
+
+  properties.AUTOSAVE_PATH = args.autosave
+
+  # Run simulation without initializing the display if headless
+
+  if args.headless:
+
+    eng = headless.HeadlessEngine( args.seed, args.memtrack != None )
+
+    if args.autoplay != None:
+      script = autoplay.policy_table[args.autoplay]
+    else:
+      script = headless.default_script
+
+    try:
+      days = eng.start( args.days, script, world_size=args.world, load_path=args.load )
+
+    finally:
+      if args.memtrack != None:
+        eng.tracker.dump( args.memtrack )
+
+    print 'Survived', days, 'days with', \
+          sum( [ len( _expedition.survivors ) for _expedition in eng.expeditions ] ), 'survivors', \
+          '(seed', str( eng._rng.seed ) + ')'
+
+    return
+
   # Initialize pygame
 
   pygame.init()
@@ -28,13 +122,47 @@ def main():
 
   pygame.display.set_caption( 'Obelisk v.1.0' )
 
+  # Load all images up front so no disk access happens mid-game
+
+  if properties.PRELOAD_ASSETS:
+    assets.preload()
+
   # Initialize game engine
 
-  eng = engine.Engine()
+  if args.autoplay != None:
+    eng = autoplay.AutoplayEngine(
+      autoplay.policy_table[args.autoplay], args.days, args.seed,
+      args.profile != None, 0 if args.fast else properties.FPS, args.memtrack != None
+    )
+  else:
+    eng = engine.Engine( args.seed, args.profile != None, args.memtrack != None )
+
+  print 'Seed:', eng._rng.seed
+
+  # Start game engine, dumping profile and memory growth even if the game
+  # is interrupted
+
+  start = time.time()
+
+  try:
+    eng.start( args.load )
+
+  finally:
+
+    if args.profile != None:
+      eng.profiler.dump( args.profile )
+
+    if args.memtrack != None:
+      eng.tracker.dump( args.memtrack )
+
+  # Report throughput of autoplay runs
+
+  if args.autoplay != None:
 
-  # Start game engine
+    elapsed = time.time() - start
 
-  eng.start()
+    print 'Played', eng.get_days(), 'days in', eng.num_games, 'games', \
+          'in %.1f s (%.2f days/s)' % ( elapsed, eng.get_days() / max( elapsed, 1e-6 ) )
 
 # Execute main function
 
@@ -0,0 +1,214 @@
+#=========================================================================
+# pathfind.py
+#=========================================================================
+# Shortest path search over the game map. Tiles are addressed by integer
+# index ( pos_x * size + pos_y ) and move costs are read from a flat
+# list, so the searches only touch Tile objects when building results.
+# Reachable ranges are cached until the map or its move costs change.
+# Streamed worlds provide views indexed the same way instead of lists.
+
+import heapq
+import properties
+import tile
+
+#-------------------------------------------------------------------------
+# Cache State
+#-------------------------------------------------------------------------
+# Move costs of the map the cache was built for. The cache is dropped
+# whenever a different map is searched or the move cost version changes.
+
+cache_state = {
+  'map'      : None,
+  'version'  : -1,
+  'tiles'    : None,
+  'costs'    : None,
+  'min_cost' : 0,
+}
+
+# Reachable ranges, indexed by ( origin, maximum cost, cost version )
+
+range_cache = {}
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Return flat list of move costs for given map, rebuilding it and
+# clearing the range cache if the map or its costs have changed
+
+def get_costs( map ):
+
+  version = tile.cost_state['version']
+
+  if ( cache_state['map'] is not map ) or ( cache_state['version'] != version ):
+
+    if isinstance( map, list ):
+
+      tiles = []
+
+      for column in map:
+        tiles.extend( column )
+
+      costs    = [ _tile.move_cost for _tile in tiles ]
+      min_cost = min( costs )
+
+    # Worlds load tiles on demand, so only the cheapest cost of any
+    # terrain is known up front
+
+    else:
+
+      tiles    = map.tile_view
+      costs    = map.cost_view
+      min_cost = min( [ terrain[1] for terrain in tile.terrain_table.values() ] )
+
+    cache_state['map']      = map
+    cache_state['version']  = version
+    cache_state['tiles']    = tiles
+    cache_state['costs']    = costs
+    cache_state['min_cost'] = min_cost
+
+    range_cache.clear()
+
+  return cache_state['costs']
+
+# Return indices of neighboring tiles within map bounds
+
+def get_neighbors( idx, size ):
+
+  pos_x, pos_y = divmod( idx, size )
+  neighbors    = []
+
+  if pos_y > 0:
+    neighbors.append( idx - 1 )
+
+  if pos_x < ( size - 1 ):
+    neighbors.append( idx + size )
+
+  if pos_y < ( size - 1 ):
+    neighbors.append( idx + 1 )
+
+  if pos_x > 0:
+    neighbors.append( idx - size )
+
+  return neighbors
+
+# Find all tiles reachable from the origin tile for less than the given
+# maximum cost using Dijkstra's algorithm. Returns a dictionary mapping
+# each reachable tile to the tile leading to it in the shortest path and
+# the cost to get there. The dictionary is shared through the cache and
+# must not be modified.
+
+def calc_range( map, src_tile, max_cost ):
+
+  costs = get_costs( map )
+  tiles = cache_state['tiles']
+  size  = len( map )
+  last  = size - 1
+  src   = src_tile.pos_x * size + src_tile.pos_y
+  key   = ( src, max_cost, cache_state['version'] )
+
+  if key in range_cache:
+    return range_cache[key]
+
+  best  = { src: 0 }
+  prev  = { src: src }
+  heap  = [ ( 0, src ) ]
+
+  # Expand cheapest tile first, skipping stale heap entries. Neighbors
+  # are checked inline since this loop dominates the search.
+
+  while heap:
+
+    cost, idx = heapq.heappop( heap )
+
+    if cost > best[idx]:
+      continue
+
+    pos_x, pos_y = divmod( idx, size )
+
+    for next_idx, in_bounds in ( ( idx - 1,    pos_y > 0    ),
+                                 ( idx + size, pos_x < last ),
+                                 ( idx + 1,    pos_y < last ),
+                                 ( idx - size, pos_x > 0    ) ):
+
+      if not in_bounds:
+        continue
+
+      next_cost = cost + costs[next_idx]
+
+      if ( next_cost < max_cost ) and ( next_cost < best.get( next_idx, max_cost ) ):
+        best[next_idx] = next_cost
+        prev[next_idx] = idx
+        heapq.heappush( heap, ( next_cost, next_idx ) )
+
+  # Convert indices back to tiles
+
+  path_dic = {}
+
+  for idx, cost in best.iteritems():
+    path_dic[tiles[idx]] = [ tiles[prev[idx]], cost ]
+
+  if len( range_cache ) >= properties.RANGE_CACHE_SIZE:
+    range_cache.clear()
+
+  range_cache[key] = path_dic
+
+  return path_dic
+
+# Find shortest path from the origin tile to a single destination tile
+# for less than the given maximum cost using A* search. The Manhattan
+# distance scaled by the cheapest move cost never overestimates, so the
+# path found is always the shortest. Returns the route (excluding the
+# origin) and its cost, or None and None if the destination is out of
+# reach.
+
+def calc_path( map, src_tile, dest_tile, max_cost ):
+
+  costs    = get_costs( map )
+  min_cost = cache_state['min_cost']
+  size     = len( map )
+  src      = src_tile.pos_x * size + src_tile.pos_y
+  dest     = dest_tile.pos_x * size + dest_tile.pos_y
+
+  best  = { src: 0 }
+  prev  = { src: src }
+  heap  = [ ( 0, 0, src ) ]
+
+  while len( heap ) > 0:
+
+    estimate, cost, idx = heapq.heappop( heap )
+
+    if idx == dest:
+      break
+
+    if cost > best[idx]:
+      continue
+
+    for next_idx in get_neighbors( idx, size ):
+
+      next_cost    = cost + costs[next_idx]
+      pos_x, pos_y = divmod( next_idx, size )
+      estimate     = next_cost + min_cost * ( abs( pos_x - dest_tile.pos_x ) + abs( pos_y - dest_tile.pos_y ) )
+
+      if ( estimate < max_cost ) and ( next_cost < best.get( next_idx, max_cost ) ):
+        best[next_idx] = next_cost
+        prev[next_idx] = idx
+        heapq.heappush( heap, ( estimate, next_cost, next_idx ) )
+
+  if dest not in best:
+    return None, None
+
+  # Walk back from destination to build route
+
+  route = []
+  idx   = dest
+
+  tiles = cache_state['tiles']
+
+  while idx != src:
+    route.append( tiles[idx] )
+    idx = prev[idx]
+
+  route.reverse()
+
+  return route, best[dest]
@@ -0,0 +1,251 @@
+#=========================================================================
+# profiler.py
+#=========================================================================
+# Optional frame profiler for the game engine. Each frame is split into
+# stages (inputs, camera, phase handling, updates and the drawing of each
+# window) which are timed by marking the end of every stage. Blits, text
+# renders and image loads are counted per frame. The last PROFILE_WINDOW
+# samples of every series are kept per phase for percentiles, while
+# totals are kept for the whole run. Results are shown as an overlay and
+# can be dumped to CSV or JSON.
+
+import pygame, sys, os
+from pygame.locals import *
+
+import time
+import json
+import csv
+import collections
+import properties
+import utils
+import assets
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+PERCENTILES = [ 50, 90, 99 ]
+
+HUD_X_OFFSET = 8
+HUD_Y_OFFSET = 8
+HUD_ALPHA    = 192
+HUD_SIZE     = 12
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Return given percentile of a list of samples (nearest rank)
+
+def calc_percentile( samples, percentile ):
+
+  if len( samples ) == 0:
+    return 0.0
+
+  ordered = sorted( samples )
+  idx     = int( round( percentile / 100.0 * ( len( ordered ) - 1 ) ) )
+
+  return ordered[idx]
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class Profiler( object ):
+
+  # Constructor. A disabled profiler ignores every call, so the engine
+  # can always keep one.
+
+  def __init__( self, enabled=False ):
+
+    self.enabled = enabled
+    self.hud_en  = False
+
+    # Rolling samples and whole-run totals ( count, sum, max ), indexed
+    # by phase name and series name
+
+    self.samples = {}
+    self.totals  = {}
+
+    # Current frame
+
+    self.phase      = None
+    self.frame_time = 0.0
+    self.mark_time  = 0.0
+    self.frame      = collections.OrderedDict()
+    self.num_frames = 0
+
+    self.text_renders = 0
+    self.image_loads  = 0
+
+    # Overlay surface, rendered again once per second
+
+    self.hud_surface = None
+    self.hud_frame   = 0
+
+  # Add sample to series of given phase
+
+  def add_sample( self, phase, name, value ):
+
+    key = ( phase, name )
+
+    if key not in self.samples:
+      self.samples[key] = collections.deque( maxlen=properties.PROFILE_WINDOW )
+      self.totals[key]  = [ 0, 0.0, 0.0 ]
+
+    self.samples[key].append( value )
+
+    total     = self.totals[key]
+    total[0] += 1
+    total[1] += value
+    total[2]  = max( total[2], value )
+
+  # Start timing a new frame in given phase
+
+  def begin_frame( self, phase ):
+
+    if not self.enabled:
+      return
+
+    self.phase      = phase
+    self.frame_time = time.time()
+    self.mark_time  = self.frame_time
+    self.frame      = collections.OrderedDict()
+    self.frame['blits'] = 0
+
+    self.text_renders = utils.text_stats['misses']
+    self.image_loads  = assets.asset_stats['loads']
+
+  # Mark the end of a stage, timing it from the previous mark, along
+  # with the number of blits done in the stage
+
+  def mark( self, stage, num_blits=0 ):
+
+    if not self.enabled:
+      return
+
+    now = time.time()
+
+    self.frame[stage] = self.frame.get( stage, 0.0 ) + ( now - self.mark_time ) * 1000.0
+    self.mark_time    = now
+
+    self.frame['blits'] += num_blits
+
+  # Finish timing the current frame and record all of its samples
+
+  def end_frame( self ):
+
+    if not self.enabled:
+      return
+
+    self.frame['frame'] = ( time.time() - self.frame_time ) * 1000.0
+    self.frame['texts'] = utils.text_stats['misses'] - self.text_renders
+    self.frame['loads'] = assets.asset_stats['loads'] - self.image_loads
+
+    for name, value in self.frame.iteritems():
+      self.add_sample( self.phase, name, value )
+
+    self.num_frames += 1
+
+  # Toggle overlay
+
+  def toggle_hud( self ):
+
+    if self.enabled:
+      self.hud_en      = not self.hud_en
+      self.hud_surface = None
+
+  # Return statistics of every series as a list of rows
+
+  def get_stats( self ):
+
+    rows = []
+
+    for phase, name in sorted( self.samples.keys() ):
+
+      samples = self.samples[( phase, name )]
+      total   = self.totals[( phase, name )]
+
+      row = collections.OrderedDict()
+
+      row['phase']  = phase
+      row['series'] = name
+      row['count']  = total[0]
+      row['mean']   = total[1] / total[0]
+      row['max']    = total[2]
+
+      for percentile in PERCENTILES:
+        row['p%d' % percentile] = calc_percentile( samples, percentile )
+
+      rows.append( row )
+
+    return rows
+
+  # Render overlay text for the current phase
+
+  def render_hud( self ):
+
+    lines = [ 'PHASE %s  (%d frames)' % ( self.phase, self.num_frames ) ]
+
+    for row in self.get_stats():
+
+      if row['phase'] != self.phase:
+        continue
+
+      lines.append( '%-14s p50 %7.2f  p90 %7.2f  p99 %7.2f' % (
+        row['series'], row['p50'], row['p90'], row['p99'] ) )
+
+    # Text is rendered directly so it neither fills the text cache nor
+    # shows up in the text render counts
+
+    font     = utils.get_font( HUD_SIZE )
+    surfaces = [ font.render( line, 1, utils.WHITE ) for line in lines ]
+
+    width  = max( [ surface.get_width() for surface in surfaces ] ) + 8
+    height = sum( [ surface.get_height() for surface in surfaces ] ) + 8
+
+    self.hud_surface = pygame.Surface( ( width, height ) )
+    self.hud_surface.fill( utils.BLACK )
+    self.hud_surface.set_alpha( HUD_ALPHA )
+
+    pos_y = 4
+
+    for surface in surfaces:
+      self.hud_surface.blit( surface, ( 4, pos_y ) )
+      pos_y += surface.get_height()
+
+  # Draw overlay onto given surface
+
+  def draw_hud( self, surface ):
+
+    if not self.hud_en:
+      return []
+
+    if ( self.hud_surface == None ) or ( self.num_frames - self.hud_frame >= properties.FPS ):
+      self.render_hud()
+      self.hud_frame = self.num_frames
+
+    return [ surface.blit( self.hud_surface, ( HUD_X_OFFSET, HUD_Y_OFFSET ) ) ]
+
+  # Write statistics to given path, as JSON if the path ends in .json and
+  # as CSV otherwise
+
+  def dump( self, path ):
+
+    rows = self.get_stats()
+
+    if path.endswith( '.json' ):
+
+      with open( path, 'w' ) as out:
+        json.dump( rows, out, indent=2 )
+
+    else:
+
+      with open( path, 'wb' ) as out:
+
+        writer = csv.writer( out )
+        writer.writerow( [ 'phase', 'series', 'count', 'mean', 'max' ]
+                         + [ 'p%d' % percentile for percentile in PERCENTILES ] )
+
+        for row in rows:
+          writer.writerow( row.values() )
@@ -11,6 +11,16 @@ FPS          = 20
 SPS          = 4         # steps or animation frames per second
 FRAME_SWITCH = FPS / SPS # number of frames to hold one animation frame
 
+TEXT_CACHE_SIZE  = 512   # maximum number of rendered text surfaces kept
+PRELOAD_ASSETS   = True  # load all images at startup instead of on demand
+RANGE_CACHE_SIZE = 64    # maximum number of reachable ranges kept
+TEXT_OVERSCAN    = 2     # rows rendered beyond each edge of a text box
+IDLE_FRAMES      = 2     # frames drawn after the last change before idling
+PROFILE_WINDOW   = 600   # frames per phase kept for profiler percentiles
+
+COMBAT_SIM_TRIALS = 200 # encounters simulated for each combat odds estimate
+COMBAT_MAX_ROUNDS = 100 # enemy turns resolved before an encounter is lost
+
 #-------------------------------------------------------------------------
 # Survivors
 #-------------------------------------------------------------------------
@@ -23,7 +33,8 @@ START_WOOD  = 5
 START_METAL = 2
 START_AMMO  = 5
 
-EXPD_SPEED = 2
+EXPD_SPEED  = 2
+EXPD_FRAMES = 2 # walking animation frames per direction
 
 ATTRIBUTE_PROB = 0.25
 
@@ -56,6 +67,9 @@ TILE_HEIGHT = 32
 MAP_WIDTH   = MAP_SIZE * TILE_WIDTH
 MAP_HEIGHT  = MAP_SIZE * TILE_HEIGHT
 
+CHUNK_SIZE        = 32 # tiles per side of one chunk of a streamed world
+CHUNK_KEEP_RADIUS = 1  # chunks kept loaded around each expedition
+
 SCROLL_WIDTH = 32
 SCROLL_SPEED = 16
 
@@ -66,6 +80,8 @@ NUM_FACILITY    = 1
 NUM_WRECKAGE    = 5
 NUM_RITUAL_SITE = 4
 
+MAX_PLACE_TRIES = 100 # random tries before searching all valid tiles
+
 MOUNTAIN_RATE    = 0.2 #0.15
 CAVE_RATE        = 0.4 #0.30
 SWAMP_RATE       = 0.3 #0.20
@@ -74,6 +90,7 @@ DEEP_JUNGLE_RATE = 0.3 #0.25
 FACILITY_RATE    = 0.4 #0.25
 
 NIGHT_ALPHA = 160
+FIRE_FRAMES = 4 # campfire animation frames
 
 #-------------------------------------------------------------------------
 # Menu
@@ -168,6 +185,7 @@ WINDOW_WIDTH = CAMERA_WIDTH + SIDEBAR_WIDTH
 FONT_PATH    = 'fonts/'
 DEFAULT_FONT = FONT_PATH + 'default.ttf'
 
+IMAGE_PATH   = 'images/'
 TILE_PATH    = 'images/tiles/'
 EXPD_PATH    = 'images/expedition/'
 SIDEBAR_PATH = 'images/sidebar/'
@@ -177,3 +195,5 @@ EVENT_PATH   = 'images/event/'
 DEFEND_PATH  = 'images/defend/'
 ENEMY_PATH   = 'images/enemy/'
 BG_PATH      = 'images/bg/'
+
+AUTOSAVE_PATH = None # snapshot written at every day/night switch (None disables)
@@ -0,0 +1,90 @@
+#=========================================================================
+# rng.py
+#=========================================================================
+# Per-game random number generation. Each game owns one GameRNG created
+# from a seed, which holds an independent random stream per subsystem so
+# that the same seed always reproduces the same game, and extra rolls in
+# one subsystem do not shift the results of another.
+
+import random
+import hashlib
+import bisect
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Subsystems with their own random stream
+
+stream_table = [
+  'map',        # map generation
+  'engine',     # starting position
+  'survivor',   # survivor names, stats and attributes
+  'expedition', # expedition images
+  'scavenge',   # resource and item rolls
+  'combat',     # enemy spawns, attacks and damage
+  'event',      # starvation and sickness
+  'player',     # simulated player input in headless mode
+]
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Pick a new random seed
+
+def gen_seed():
+
+  return random.SystemRandom().randint( 0, 2**31 - 1 )
+
+# Derive seed for a substream. A hash is used instead of the builtin
+# hash() so that seeds do not depend on the interpreter.
+
+def derive_seed( seed, name ):
+
+  return int( hashlib.md5( str( seed ) + ':' + name ).hexdigest()[:16], 16 )
+
+# Compile probabilities into running sums for sampling with pick(). The
+# sums are accumulated in table order, so pick() chooses the same entry
+# as scanning the table and summing along the way.
+
+def gen_cumulative( probs ):
+
+  cumulative = []
+  prob       = 0.0
+
+  for p in probs:
+    prob += p
+    cumulative.append( prob )
+
+  return cumulative
+
+# Return index of the entry chosen by roll from the running sums, or
+# None if the roll is past the last entry
+
+def pick( cumulative, roll ):
+
+  idx = bisect.bisect_right( cumulative, roll )
+
+  if idx == len( cumulative ):
+    return None
+
+  return idx
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class GameRNG:
+
+  # Constructor
+
+  def __init__( self, seed=None ):
+
+    if seed == None:
+      seed = gen_seed()
+
+    self.seed = seed
+
+    for name in stream_table:
+      setattr( self, name, random.Random( derive_seed( seed, name ) ) )
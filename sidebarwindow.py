@@ -11,6 +11,7 @@ import utils
 import window
 import infotextbox
 import button
+import expedition
 
 #-------------------------------------------------------------------------
 # Window Offsets
@@ -53,6 +54,7 @@ class SidebarWindow( window.Window ):
     self.expeditions = expeditions
 
     self.time_str    = ''
+    self.free_str    = ''
 
     # Initialize sub-windows
 
@@ -89,13 +91,7 @@ class SidebarWindow( window.Window ):
 
   def get_free( self ):
 
-    count = 0
-
-    if len( self.expeditions ) > 0:
-      for _expedition in self.expeditions:
-        count += len( _expedition.get_free() )
-
-    return count
+    return expedition.get_num_free()
 
   # Process inputs. Return true if done button is clicked and there are
   # no more free survivors left.
@@ -124,6 +120,8 @@ class SidebarWindow( window.Window ):
 
   def update( self ):
 
+    old_strs = ( self.time_str, self.free_str )
+
     # Compute time count
 
     self.time_str = 'DAY '
@@ -137,6 +135,9 @@ class SidebarWindow( window.Window ):
 
     self.free_str = str( self.get_free() ) + ' FREE SURVIVORS'
 
+    if ( self.time_str, self.free_str ) != old_strs:
+      utils.invalidate()
+
     # Populate text boxes
 
     if self._tile != None:
@@ -0,0 +1,444 @@
+#=========================================================================
+# snapshot.py
+#=========================================================================
+# Compact binary snapshots of a game in progress. The map is stored as
+# one byte per tile packing the terrain, fog and rescuable survivor
+# flags, followed by the depletion count of each resource for the few
+# tiles that were scavenged. Survivors and items are fixed-size records
+# that refer to the name, item and attribute tables by index, so only
+# state that cannot be derived from the tables is stored. The random
+# streams are stored as well, so a loaded game plays out exactly like
+# the original would have.
+#
+# Snapshot layout (little endian, everything after the header is
+# compressed):
+#
+#   header      magic, version, map size, seed, day, time count
+#   tiles       size * size bytes
+#   depletion   NUM_RSRC bytes per depleted tile, in tile order
+#   names       one byte per name table entry (1 if still available)
+#   streams     state of every random stream in the stream table
+#   expeditions expedition records, each followed by its items and
+#               survivors
+
+import os
+import zlib
+import struct
+import properties
+import rng
+import tile
+import expedition
+import survivor
+import inventory
+import item
+import attribute
+
+#-------------------------------------------------------------------------
+# Utility Tables
+#-------------------------------------------------------------------------
+
+# Table entries in the order they are indexed by. Dictionaries are
+# sorted by name so the indices do not depend on the interpreter.
+
+terrain_names = sorted( tile.terrain_table.keys() )
+item_names    = sorted( item.item_table.keys() )
+attr_names    = [ attr[1] for attr in attribute.attr_table ]
+
+terrain_idx   = dict( [ ( name, i ) for i, name in enumerate( terrain_names ) ] )
+item_idx      = dict( [ ( name, i ) for i, name in enumerate( item_names ) ] )
+attr_idx      = dict( [ ( name, i ) for i, name in enumerate( attr_names ) ] )
+name_idx      = dict( [ ( name, i ) for i, name in enumerate( survivor.name_table ) ] )
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+MAGIC   = 'OBSV'
+VERSION = 1
+
+NUM_RSRC      = 5      # food, wood, metal, ammo and item
+MAX_DEPLETION = 255
+
+# Tile byte flags, the terrain index takes the low bits
+
+TILE_FOG      = 0x10
+TILE_SURVIVOR = 0x20
+TILE_DEPLETED = 0x40
+TILE_TERRAIN  = 0x0f
+
+# Item and survivor record flags
+
+ITEM_EQUIPPED = 0x01
+ITEM_FREE     = 0x02
+
+SURVIVOR_FREE = 0x01
+SURVIVOR_SICK = 0x02
+
+NO_SLOT = 0xffff
+
+# Record formats
+
+HEADER_FMT     = '<4sHHqBi'
+STREAM_FMT     = '<625IBd'
+EXPEDITION_FMT = '<HHBBiiiiHB'
+ITEM_FMT       = '<BB'
+SURVIVOR_FMT   = '<HBhhhBBBBHBHB'
+
+assert( len( terrain_names ) <= TILE_TERRAIN + 1 )
+assert( len( item_names ) < 256 )
+
+#-------------------------------------------------------------------------
+# Save
+#-------------------------------------------------------------------------
+
+# Return number of times given resource of a depleted tile was depleted.
+# Depletion is replayed on load, so the count is found by replaying it
+# here until the stored probability is reached.
+
+def get_depletion( _tile, i ):
+
+  prob  = _tile.proto.rsrc_probs[i]
+  count = 0
+
+  while ( prob != _tile.rsrc_probs[i] ) and ( count < MAX_DEPLETION ):
+    prob  *= properties.RSRC_REDUC_RATE
+    count += 1
+
+  return count
+
+# Return packed tile grid and depletion counts of given map
+
+def pack_map( map ):
+
+  proto_idx = dict( [ ( tile.get_terrain( name ), idx ) for name, idx in terrain_idx.iteritems() ] )
+
+  tiles = [ _tile for column in map for _tile in column ]
+
+  grid = bytearray( [
+    proto_idx[_tile.proto]
+    | ( TILE_FOG      if _tile._fog                 else 0 )
+    | ( TILE_SURVIVOR if _tile._has_survivor        else 0 )
+    | ( TILE_DEPLETED if _tile.rsrc_probs != None   else 0 )
+    for _tile in tiles
+  ] )
+
+  depletion = bytearray()
+
+  for _tile in tiles:
+    if _tile.rsrc_probs != None:
+      depletion.extend( [ get_depletion( _tile, i ) for i in range( NUM_RSRC ) ] )
+
+  return str( grid ) + str( depletion )
+
+# Return packed state of every random stream
+
+def pack_streams( _rng ):
+
+  data = []
+
+  for name in rng.stream_table:
+
+    version, state, gauss = getattr( _rng, name ).getstate()
+
+    data.append( struct.pack( STREAM_FMT, *( state + ( gauss != None, gauss or 0.0 ) ) ) )
+
+  return ''.join( data )
+
+# Return packed item record
+
+def pack_item( _item ):
+
+  flags = ( ITEM_EQUIPPED if _item.equipped else 0 ) | ( ITEM_FREE if _item.free else 0 )
+
+  return struct.pack( ITEM_FMT, item_idx[_item.name], flags )
+
+# Return inventory slot of given item, or NO_SLOT if the item is not in
+# the inventory (such as the bare hands and clothes of a survivor)
+
+def get_slot( _inventory, _item ):
+
+  for i, slot_item in enumerate( _inventory.items ):
+    if slot_item is _item:
+      return i
+
+  return NO_SLOT
+
+# Return packed survivor record
+
+def pack_survivor( _survivor, _inventory ):
+
+  flags = ( SURVIVOR_FREE if _survivor.free else 0 ) | ( SURVIVOR_SICK if _survivor.sick else 0 )
+
+  data = struct.pack(
+    SURVIVOR_FMT,
+    name_idx[_survivor.name], _survivor.age,
+    _survivor.max_stamina, _survivor.stamina, _survivor.target_stamina,
+    _survivor.physical, _survivor.mental, flags,
+    item_idx[_survivor.weapon.name], get_slot( _inventory, _survivor.weapon ),
+    item_idx[_survivor.armor.name],  get_slot( _inventory, _survivor.armor ),
+    len( _survivor.attributes )
+  )
+
+  return data + ''.join( [ chr( attr_idx[attr.name] ) for attr in _survivor.attributes ] )
+
+# Return packed expedition record, followed by its items and survivors
+
+def pack_expedition( _expedition ):
+
+  _inventory = _expedition._inventory
+
+  data = [ struct.pack(
+    EXPEDITION_FMT,
+    _expedition.pos_tile.pos_x, _expedition.pos_tile.pos_y,
+    _expedition.img_roll, _expedition.view_range,
+    _inventory.food, _inventory.wood, _inventory.metal, _inventory.ammo,
+    len( _inventory.items ), len( _expedition.survivors )
+  ) ]
+
+  data += [ pack_item( _item ) for _item in _inventory.items ]
+  data += [ pack_survivor( _survivor, _inventory ) for _survivor in _expedition.survivors ]
+
+  return ''.join( data )
+
+# Return snapshot of given game state as a string
+
+def dumps( map, expeditions, _rng, day_en, time_count ):
+
+  assert( isinstance( map, list ) )
+
+  names = bytearray( [ name in survivor.name_pool for name in survivor.name_table ] )
+
+  body = [
+    pack_map( map ),
+    str( names ),
+    pack_streams( _rng ),
+    struct.pack( '<H', len( expeditions ) ),
+  ]
+
+  body += [ pack_expedition( _expedition ) for _expedition in expeditions ]
+
+  header = struct.pack( HEADER_FMT, MAGIC, VERSION, len( map ), _rng.seed, day_en, time_count )
+
+  return header + zlib.compress( ''.join( body ), 1 )
+
+# Write snapshot of given game state to path. The snapshot is written to
+# a temporary file first, so an interrupted save never replaces the
+# last good one.
+
+def save( path, map, expeditions, _rng, day_en, time_count ):
+
+  data = dumps( map, expeditions, _rng, day_en, time_count )
+
+  with open( path + '.tmp', 'wb' ) as out:
+    out.write( data )
+
+  # Renaming onto an existing file fails on Windows, so the last good
+  # snapshot is only removed once the new one is complete
+
+  if ( os.name == 'nt' ) and os.path.exists( path ):
+    os.remove( path )
+
+  os.rename( path + '.tmp', path )
+
+#-------------------------------------------------------------------------
+# Load
+#-------------------------------------------------------------------------
+
+# Sequential reader over the snapshot body
+
+class Reader( object ):
+
+  # Constructor
+
+  def __init__( self, data ):
+
+    self.data   = data
+    self.offset = 0
+
+  # Unpack record of given format
+
+  def unpack( self, fmt ):
+
+    values       = struct.unpack_from( fmt, self.data, self.offset )
+    self.offset += struct.calcsize( fmt )
+
+    return values
+
+  # Return next given number of bytes
+
+  def read( self, num_bytes ):
+
+    data         = self.data[self.offset:self.offset + num_bytes]
+    self.offset += num_bytes
+
+    return bytearray( data )
+
+# Return map built from packed tile grid and depletion counts
+
+def unpack_map( reader, size ):
+
+  grid = reader.read( size * size )
+  map  = []
+
+  for pos_x in range( size ):
+
+    column = []
+
+    for pos_y in range( size ):
+
+      value = grid[pos_x * size + pos_y]
+      _tile = tile.Tile( terrain_names[value & TILE_TERRAIN], pos_x, pos_y )
+
+      _tile._fog          = ( value & TILE_FOG ) != 0
+      _tile._has_survivor = ( value & TILE_SURVIVOR ) != 0
+
+      # Replay depletion so the probabilities match the saved game
+
+      if value & TILE_DEPLETED:
+
+        for i, count in enumerate( reader.read( NUM_RSRC ) ):
+          for j in range( count ):
+            _tile.deplete( i )
+
+        if _tile.rsrc_probs == None:
+          _tile.rsrc_probs = list( _tile.proto.rsrc_probs )
+
+      column.append( _tile )
+
+    map.append( column )
+
+  return map
+
+# Restore state of every random stream
+
+def unpack_streams( reader, _rng ):
+
+  for name in rng.stream_table:
+
+    values = reader.unpack( STREAM_FMT )
+    gauss  = values[626] if values[625] else None
+
+    getattr( _rng, name ).setstate( ( 3, tuple( values[:625] ), gauss ) )
+
+# Return item built from packed record
+
+def unpack_item( reader ):
+
+  idx, flags = reader.unpack( ITEM_FMT )
+
+  _item = item.Item( item_names[idx] )
+
+  _item.equipped = ( flags & ITEM_EQUIPPED ) != 0
+  _item.free     = ( flags & ITEM_FREE ) != 0
+
+  return _item
+
+# Return equipment of a survivor, either from the inventory slot or a
+# new item if the equipment is not in the inventory
+
+def get_equipment( _inventory, idx, slot ):
+
+  if slot != NO_SLOT:
+    return _inventory.items[slot]
+
+  return item.Item( item_names[idx] )
+
+# Return survivor built from packed record. The constructor is skipped
+# since it would roll a new survivor.
+
+def unpack_survivor( reader, _inventory, _rng ):
+
+  name, age, max_stamina, stamina, target_stamina, physical, mental, flags, \
+    weapon_idx, weapon_slot, armor_idx, armor_slot, num_attrs = reader.unpack( SURVIVOR_FMT )
+
+  _survivor = survivor.Survivor.__new__( survivor.Survivor )
+
+  _survivor._rng           = _rng
+  _survivor.party          = None
+  _survivor.name           = survivor.name_table[name]
+  _survivor.age            = age
+  _survivor.max_stamina    = max_stamina
+  _survivor.stamina        = stamina
+  _survivor.target_stamina = target_stamina
+  _survivor.physical       = physical
+  _survivor.mental         = mental
+  _survivor.heal_rate      = survivor.heal_table[age/10]
+  _survivor.cure_prob      = survivor.cure_table[age/10]
+  _survivor._free          = ( flags & SURVIVOR_FREE ) != 0
+  _survivor.sick           = ( flags & SURVIVOR_SICK ) != 0
+  _survivor.weapon         = get_equipment( _inventory, weapon_idx, weapon_slot )
+  _survivor.armor          = get_equipment( _inventory, armor_idx, armor_slot )
+
+  attributes = [ attribute.Attribute( age, attr_names[idx] ) for idx in reader.read( num_attrs ) ]
+
+  _survivor.job = attribute.NONE
+
+  for attr in attributes:
+    if attr.job != attribute.NONE:
+      _survivor.job = attr.job
+
+  _survivor.attributes = attributes
+
+  return _survivor
+
+# Return expedition built from packed record
+
+def unpack_expedition( reader, map, _rng ):
+
+  pos_x, pos_y, img_roll, view_range, food, wood, metal, ammo, num_items, num_survivors \
+    = reader.unpack( EXPEDITION_FMT )
+
+  items      = [ unpack_item( reader ) for i in range( num_items ) ]
+  _inventory = inventory.Inventory( food, wood, metal, ammo, items )
+  survivors  = [ unpack_survivor( reader, _inventory, _rng ) for i in range( num_survivors ) ]
+
+  _expedition = expedition.Expedition( map[pos_x][pos_y], survivors, _inventory, map, _rng, img_roll )
+
+  _expedition.view_range = view_range
+
+  return _expedition
+
+# Return game state from given snapshot string as a tuple of the map,
+# expeditions, random streams, day flag and time count. Expeditions are
+# added to the current sprite groups of the expedition class.
+
+def loads( data ):
+
+  header_size = struct.calcsize( HEADER_FMT )
+
+  magic, version, size, seed, day_en, time_count = struct.unpack_from( HEADER_FMT, data )
+
+  assert( magic == MAGIC )
+  assert( version == VERSION )
+
+  reader = Reader( zlib.decompress( data[header_size:] ) )
+
+  map   = unpack_map( reader, size )
+  names = reader.read( len( survivor.name_table ) )
+
+  survivor.name_pool[:] = [ name for name, available in zip( survivor.name_table, names ) if available ]
+
+  _rng = rng.GameRNG( seed )
+
+  unpack_streams( reader, _rng )
+
+  num_expeditions, = reader.unpack( '<H' )
+
+  expeditions = [ unpack_expedition( reader, map, _rng ) for i in range( num_expeditions ) ]
+
+  # The map layer is built from scratch for the new map, so tiles queued
+  # for redrawing (including those of the old map) are dropped
+
+  for _tile in tile.dirty_tiles:
+    _tile.dirty = False
+
+  del tile.dirty_tiles[:]
+
+  return map, expeditions, _rng, day_en == 1, time_count
+
+# Return game state from snapshot at given path
+
+def load( path ):
+
+  with open( path, 'rb' ) as snapshot:
+    return loads( snapshot.read() )
@@ -6,7 +6,6 @@
 import pygame, sys, os
 from pygame.locals import *
 
-import random
 import properties
 import utils
 import attribute
@@ -106,29 +105,45 @@ cure_table = [
   0.20,
 ]
 
+# Names not yet taken in the current game
+
+name_pool = list( name_table )
+
+#-------------------------------------------------------------------------
+# Functions
+#-------------------------------------------------------------------------
+
+# Make every name available again for a new game
+
+def reset_names():
+
+  name_pool[:] = name_table
+
 #-------------------------------------------------------------------------
 # Main Class
 #-------------------------------------------------------------------------
 
-class Survivor:
+class Survivor( object ):
 
   # Constructor
 
-  def __init__( self ):
+  def __init__( self, _rng ):
+
+    self._rng = _rng
 
     # Roll random stats based on age
 
-    self.name        = random.choice( name_table )
-    name_table.remove( self.name )
-    self.age         = random.randint( 10, 59 )
-    self.max_stamina = random.randint( stam_table[self.age/10][0], stam_table[self.age/10][1] )
+    self.name        = self._rng.survivor.choice( name_pool )
+    name_pool.remove( self.name )
+    self.age         = self._rng.survivor.randint( 10, 59 )
+    self.max_stamina = self._rng.survivor.randint( stam_table[self.age/10][0], stam_table[self.age/10][1] )
     self.stamina     = self.max_stamina
-    self.physical    = random.randint( phys_table[self.age/10][0], phys_table[self.age/10][1] )
-    self.mental      = random.randint( ment_table[self.age/10][0], ment_table[self.age/10][1] )
+    self.physical    = self._rng.survivor.randint( phys_table[self.age/10][0], phys_table[self.age/10][1] )
+    self.mental      = self._rng.survivor.randint( ment_table[self.age/10][0], ment_table[self.age/10][1] )
     self.heal_rate   = heal_table[self.age/10]
     self.cure_prob   = cure_table[self.age/10]
-    self.attributes  = []
-    self.free        = True
+    self.party       = None
+    self._free       = True
     self.sick        = False
 
     self.weapon      = item.Item( 'Unarmed' )
@@ -136,40 +151,76 @@ class Survivor:
 
     self.target_stamina = self.max_stamina
 
-    # Text graphics
-
-    self.text_surface, self.text_rect = utils.gen_text_pos( self.name, 14, 0, 0, utils.WHITE )
-
     # Roll random attributes (up to three per survivor)
 
     self.job = attribute.NONE
 
+    attributes = []
+
     for i in range( 3 ):
 
       # Special case age-based attributes
 
       if ( i == 0 ) and ( self.age < 20 ):
-        self.attributes.append( attribute.Attribute( self.age, 'Youthful' ) )
+        attributes.append( attribute.Attribute( self.age, 'Youthful' ) )
 
 #      elif ( i == 0 ) and ( self.age >= 50 ):
-#        self.attributes.append( attribute.Attribute( self.age, 'Elderly' ) )
+#        attributes.append( attribute.Attribute( self.age, 'Elderly' ) )
 
       # Common case
 
-      elif random.random() < properties.ATTRIBUTE_PROB:
+      elif self._rng.survivor.random() < properties.ATTRIBUTE_PROB:
 
-        attr = attribute.Attribute( self.age )
+        attr = attribute.Attribute( self.age, '', self._rng )
 
         # Ensure no duplicate attributes
 
-        while attr in self.attributes:
-          attr = attribute.Attribute( self.age )
+        while attr in attributes:
+          attr = attribute.Attribute( self.age, '', self._rng )
 
-        self.attributes.append( attr )
+        attributes.append( attr )
 
         if attr.job != attribute.NONE:
           self.job = attr.job
 
+    self.attributes = attributes
+
+  # Age and attributes are properties so that the combined bonuses are
+  # only recomputed after either changes. Attributes are stored as a
+  # tuple, so they can only be changed by assigning a new list.
+
+  @property
+  def age( self ):
+    return self._age
+
+  @age.setter
+  def age( self, age ):
+    self._age    = age
+    self.bonuses = None
+
+  # Free state is a property so that the expedition the survivor belongs
+  # to (if any) can keep count of its free survivors
+
+  @property
+  def free( self ):
+    return self._free
+
+  @free.setter
+  def free( self, free ):
+    if free != self._free:
+      self._free = free
+      if self.party != None:
+        self.party.add_free( 1 if free else -1 )
+
+  @property
+  def attributes( self ):
+    return self._attributes
+
+  @attributes.setter
+  def attributes( self, attributes ):
+    self._attributes = tuple( attributes )
+    self.bonuses     = None
+
   # Overload hash operator to index dictionaries
 
   def __hash__( self ):
@@ -229,7 +280,7 @@ class Survivor:
     if critical:
       raw_dmg = weapon.dmg_max
     else:
-      raw_dmg = random.randint( weapon.dmg_min, weapon.dmg_max )
+      raw_dmg = self._rng.combat.randint( weapon.dmg_min, weapon.dmg_max )
 
     # Get mental bonus for cursed weapons
 
@@ -279,12 +330,10 @@ class Survivor:
 
   def get_attributes( self ):
 
-    tot_attr = attribute.Attribute( self.age, 'Empty' )
-
-    for attr in self.attributes:
-      tot_attr += attr
+    if self.bonuses == None:
+      self.bonuses = attribute.Bonuses( self.attributes )
 
-    return tot_attr
+    return self.bonuses
 
   # Return job type (assume only one job per survivor)
 
@@ -138,43 +138,37 @@ class SurvivorWindow( window.Window ):
 
     # Determine free survivor info to display
 
-    for _survivor, rect in zip( self._expedition.get_free(), self.old_tbox.rect_matrix[0] ):
+    _survivor = self.old_tbox.get_item( self._expedition.get_free(), mouse_x, mouse_y )
 
-      # Determine if mouse is hovering over survivor
+    if _survivor != None:
 
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.old_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+      self._survivor = _survivor
 
-        self._survivor = _survivor
+      # Move selected survivors to selected column
 
-        # Move selected survivors to selected column
+      bonus = 0
 
-        bonus = 0
+      if criteria == 'day_bonus':
+        bonus = _survivor.get_attributes().day_bonus
 
-        if criteria == 'day_bonus':
-          bonus = _survivor.get_attributes().day_bonus
-
-        if mouse_click and ( _survivor.stamina > max( cost - bonus, 0 ) ) \
-          and ( len( self.survivors ) < self.limit ):
-          _survivor.free = False
-          self.survivors.append( _survivor )
+      if mouse_click and ( _survivor.stamina > max( cost - bonus, 0 ) ) \
+        and ( len( self.survivors ) < self.limit ):
+        _survivor.free = False
+        self.survivors.append( _survivor )
 
     # Determine selected survivor info to display
 
-    for _survivor, rect in zip( self.survivors, self.new_tbox.rect_matrix[0] ):
-
-      # Determine if mouse is hovering over survivor
+    _survivor = self.new_tbox.get_item( self.survivors, mouse_x, mouse_y )
 
-      if rect.collidepoint( mouse_x, mouse_y ) \
-        and self.new_tbox.rect.move( self.rect.left, self.rect.top ).collidepoint( mouse_x, mouse_y ):
+    if _survivor != None:
 
-        self._survivor = _survivor
+      self._survivor = _survivor
 
-        # Move deselected survivors to free column
+      # Move deselected survivors to free column
 
-        if mouse_click:
-          _survivor.free = True
-          self.survivors.remove( _survivor )
+      if mouse_click:
+        _survivor.free = True
+        self.survivors.remove( _survivor )
 
     # Scroll text boxes if necessary
 
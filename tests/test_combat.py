@@ -0,0 +1,211 @@
+#=========================================================================
+# test_combat.py
+#=========================================================================
+# Checks that the combat rules resolve an encounter the same way as the
+# defend window. The same seeded fight is played out once with
+# combat.fight and once by clicking through the defend window, with the
+# hit bar stopped at the position rolled from the player stream. Also
+# checks that an encounter where neither side can deal damage ends. Runs
+# without a display using the dummy SDL video driver:
+#
+#   python -m unittest discover tests
+
+import os, sys
+
+os.environ.setdefault( 'SDL_VIDEODRIVER', 'dummy' )
+os.environ.setdefault( 'SDL_AUDIODRIVER', 'dummy' )
+
+# Assets are loaded from paths relative to the repository root
+
+ROOT = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+sys.path.insert( 0, ROOT )
+os.chdir( ROOT )
+
+import pygame
+from pygame.locals import *
+
+import unittest
+import properties
+import rng
+import combat
+import defendwindow
+import tile
+import survivor
+import inventory
+import item
+import enemy
+import expedition
+
+#-------------------------------------------------------------------------
+# Properties
+#-------------------------------------------------------------------------
+
+# The wolves deal 2-4 damage against a barricade with 2 armor, so some
+# attacks deal no damage while the flashbang stun is still unused
+
+SEED       = 3
+ENEMY_NAME = 'Wolf Pack'
+DEFENSES   = [ 'Flashbang', 'Barricade' ]
+WEAPONS    = [ 'Knife', 'Spear' ]
+
+MAX_FRAMES = 10000
+
+#-------------------------------------------------------------------------
+# Helper Functions
+#-------------------------------------------------------------------------
+
+# Return survivors, enemy, defenses and inventory of the test encounter,
+# all drawing from a game stream with the test seed
+
+def make_encounter():
+
+  _rng = rng.GameRNG( SEED )
+
+  survivor.reset_names()
+
+  survivors = []
+
+  for name in WEAPONS:
+    _survivor        = survivor.Survivor( _rng )
+    _survivor.weapon = item.Item( name )
+    survivors.append( _survivor )
+
+  defenses   = [ item.Item( name ) for name in DEFENSES ]
+  _inventory = inventory.Inventory( 10, 10, 10, 10, list( defenses ) )
+
+  return survivors, enemy.Enemy( ENEMY_NAME, _rng ), defenses, _inventory, _rng
+
+# Click the window button once
+
+def click( window ):
+
+  rect = window.button_group.sprites()[0].rect.move( window.rect.left, window.rect.top )
+
+  return window.process_inputs( rect.centerx, rect.centery, True )
+
+# Update the window until its animation is done, skipping the wait on
+# damaged cards. The window is updated at least once, as the engine
+# does on every frame.
+
+def update( window ):
+
+  for i in range( MAX_FRAMES ):
+
+    window.timer = -defendwindow.DAMAGED_TIME
+    window.update()
+
+    if not window.animation_active:
+      return
+
+  raise AssertionError( 'animation did not finish' )
+
+#-------------------------------------------------------------------------
+# Tests
+#-------------------------------------------------------------------------
+
+class TestFight( unittest.TestCase ):
+
+  @classmethod
+  def setUpClass( cls ):
+
+    pygame.init()
+    pygame.display.set_mode( ( properties.WINDOW_WIDTH, properties.WINDOW_HEIGHT ) )
+
+    expedition.Expedition.groups = pygame.sprite.RenderUpdates()
+
+  # Play the encounter with the combat rules, returning whether it was
+  # won along with the remaining stamina and ammo
+
+  def play_rules( self ):
+
+    survivors, _enemy, defenses, _inventory, _rng = make_encounter()
+
+    won = combat.fight( survivors, _enemy, defenses, _inventory, _rng )
+
+    return won, [ _survivor.stamina for _survivor in survivors ], _enemy.stamina, _inventory.ammo
+
+  # Play the encounter in the defend window, stopping the hit bar at the
+  # position the rules would roll
+
+  def play_window( self ):
+
+    survivors, _enemy, defenses, _inventory, _rng = make_encounter()
+
+    # The window rolls its own enemy from the expedition stream on init,
+    # so the expedition gets a stream of its own
+
+    _tile       = tile.Tile( 'Field', 0, 0 )
+    map         = [ [ _tile ] ]
+    _expedition = expedition.Expedition( _tile, survivors, _inventory, map, rng.GameRNG( SEED ) )
+
+    window = defendwindow.DefendWindow(
+      properties.DEFEND_WIDTH, properties.DEFEND_HEIGHT,
+      0, 0, properties.DEFEND_PATH + 'defend_bg.png'
+    )
+
+    window._expedition = _expedition
+    window.survivors   = list( survivors )
+    window.defenses    = defenses
+    window._tile       = _tile
+
+    window.init()
+
+    # Replace the rolled enemy with the test one
+
+    window._enemy = _enemy
+    window.calc_turn_order()
+    window.hit_bar_speed = combat.get_hit_bar_speed( _enemy )
+
+    update( window )
+
+    done = False
+
+    while not done:
+
+      if ( window.phase == defendwindow.PHASE_PLAYER ) and window.hit_active:
+        window.hit_bar_ratio = combat.roll_hit_bar( window.hit_bar_speed, _rng )
+
+      done = click( window )
+
+      if not done:
+        update( window )
+
+    won = window.phase == defendwindow.PHASE_WIN
+
+    return won, [ _survivor.stamina for _survivor in survivors ], _enemy.stamina, _inventory.ammo
+
+  # Both must end the same way, with the same damage dealt on each side
+
+  def test_window( self ):
+
+    self.assertEqual( self.play_rules(), self.play_window() )
+
+  # A weak unarmed child behind a barbed fence and a wolf pack cannot
+  # hurt each other, so the encounter is lost once the enemy is out of
+  # turns, with no damage dealt on either side
+
+  def test_stalemate( self ):
+
+    _rng = rng.GameRNG( SEED )
+
+    survivor.reset_names()
+
+    _survivor            = survivor.Survivor( _rng )
+    _survivor.physical   = 4
+    _survivor.attributes = []
+    _survivor.weapon     = item.Item( 'Unarmed' )
+
+    stamina = _survivor.stamina
+    _enemy  = enemy.Enemy( 'Wolf Pack', _rng )
+
+    won = combat.fight(
+      [ _survivor ], _enemy, [ item.Item( 'Barbed Fence' ) ], inventory.Inventory(), _rng
+    )
+
+    self.assertFalse( won )
+    self.assertEqual( _survivor.stamina, stamina )
+    self.assertEqual( _enemy.stamina, _enemy.max_stamina )
+
+if __name__ == '__main__':
+  unittest.main()
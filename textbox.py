@@ -19,20 +19,19 @@ class TextBox:
 
   def __init__( self, width, height, pos_x, pos_y, offset_x, offset_y, size, color ):
 
-    # Initialize surface
+    # Initialize surface. The image holds the rendered rows around the
+    # visible part of the text box, which is all that is ever drawn.
 
-    self.image        = pygame.Surface( ( width, height ) )
-    self.rect         = self.image.get_rect()
-    self.rect.topleft = pos_x, pos_y
+    self.buffer_rows  = ( height / properties.TEXT_HEIGHT ) + 2 + ( 2 * properties.TEXT_OVERSCAN )
+
+    self.image        = pygame.Surface( ( width, self.buffer_rows * properties.TEXT_HEIGHT ) )
+    self.rect         = pygame.rect.Rect( pos_x, pos_y, width, height )
 
     self.offset_x     = offset_x
     self.offset_y     = offset_y
 
     # Initialize scroll area rects
 
-    self.surface_matrix  = []
-    self.rect_matrix     = []
-
     self.scroll_y        = 0
     self.max_scroll_y    = 0
 
@@ -50,8 +49,20 @@ class TextBox:
 
     # Store font parameters
 
-    self.size  = size
-    self.color = color
+    self.size          = size
+    self.color         = color
+    self.text_offset_y = properties.TEXT_Y_OFFSET
+
+    # Rendered state. Rows are only drawn again when their text changes,
+    # and the key of each row in the image is kept to tell. Unknown rows
+    # have a key of None.
+
+    self.text_matrix    = [['']]
+    self.num_rows       = 0
+    self.first_row      = 0
+    self.row_keys       = [ None ] * self.buffer_rows
+    self.dirty_rects    = []
+    self.drawn_scroll_y = 0
 
   # Scroll text if mouse is over scroll area
 
@@ -78,120 +89,200 @@ class TextBox:
   #   ],              ],              ],              ],
   # ]
   #
-  # Text to be bolded can be specified using the ** marker.
+  # Text to be bolded can be specified using the ** marker. Only rows
+  # whose text changed since the last update are rendered again.
 
   def update( self, text_matrix=[['']] ):
 
-    # Reset background
+    # Start over from a blank image if the number of columns changes
 
-    self.image.fill( utils.BLACK )
+    if len( text_matrix ) != len( self.text_matrix ):
+      self.image.fill( utils.BLACK )
+      self.row_keys = [ None ] * self.buffer_rows
 
-    # Calculate column offsets
+    self.text_matrix = text_matrix
+
+    # Determine maximum number of rows in any column and convert to
+    # pixels
+
+    self.num_rows     = max( [ len( text_col ) for text_col in text_matrix ] )
+    self.max_scroll_y = self.num_rows * properties.TEXT_HEIGHT
+
+    # Move the rendered rows if the visible rows are no longer within
+    # the image. Rows still in the image are blitted over instead of
+    # being rendered again.
+
+    top_row    = self.scroll_y / properties.TEXT_HEIGHT
+    bottom_row = ( self.scroll_y + self.rect.height - 1 ) / properties.TEXT_HEIGHT
+
+    if ( top_row < self.first_row ) or ( bottom_row >= self.first_row + self.buffer_rows ):
+
+      first_row = max( top_row - properties.TEXT_OVERSCAN, 0 )
+      shift     = first_row - self.first_row
+
+      if abs( shift ) >= self.buffer_rows:
+        self.row_keys = [ None ] * self.buffer_rows
+      elif shift > 0:
+        self.row_keys = self.row_keys[shift:] + [ None ] * shift
+      else:
+        self.row_keys = [ None ] * -shift + self.row_keys[:shift]
+
+      self.image.scroll( 0, -shift * properties.TEXT_HEIGHT )
+
+      self.first_row   = first_row
+      self.dirty_rects = [ self.get_view_rect() ]
+
+    # Redraw rows that changed since the last update and clear rows that
+    # are gone
+
+    for buffer_idx in range( self.buffer_rows ):
 
-    col_offset = self.rect.width / len( text_matrix )
+      row_idx = self.first_row + buffer_idx
+      row_key = self.get_row_key( row_idx )
 
-    # Iterate through text columns
+      if row_key == self.row_keys[buffer_idx]:
+        continue
 
-    self.surface_matrix = []
-    self.rect_matrix    = []
-    col_idx             = 0
+      row_rect = pygame.rect.Rect(
+        0, buffer_idx * properties.TEXT_HEIGHT,
+        self.rect.width, properties.TEXT_HEIGHT
+      )
 
-    for i, text_col in enumerate( text_matrix ):
+      self.image.fill( utils.BLACK, row_rect )
 
-      # Determine maximum number of rows in any column
+      if row_idx < self.num_rows:
+        self.draw_row( row_idx, row_rect )
 
-      num_rows = len( text_col )
+      self.row_keys[buffer_idx] = row_key
+      self.dirty_rects.append( row_rect )
 
-      if i == 0:
-        self.max_scroll_y = num_rows
-      elif num_rows > self.max_scroll_y:
-        self.max_scroll_y = num_rows
+    # Let the engine know that the text box needs to be drawn again
 
-      # Convert number of rows to pixels
+    if ( len( self.dirty_rects ) > 0 ) or ( self.scroll_y != self.drawn_scroll_y ):
+      self.drawn_scroll_y = self.scroll_y
+      utils.invalidate()
 
-      self.max_scroll_y *= properties.TEXT_HEIGHT
+  # Return everything displayed on given row, used for detecting rows
+  # that need to be drawn again
 
-      # Draw all text for current column
+  def get_row_key( self, row_idx ):
 
-      surface_col = []
-      rect_col    = []
-      row_idx     = 0
+    return tuple( [ text_col[row_idx] if row_idx < len( text_col ) else None
+                    for text_col in self.text_matrix ] )
 
-      for text in text_col:
+  # Render text of given row into the image. Returns the rect of the
+  # text in each column (None for columns without this row).
 
-        # Check if text should be bolded or colored
+  def draw_row( self, row_idx, row_rect ):
 
-        bold = False
+    # Calculate column offsets
+
+    col_offset = self.rect.width / len( self.text_matrix )
+    text_rects = []
+
+    for col_idx, text_col in enumerate( self.text_matrix ):
+
+      if row_idx >= len( text_col ):
+        text_rects.append( None )
+        continue
+
+      text = text_col[row_idx]
+
+      # Check if text should be bolded or colored
+
+      bold = False
+
+      if '**' in text:
+        bold = True
+        text = text.replace( '**', '' )
 
-        if '**' in text:
-          bold = True
-          text = text.replace( '**', '' )
+      color = self.color
 
-        color = self.color
+      if '\R' in text:
+        color = utils.RED
+        text  = text.replace( '\R', '' )
+      elif '\G' in text:
+        color = utils.GREEN
+        text  = text.replace( '\G', '' )
+      elif '\B' in text:
+        color = utils.BLUE
+        text  = text.replace( '\B', '' )
+      elif '\K' in text:
+        color = utils.BLACK
+        text  = text.replace( '\K', '' )
+      elif '\W' in text:
+        color = utils.WHITE
+        text  = text.replace( '\W', '' )
 
-        if '\R' in text:
-          color = utils.RED
-          text  = text.replace( '\R', '' )
-        elif '\G' in text:
-          color = utils.GREEN
-          text  = text.replace( '\G', '' )
-        elif '\B' in text:
-          color = utils.BLUE
-          text  = text.replace( '\B', '' )
-        elif '\K' in text:
-          color = utils.BLACK
-          text  = text.replace( '\K', '' )
-        elif '\W' in text:
-          color = utils.WHITE
-          text  = text.replace( '\W', '' )
+      # Draw text
 
-        # Draw text
+      surface, rect = utils.gen_text_pos(
+        text, self.size,
+        ( col_offset * col_idx ) + properties.TEXT_X_OFFSET,
+        row_rect.top + self.text_offset_y,
+        color, bold
+      )
 
-        surface, rect = utils.gen_text_pos(
-          text, self.size,
-          ( col_offset * col_idx ) + properties.TEXT_X_OFFSET,
-          ( properties.TEXT_HEIGHT * row_idx ) + properties.TEXT_Y_OFFSET - self.scroll_y,
-          color, bold
-        )
+      self.image.blit( surface, rect )
 
-        # Add text surface to column array
+      text_rects.append( rect )
 
-        surface_col.append( ( surface, rect ) )
+    return text_rects
 
-        # Calculate hit box rects for processing inputs
+  # Return part of the image that is visible at the current scroll
+  # position
 
-        hit_rect = pygame.rect.Rect(
-          0, rect.top - properties.TEXT_Y_OFFSET,
-          self.rect.width, properties.TEXT_HEIGHT
-        )
+  def get_view_rect( self ):
 
-        rect_col.append( hit_rect.move( self.offset_x + self.rect.left, self.offset_y + self.rect.top ) )
+    return pygame.rect.Rect(
+      0, self.scroll_y - ( self.first_row * properties.TEXT_HEIGHT ),
+      self.rect.width, self.rect.height
+    )
+
+  # Return index of row under the mouse, or None if the mouse is not
+  # over any row. Rows are found from the scroll position, so this does
+  # not depend on the number of rows.
+
+  def get_row( self, mouse_x, mouse_y ):
+
+    if not self.rect.move( self.offset_x, self.offset_y ).collidepoint( mouse_x, mouse_y ):
+      return None
 
-        # Increment row index
+    row_idx = ( mouse_y - self.offset_y - self.rect.top + self.scroll_y ) / properties.TEXT_HEIGHT
 
-        row_idx += 1
+    if row_idx >= self.num_rows:
+      return None
 
-      # Add text surface to matrix array
+    return row_idx
 
-      self.surface_matrix.append( surface_col )
+  # Return entry of given list displayed on the row under the mouse, or
+  # None if there is none
 
-      # Add detection rect to matrix array
+  def get_item( self, items, mouse_x, mouse_y ):
 
-      self.rect_matrix.append( rect_col )
+    row_idx = self.get_row( mouse_x, mouse_y )
 
-      # Increment column index
+    if ( row_idx == None ) or ( row_idx >= len( items ) ):
+      return None
 
-      col_idx += 1
+    return items[row_idx]
 
-  # Draw text
+  # Return rects of the text box drawn since the last call
 
   def draw_text( self ):
 
+    view_rect = self.get_view_rect()
+
     rect_updates = []
 
-    for surface_col in self.surface_matrix:
-      for surface, rect in surface_col:
-        rect_updates += [ self.image.blit( surface, rect ) ]
+    for rect in self.dirty_rects:
+
+      rect = rect.clip( view_rect )
+
+      if ( rect.width > 0 ) and ( rect.height > 0 ):
+        rect_updates.append( rect.move( 0, -view_rect.top ) )
+
+    self.dirty_rects = []
 
     return rect_updates
 
@@ -200,6 +291,6 @@ class TextBox:
   def draw( self, surface ):
 
     rect_updates  = self.draw_text()
-    rect_updates += [ surface.blit( self.image, self.rect ) ]
+    rect_updates += [ surface.blit( self.image, self.rect, self.get_view_rect() ) ]
 
     return rect_updates
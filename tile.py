@@ -7,9 +7,10 @@
 import pygame, sys, os
 from pygame.locals import *
 
-import random
-import copy
+import bisect
 import properties
+import assets
+import rng
 import item
 import enemy
 
@@ -317,126 +318,336 @@ terrain_table = {
 
 }
 
+#-------------------------------------------------------------------------
+# Shared Overlays
+#-------------------------------------------------------------------------
+# Night level and campfire animation are the same for every tile, so
+# they are tracked once here instead of on each tile.
+
+overlay_state = {
+  'night_alpha' : 255,
+  'fire_step'   : 0,
+  'fire_frame'  : 0,
+}
+
+# Set alpha of the night overlay (255 means full daylight)
+
+def set_night_alpha( alpha ):
+
+  overlay_state['night_alpha'] = alpha
+
+# Check if revealed tiles are dark enough to show campfires
+
+def is_night():
+
+  alpha = overlay_state['night_alpha']
+
+  return ( alpha > properties.NIGHT_ALPHA - 10 ) and ( alpha < 255 )
+
+# Advance campfire animation by one frame. Returns true if a new
+# animation frame is shown.
+
+def animate():
+
+  if overlay_state['fire_step'] == properties.FRAME_SWITCH:
+
+    overlay_state['fire_frame'] += 1
+    if overlay_state['fire_frame'] >= properties.FIRE_FRAMES:
+      overlay_state['fire_frame'] = 0
+
+    overlay_state['fire_step'] = 0
+
+    return True
+
+  else:
+    overlay_state['fire_step'] += 1
+
+  return False
+
+# Tiles whose overlays changed since the map layer was last composited
+
+dirty_tiles = []
+
+# Version of the move costs on the map, bumped whenever the terrain of a
+# tile changes (or tiles are replaced) so that cached path finding
+# results are dropped
+
+cost_state = {
+  'version' : 0,
+}
+
+#-------------------------------------------------------------------------
+# Terrain Prototype
+#-------------------------------------------------------------------------
+# Information shared by every tile of the same terrain. Prototypes are
+# created once per terrain type and referenced by the tiles.
+
+class Terrain( object ):
+
+  # Constructor
+
+  def __init__( self, name ):
+
+    assert( name in terrain_table )
+
+    self.name        = name
+    self.img_path    = properties.TILE_PATH + terrain_table[name][0]
+    self.bg_path     = properties.BG_PATH + terrain_table[name][0]
+    self.move_cost   = terrain_table[name][1]
+    self.valid       = terrain_table[name][2]
+    self.risk        = terrain_table[name][3]
+    self.enemy_rates = terrain_table[name][4]
+    self.rsrc_rates  = terrain_table[name][5]
+    self.item_rates  = terrain_table[name][6]
+    self.rsrc_probs  = [ rate[0] for rate in self.rsrc_rates ]
+
+    # Running sums of spawn rates for sampling
+
+    self.enemy_names = [ rate[1] for rate in self.enemy_rates ]
+    self.enemy_cum   = rng.gen_cumulative( [ rate[0] for rate in self.enemy_rates ] )
+    self.item_names  = [ rate[1] for rate in self.item_rates ]
+    self.item_cum    = rng.gen_cumulative( [ rate[0] for rate in self.item_rates ] )
+    self.image       = None
+
+  # Return terrain image, loading it on first use
+
+  def get_image( self ):
+
+    if self.image == None:
+      self.image = assets.get_image( self.img_path )
+
+    return self.image
+
+terrain_protos = {}
+
+# Return shared prototype for given terrain
+
+def get_terrain( name ):
+
+  if name not in terrain_protos:
+    terrain_protos[name] = Terrain( name )
+
+  return terrain_protos[name]
+
 #-------------------------------------------------------------------------
 # Main Class
 #-------------------------------------------------------------------------
 
-class Tile( pygame.sprite.Sprite ):
+class Tile( object ):
+
+  # Only per-tile state is stored, everything else is on the prototype.
+  # Resource probabilities are copied from the prototype the first time
+  # the tile is depleted.
+
+  __slots__ = (
+    'proto', 'pos_x', 'pos_y',
+    '_fog', '_moveable', '_selected', '_has_survivor', 'dirty',
+    'rsrc_probs',
+  )
 
   # Constructor
 
   def __init__( self, terrain, pos_x, pos_y ):
 
-    assert( terrain in terrain_table )
+    self.proto = get_terrain( terrain )
+    self.pos_x = pos_x
+    self.pos_y = pos_y
 
-    pygame.sprite.Sprite.__init__( self )
+    self._has_survivor = False
 
-    self.terrain  = terrain
-    self.pos_x    = pos_x
-    self.pos_y    = pos_y
+    # Overlays for movement
 
-    # Set image
+    self._moveable = False
+    self._selected = False
+    self._fog      = True
 
-    self.img_path     = properties.TILE_PATH + terrain_table[self.terrain][0]
-    self.surface      = pygame.image.load( self.img_path )
-    self.image        = self.surface.convert()
-    self.rect         = self.image.get_rect()
-    self.abs_x        = self.pos_x * properties.TILE_WIDTH
-    self.abs_y        = self.pos_y * properties.TILE_HEIGHT
-    self.rect.topleft = self.abs_x, self.abs_y
+    self.dirty      = False
+    self.rsrc_probs = None
 
-    self.bg_path      = properties.BG_PATH + terrain_table[self.terrain][0]
+  # Queue tile to be redrawn on the map layer
 
-    # Terrain-specific information
+  def mark_dirty( self ):
 
-    self.move_cost   = terrain_table[self.terrain][1]
-    self.valid       = terrain_table[self.terrain][2]
-    self.risk        = terrain_table[self.terrain][3]
-    self.enemy_rates = terrain_table[self.terrain][4]
-    self.rsrc_rates  = copy.deepcopy( terrain_table[self.terrain][5] )
-    self.item_rates  = terrain_table[self.terrain][6]
+    if not self.dirty:
+      self.dirty = True
+      dirty_tiles.append( self )
 
-    self.has_survivor = False
+  # Change terrain of tile
 
-    # Overlays for movement
+  def set_terrain( self, terrain ):
+
+    proto = get_terrain( terrain )
 
-    self.moveable = False
-    self.selected = False
-    self.fog      = True
+    if proto.move_cost != self.proto.move_cost:
+      cost_state['version'] += 1
 
-    self.move_surface      = pygame.image.load( properties.TILE_PATH + 'blue.png' )
-    self.move_surface.set_alpha( 128 )
-    self.move_rect         = self.move_surface.get_rect()
-    self.move_rect.topleft = 0, 0
+    self.proto      = proto
+    self.rsrc_probs = None
+    self.mark_dirty()
 
-    self.sel_surface      = pygame.image.load( properties.TILE_PATH + 'red.png' )
-    self.sel_surface.set_alpha( 128 )
-    self.sel_rect         = self.sel_surface.get_rect()
-    self.sel_rect.topleft = 0, 0
+  # Overlay state, changing any of these marks the tile as dirty
 
-    self.fog_surface      = pygame.image.load( properties.TILE_PATH + 'black.png' )
-    self.fog_rect         = self.fog_surface.get_rect()
-    self.fog_rect.topleft = 0, 0
-    self.fog_surface.set_alpha( 255 )
+  @property
+  def fog( self ):
+    return self._fog
 
-    # Overlay for rescuable survivor
+  @fog.setter
+  def fog( self, fog ):
+    if fog != self._fog:
+      self._fog = fog
+      self.mark_dirty()
 
-    self.step_count = 0
-    self.draw_count = 0
+  @property
+  def moveable( self ):
+    return self._moveable
 
-    self.survivor_img_path     = properties.TILE_PATH + 'fire'
-    self.survivor_surface      = pygame.image.load( self.survivor_img_path + '0.png' )
-    self.survivor_surface.set_colorkey( self.survivor_surface.get_at( ( 0, 0 ) ), RLEACCEL )
-    self.survivor_surface      = self.survivor_surface.convert()
-    self.survivor_rect         = self.survivor_surface.get_rect()
-    self.survivor_rect.center  = self.fog_rect.center
+  @moveable.setter
+  def moveable( self, moveable ):
+    if moveable != self._moveable:
+      self._moveable = moveable
+      self.mark_dirty()
+
+  @property
+  def selected( self ):
+    return self._selected
+
+  @selected.setter
+  def selected( self, selected ):
+    if selected != self._selected:
+      self._selected = selected
+      self.mark_dirty()
+
+  @property
+  def has_survivor( self ):
+    return self._has_survivor
+
+  @has_survivor.setter
+  def has_survivor( self, has_survivor ):
+    if has_survivor != self._has_survivor:
+      self._has_survivor = has_survivor
+      self.mark_dirty()
+
+  # Terrain-specific information
+
+  @property
+  def terrain( self ):
+    return self.proto.name
+
+  @property
+  def move_cost( self ):
+    return self.proto.move_cost
+
+  @property
+  def valid( self ):
+    return self.proto.valid
+
+  @property
+  def risk( self ):
+    return self.proto.risk
+
+  @property
+  def enemy_rates( self ):
+    return self.proto.enemy_rates
+
+  @property
+  def item_rates( self ):
+    return self.proto.item_rates
+
+  @property
+  def bg_path( self ):
+    return self.proto.bg_path
+
+  # Absolute position on the map in pixels
+
+  @property
+  def abs_x( self ):
+    return self.pos_x * properties.TILE_WIDTH
+
+  @property
+  def abs_y( self ):
+    return self.pos_y * properties.TILE_HEIGHT
+
+  # Return current probability of finding given resource
+
+  def get_rsrc_prob( self, i ):
+
+    if self.rsrc_probs == None:
+      return self.proto.rsrc_probs[i]
+
+    return self.rsrc_probs[i]
+
+  # Reduce probability of finding given resource on this tile
+
+  def deplete( self, i ):
+
+    if self.rsrc_probs == None:
+      self.rsrc_probs = list( self.proto.rsrc_probs )
+
+    self.rsrc_probs[i] *= properties.RSRC_REDUC_RATE
 
   # Roll for enemy spawned during defend phase. Currently only one enemy
   # is spawned per encounter. If no enemy is spawned, None is returned.
 
-  def roll_enemy( self, bonus ):
+  def roll_enemy( self, bonus, _rng ):
 
-    roll = random.random()
-    prob = 0.0
+    roll = _rng.combat.random()
 
-    for _enemy in self.enemy_rates:
+    # Scaling the roll down is the same as scaling every rate up
 
-      prob += _enemy[0] * bonus
+    if bonus <= 0.0:
+      return None
 
-      if roll < prob:
-        return enemy.Enemy( _enemy[1] )
+    idx = rng.pick( self.proto.enemy_cum, roll / bonus )
 
-    return None
+    if idx == None:
+      return None
+
+    return enemy.Enemy( self.proto.enemy_names[idx], _rng )
+
+  # Roll for enemy spawns n times at once. Returns list of enemy names,
+  # with None for rolls that spawned nothing. Enemies are not created,
+  # so this is meant for tools sampling many outcomes.
+
+  def roll_enemy_n( self, n, bonus, _rng ):
+
+    if bonus <= 0.0:
+      return [ None ] * n
+
+    cumulative = self.proto.enemy_cum
+    names      = self.proto.enemy_names + [ None ]
+    random     = _rng.combat.random
+
+    return [ names[bisect.bisect_right( cumulative, random() / bonus )] for i in xrange( n ) ]
 
   # Roll for resources. One try per survivor who is in the scavenge
   # party. The base scavenge probability for each resource is modified by
   # the rolling survivor's mental bonus.
 
-  def roll_resources( self, survivors ):
+  def roll_resources( self, survivors, _rng ):
 
     loot = [ 0, 0, 0, 0 ]
 
     for _survivor in survivors:
 
-      for i, rsrc in enumerate( self.rsrc_rates[:-1] ):
+      for i, rsrc in enumerate( self.proto.rsrc_rates[:-1] ):
 
-        roll = random.random()
-        prob = rsrc[0] + ( _survivor.get_mental_bonus() * properties.RSRC_BONUS_MULT )
+        roll = _rng.scavenge.random()
+        prob = self.get_rsrc_prob( i ) + ( _survivor.get_mental_bonus() * properties.RSRC_BONUS_MULT )
 
         prob *= ( 1.00 + _survivor.get_attributes().scavenge_bonus )
 
         if roll < prob:
 
-          loot[i] += random.randint( rsrc[1], rsrc[2] )
+          loot[i] += _rng.scavenge.randint( rsrc[1], rsrc[2] )
 
     # Reduce the probability of scavenging resources if the scavenge was
     # successful for a given resource. This is to prevent camping one
     # safe tile for infinite resources.
 
-    for i in range( len( self.rsrc_rates[:-1] ) ):
+    for i in range( len( loot ) ):
 
       if loot[i] > 0:
-        self.rsrc_rates[i][0] *= properties.RSRC_REDUC_RATE
+        self.deplete( i )
 
     return loot
 
@@ -445,7 +656,7 @@ class Tile( pygame.sprite.Sprite ):
   # party. The combined mental bonuses of the survivors is used to modify
   # the item find probability.
 
-  def roll_items( self, survivors ):
+  def roll_items( self, survivors, _rng ):
 
     tot_bonus       = 0
     attribute_bonus = 0.0
@@ -454,22 +665,17 @@ class Tile( pygame.sprite.Sprite ):
       tot_bonus       += _survivor.get_mental_bonus()
       attribute_bonus  = max( attribute_bonus, _survivor.get_attributes().scavenge_bonus )
 
-    get_roll = random.random()
-    get_prob = self.rsrc_rates[-1][0] + ( tot_bonus * properties.ITEM_BONUS_MULT )
+    get_roll = _rng.scavenge.random()
+    get_prob = self.get_rsrc_prob( -1 ) + ( tot_bonus * properties.ITEM_BONUS_MULT )
 
     get_prob *= ( 1.00 + attribute_bonus )
 
     if get_roll < get_prob:
 
-      item_roll = random.random()
-      item_prob = 0.0
-
-      for _item in self.item_rates:
-
-        item_prob += _item[0]
+      idx = rng.pick( self.proto.item_cum, _rng.scavenge.random() )
 
-        if item_roll < item_prob:
-          return item.Item( _item[1] )
+      if idx != None:
+        return item.Item( self.proto.item_names[idx] )
 
     return None
 
@@ -479,74 +685,53 @@ class Tile( pygame.sprite.Sprite ):
 
     prob_nothing = 1.00
 
-    for rate in self.rsrc_rates:
-      prob_nothing *= 1.00 - rate[0]
+    for i in range( len( self.proto.rsrc_probs ) ):
+      prob_nothing *= 1.00 - self.get_rsrc_prob( i )
 
     prob_something = 1.00 - prob_nothing
 
     return '%.1f' % ( prob_something * 100 ) + '%'
 
-  # Update graphics
-
-  def update( self, cam_x, cam_y ):
-
-    # Update position relative to camera
-
-    self.rect.top  = self.abs_y - cam_y
-    self.rect.left = self.abs_x - cam_x
-
-    # Draw campfire if night and there is a rescuable survivor here
-
-    if not self.fog and ( self.fog_surface.get_alpha() > properties.NIGHT_ALPHA - 10 ) \
-      and ( self.fog_surface.get_alpha() < 255 ) and self.has_survivor:
-
-      if self.step_count == properties.FRAME_SWITCH:
+  # Draw overlays on top of the terrain at the given position. The night
+  # tint and campfires are drawn over the whole camera view instead.
 
-        self.survivor_surface = pygame.image.load( self.survivor_img_path + str( self.draw_count ) + '.png' )
-        self.survivor_surface.set_colorkey( self.survivor_surface.get_at( ( 0, 0 ) ), RLEACCEL )
-        self.survivor_surface = self.survivor_surface.convert()
-
-        self.draw_count += 1
-        if self.draw_count > 3:
-          self.draw_count = 0
-
-        self.step_count = 0
-
-      else:
-        self.step_count += 1
-
-  # Draw overlays if necessary
-
-  def draw_overlay( self ):
+  def draw_overlay( self, surface, pos ):
 
     rect_updates = []
 
-    self.image = self.surface.convert()
-
-    if self.fog or ( self.fog_surface.get_alpha() < 255 ):
-      rect_updates += [ self.image.blit( self.fog_surface, self.fog_rect ) ]
+    if self.fog:
+      rect_updates += [ surface.blit( assets.get_image( properties.TILE_PATH + 'black.png' ), pos ) ]
 
     if self.moveable:
       if self.selected:
-        rect_updates += [ self.image.blit( self.sel_surface, self.sel_rect ) ]
+        rect_updates += [ surface.blit( assets.get_image( properties.TILE_PATH + 'red.png', False, 128 ), pos ) ]
       else:
-        rect_updates += [ self.image.blit( self.move_surface, self.move_rect ) ]
+        rect_updates += [ surface.blit( assets.get_image( properties.TILE_PATH + 'blue.png', False, 128 ), pos ) ]
 
-    # Draw campfire if night and there is a rescuable survivor here
+    return rect_updates
 
-    if not self.fog and ( self.fog_surface.get_alpha() > properties.NIGHT_ALPHA - 10 ) \
-      and ( self.fog_surface.get_alpha() < 255 ) and self.has_survivor:
+  # Draw campfire if night and there is a rescuable survivor here
 
-      rect_updates += [ self.image.blit( self.survivor_surface, self.survivor_rect ) ]
+  def draw_fire( self, surface, pos ):
 
-    return rect_updates
+    if self.fog or not self.has_survivor or not is_night():
+      return []
+
+    fire_frames      = assets.get_frames( properties.TILE_PATH + 'fire', properties.FIRE_FRAMES )
+    fire_surface     = fire_frames[overlay_state['fire_frame']]
+    fire_rect        = fire_surface.get_rect()
+    fire_rect.center = pos[0] + properties.TILE_WIDTH / 2, pos[1] + properties.TILE_HEIGHT / 2
+
+    return [ surface.blit( fire_surface, fire_rect ) ]
+
+  # Draw graphics relative to camera position
 
-  # Draw graphics
+  def draw( self, surface, cam_x, cam_y ):
 
-  def draw( self, surface ):
+    pos = ( self.abs_x - cam_x, self.abs_y - cam_y )
 
-    rect_updates  = self.draw_overlay()
-    rect_updates += [ surface.blit( self.image, self.rect ) ]
+    rect_updates  = [ surface.blit( self.proto.get_image(), pos ) ]
+    rect_updates += self.draw_overlay( surface, pos )
 
     return rect_updates
 
@@ -563,5 +748,5 @@ class Tile( pygame.sprite.Sprite ):
           str( self.move_cost ) + '/' + str( self.valid )
 
     print self.enemy_rates
-    print self.rsrc_rates
+    print [ self.get_rsrc_prob( i ) for i in range( len( self.proto.rsrc_probs ) ) ]
     print self.item_rates
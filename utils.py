@@ -6,6 +6,7 @@
 import pygame, sys, os
 from pygame.locals import *
 
+import collections
 import properties
 
 #-------------------------------------------------------------------------
@@ -20,6 +21,76 @@ BLUE   = (0,0,255)
 PURPLE = (255,0,255)
 YELLOW = (255,255,0)
 
+#-------------------------------------------------------------------------
+# Redraw State
+#-------------------------------------------------------------------------
+# Set by anything that changes what is on screen without user input
+# (animations, scrolling text, new text). The engine only draws frames
+# after something was invalidated, and clears the flag once drawn.
+
+redraw_state = {
+  'dirty' : True,
+}
+
+# Mark screen as needing to be drawn again
+
+def invalidate():
+
+  redraw_state['dirty'] = True
+
+#-------------------------------------------------------------------------
+# Text Cache
+#-------------------------------------------------------------------------
+# Fonts are opened once per (size, bold) pair and kept for the lifetime
+# of the process. Rendered text surfaces are kept in a bounded LRU cache
+# keyed by (text, size, color, bold) since most text on screen is
+# redrawn unchanged every frame. Cached surfaces are shared, so callers
+# must not draw onto the surfaces returned by gen_text().
+
+font_table = {}
+text_cache = collections.OrderedDict()
+
+text_stats = {
+  'hits'      : 0,
+  'misses'    : 0,
+  'evictions' : 0,
+}
+
+# Return shared font object with specified parameters
+
+def get_font( size, bold=False ):
+
+  key = ( size, bold )
+
+  if key not in font_table:
+
+    font = pygame.font.Font( properties.DEFAULT_FONT, size )
+    font.set_bold( bold )
+
+    font_table[key] = font
+
+  return font_table[key]
+
+# Return copy of text cache counters
+
+def get_text_stats():
+
+  stats = dict( text_stats )
+
+  stats['size']  = len( text_cache )
+  stats['fonts'] = len( font_table )
+
+  return stats
+
+# Drop all cached text surfaces and reset counters
+
+def clear_text_cache():
+
+  text_cache.clear()
+
+  for key in text_stats:
+    text_stats[key] = 0
+
 #-------------------------------------------------------------------------
 # Functions
 #-------------------------------------------------------------------------
@@ -28,14 +99,34 @@ YELLOW = (255,255,0)
 
 def gen_text( text, size, color=BLACK, bold=False ):
 
-  # Configure font base
+  key = ( text, size, tuple( color ), bold )
+
+  # Move cached surface to the most recently used end
+
+  if key in text_cache:
+
+    surface         = text_cache.pop( key )
+    text_cache[key] = surface
+
+    text_stats['hits'] += 1
+
+    return surface
+
+  # Render new text surface
+
+  surface = get_font( size, bold ).render( text, 1, color )
+
+  text_stats['misses'] += 1
+
+  # Evict least recently used surface if cache is full
 
-  font = pygame.font.Font( properties.DEFAULT_FONT, size )
-  font.set_bold( bold )
+  if len( text_cache ) >= properties.TEXT_CACHE_SIZE:
+    text_cache.popitem( last=False )
+    text_stats['evictions'] += 1
 
-  # Create text surface
+  text_cache[key] = surface
 
-  return font.render( text, 1, color )
+  return surface
 
 # Above with rect coordinates specified
 
@@ -8,6 +8,7 @@ from pygame.locals import *
 
 import math
 import properties
+import assets
 
 #-------------------------------------------------------------------------
 # Main Class
@@ -29,7 +30,7 @@ class Window:
     if bg_path == None:
       self.bg_image = pygame.Surface( ( width, height ) )
     else:
-      self.bg_image = pygame.image.load( self.bg_path )
+      self.bg_image = assets.get_image( self.bg_path )
 
     self.bg_rect      = self.bg_image.get_rect( topleft = ( 0, 0 ) )
 
@@ -0,0 +1,257 @@
+#=========================================================================
+# world.py
+#=========================================================================
+# Streamed world map for maps much larger than MAP_SIZE. The world is
+# split into square chunks, each generated on demand by the map
+# generator from a seed derived from the world seed and the chunk
+# position, so only chunks near the expeditions are ever held in memory.
+# Chunks far from every expedition are evicted: the state that differs
+# from a freshly generated chunk (fog, rescuable survivors and depleted
+# resources) is serialized, and restored when the chunk is loaded again.
+#
+# The world is indexed like the map from the map generator
+# ( world[pos_x][pos_y] ), but is never iterated as a whole.
+
+import zlib
+import cPickle
+import properties
+import rng
+import tile
+import mapgen
+
+#-------------------------------------------------------------------------
+# Chunk
+#-------------------------------------------------------------------------
+
+class Chunk( object ):
+
+  __slots__ = ( 'tiles', 'fog' )
+
+  # Constructor
+
+  def __init__( self, tiles ):
+
+    self.tiles = tiles
+    self.fog   = bytearray( '\x01' * ( properties.CHUNK_SIZE * properties.CHUNK_SIZE ) )
+
+  # Return state that differs from a freshly generated chunk
+
+  def save( self ):
+
+    survivors = bytearray( properties.CHUNK_SIZE * properties.CHUNK_SIZE )
+    rsrc      = {}
+
+    for i, column in enumerate( self.tiles ):
+      for j, _tile in enumerate( column ):
+
+        idx = i * properties.CHUNK_SIZE + j
+
+        if _tile.has_survivor:
+          survivors[idx] = 1
+
+        if _tile.rsrc_probs != None:
+          rsrc[idx] = _tile.rsrc_probs
+
+    return zlib.compress( cPickle.dumps( ( str( self.fog ), str( survivors ), rsrc ), 2 ) )
+
+  # Restore state returned by save()
+
+  def load( self, data ):
+
+    fog, survivors, rsrc = cPickle.loads( zlib.decompress( data ) )
+
+    self.fog = bytearray( fog )
+
+    for i, column in enumerate( self.tiles ):
+      for j, _tile in enumerate( column ):
+
+        idx = i * properties.CHUNK_SIZE + j
+
+        _tile.fog          = self.fog[idx] == 1
+        _tile.has_survivor = survivors[idx] != '\x00'
+        _tile.rsrc_probs   = rsrc.get( idx )
+
+#-------------------------------------------------------------------------
+# World Views
+#-------------------------------------------------------------------------
+# Flat views over the world indexed like the raw map grid
+# ( pos_x * size + pos_y ), so the fog and path finding code can treat a
+# world the same way as the flat arrays it builds for small maps.
+
+class TileView( object ):
+
+  # Constructor, attr selects the tile attribute to return (the tile
+  # itself if None)
+
+  def __init__( self, world, attr=None ):
+
+    self.world = world
+    self.attr  = attr
+
+  def __getitem__( self, idx ):
+
+    _tile = self.world.get_tile( idx / self.world.size, idx % self.world.size )
+
+    if self.attr == None:
+      return _tile
+
+    return getattr( _tile, self.attr )
+
+class FogView( object ):
+
+  # Constructor
+
+  def __init__( self, world ):
+
+    self.world = world
+
+  def __getitem__( self, idx ):
+
+    chunk, local_idx = self.world.get_chunk_idx( idx )
+
+    return chunk.fog[local_idx]
+
+  def __setitem__( self, idx, value ):
+
+    chunk, local_idx = self.world.get_chunk_idx( idx )
+
+    chunk.fog[local_idx] = value
+
+#-------------------------------------------------------------------------
+# Main Class
+#-------------------------------------------------------------------------
+
+class World( object ):
+
+  # Constructor, size is the number of tiles per side and must be a
+  # multiple of the chunk size
+
+  def __init__( self, size, _rng ):
+
+    assert( size % properties.CHUNK_SIZE == 0 )
+
+    self.size   = size
+    self.seed   = _rng.seed
+    self.chunks = {}
+    self.saved  = {}
+
+    self.tile_view = TileView( self )
+    self.cost_view = TileView( self, 'move_cost' )
+    self.fog_view  = FogView( self )
+
+  # Number of tiles per side, like len() of a generated map
+
+  def __len__( self ):
+
+    return self.size
+
+  # Return column proxy so tiles can be accessed as world[x][y]
+
+  def __getitem__( self, pos_x ):
+
+    if ( pos_x < 0 ) or ( pos_x >= self.size ):
+      raise IndexError( pos_x )
+
+    return WorldColumn( self, pos_x )
+
+  # Return chunk at given chunk position, generating or restoring it if
+  # it is not loaded
+
+  def get_chunk( self, chunk_x, chunk_y ):
+
+    key = ( chunk_x, chunk_y )
+
+    if key in self.chunks:
+      return self.chunks[key]
+
+    # Every chunk is generated from its own seed, so it is the same no
+    # matter when or in which order chunks are loaded
+
+    chunk_rng = rng.GameRNG( rng.derive_seed( self.seed, 'chunk:%d:%d' % key ) )
+
+    mg = mapgen.MapGen(
+      properties.CHUNK_SIZE, chunk_rng,
+      chunk_x * properties.CHUNK_SIZE, chunk_y * properties.CHUNK_SIZE
+    )
+
+    chunk = Chunk( mg.map )
+
+    if key in self.saved:
+      chunk.load( self.saved.pop( key ) )
+
+    self.chunks[key] = chunk
+
+    return chunk
+
+  # Return chunk and index within chunk for given world index
+
+  def get_chunk_idx( self, idx ):
+
+    pos_x, pos_y = divmod( idx, self.size )
+
+    chunk = self.get_chunk( pos_x / properties.CHUNK_SIZE, pos_y / properties.CHUNK_SIZE )
+
+    return chunk, ( pos_x % properties.CHUNK_SIZE ) * properties.CHUNK_SIZE + ( pos_y % properties.CHUNK_SIZE )
+
+  # Return tile at given position
+
+  def get_tile( self, pos_x, pos_y ):
+
+    chunk = self.get_chunk( pos_x / properties.CHUNK_SIZE, pos_y / properties.CHUNK_SIZE )
+
+    return chunk.tiles[pos_x % properties.CHUNK_SIZE][pos_y % properties.CHUNK_SIZE]
+
+  # Evict chunks farther than CHUNK_KEEP_RADIUS chunks from all given
+  # tiles. Returns the number of chunks evicted.
+
+  def evict( self, tiles ):
+
+    keep = set()
+
+    for _tile in tiles:
+
+      chunk_x = _tile.pos_x / properties.CHUNK_SIZE
+      chunk_y = _tile.pos_y / properties.CHUNK_SIZE
+
+      for dx in range( -properties.CHUNK_KEEP_RADIUS, properties.CHUNK_KEEP_RADIUS + 1 ):
+        for dy in range( -properties.CHUNK_KEEP_RADIUS, properties.CHUNK_KEEP_RADIUS + 1 ):
+          keep.add( ( chunk_x + dx, chunk_y + dy ) )
+
+    evicted = [ key for key in self.chunks if key not in keep ]
+
+    for key in evicted:
+      self.saved[key] = self.chunks.pop( key ).save()
+
+    # Tiles of evicted chunks are replaced when reloaded, so cached
+    # paths through them must be dropped
+
+    if len( evicted ) > 0:
+      tile.cost_state['version'] += 1
+
+    return len( evicted )
+
+#-------------------------------------------------------------------------
+# World Column
+#-------------------------------------------------------------------------
+
+class WorldColumn( object ):
+
+  __slots__ = ( 'world', 'pos_x' )
+
+  # Constructor
+
+  def __init__( self, world, pos_x ):
+
+    self.world = world
+    self.pos_x = pos_x
+
+  def __len__( self ):
+
+    return self.world.size
+
+  def __getitem__( self, pos_y ):
+
+    if ( pos_y < 0 ) or ( pos_y >= self.world.size ):
+      raise IndexError( pos_y )
+
+    return self.world.get_tile( self.pos_x, pos_y )